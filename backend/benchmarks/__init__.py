@@ -0,0 +1,9 @@
+"""
+Benchmark suite для generation pipeline з локальними fake LLM upstreams
+
+    python -m benchmarks run --rps 20 --duration 10
+    python -m benchmarks compare benchmarks/results/base.json benchmarks/results/head.json
+"""
+from .harness import run_benchmarks, compare_results
+
+__all__ = ["run_benchmarks", "compare_results"]
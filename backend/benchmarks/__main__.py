@@ -0,0 +1,88 @@
+"""
+CLI: python -m benchmarks run | compare
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from . import compare_results, run_benchmarks
+from .scenarios import SCENARIOS
+
+
+def _scenario_rate(value: str):
+    name, _, rate = value.partition("=")
+    if name not in SCENARIOS or not rate:
+        raise argparse.ArgumentTypeError(f"expected SCENARIO=RPS with SCENARIO in {', '.join(SCENARIOS)}")
+    return name, float(rate)
+
+
+def _run(args: argparse.Namespace) -> int:
+    document = run_benchmarks(
+        scenarios=args.scenarios or SCENARIOS,
+        rps=args.rps,
+        scenario_rps=dict(args.rps_for),
+        duration=args.duration,
+        warmup=args.warmup,
+        ollama_latency=args.ollama_latency,
+        openai_latency=args.openai_latency,
+        seed=args.seed,
+        output=args.output,
+    )
+    print(f"{'scenario':<14}{'req':>7}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for name, stats in document["scenarios"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<14}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9}"
+            f"{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}{stats['memory']['rss_peak_mb']:>10}"
+        )
+    print(f"\nResults: {document['output']}")
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    head = json.loads(Path(args.head).read_text(encoding="utf-8"))
+    rows = compare_results(base, head, args.max_regression)
+
+    print(f"base {base.get('commit')} → head {head.get('commit')}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['scenario']:<14}{row['metric']:<22}{row['base']:>11}{row['head']:>11}"
+            f"{row['change_pct']:>+9.1f}%{flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Yana.Diia backend benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run scenarios against fake upstreams")
+    run.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                     help=f"One or more of: {', '.join(SCENARIOS)} (default: all)")
+    run.add_argument("--rps", type=float, default=20.0, help="Target arrival rate per scenario")
+    run.add_argument("--rps-for", type=_scenario_rate, action="append", default=[], metavar="SCENARIO=RPS",
+                     help="Per-scenario rate (repeatable; mcp_pipeline defaults to 1)")
+    run.add_argument("--duration", type=float, default=10.0, help="Measured seconds per scenario")
+    run.add_argument("--warmup", type=float, default=2.0, help="Unmeasured warmup seconds")
+    run.add_argument("--ollama-latency", default="lognormal:p50=200,p99=1000",
+                     help="fixed:MS | uniform:LO-HI | lognormal:p50=MS,p99=MS")
+    run.add_argument("--openai-latency", default="lognormal:p50=300,p99=1500")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--output", type=Path, help="Result JSON path")
+    run.set_defaults(func=_run)
+
+    compare = sub.add_parser("compare", help="Compare two result files (exit 1 on regression)")
+    compare.add_argument("base")
+    compare.add_argument("head")
+    compare.add_argument("--max-regression", type=float, default=10.0, help="Allowed change in percent")
+    compare.set_defaults(func=_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
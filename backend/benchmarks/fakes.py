@@ -0,0 +1,150 @@
+"""
+Fake upstream LLM servers для бенчмарків (Ollama + OpenAI-compatible)
+Latency кожного upstream задається розподілом: fixed / uniform / lognormal
+"""
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+# Inverse normal CDF at 0.99 (for lognormal p50/p99 parametrisation)
+_Z99 = 2.3263
+
+
+class LatencyModel:
+    """
+    Latency distribution in milliseconds
+
+    Spec formats:
+        "0" / "fixed:50"           - constant
+        "uniform:20-200"           - uniform between bounds
+        "lognormal:p50=300,p99=2000" - heavy tail, matched to p50/p99
+    """
+
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        self.spec = spec
+        self._random = random.Random(seed)
+        kind, _, args = spec.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        self.kind = kind
+
+        if kind == "fixed":
+            self.value = float(args)
+        elif kind == "uniform":
+            low, high = args.split("-")
+            self.low, self.high = float(low), float(high)
+        elif kind == "lognormal":
+            params = dict(part.split("=") for part in args.split(","))
+            p50, p99 = float(params["p50"]), float(params["p99"])
+            self.mu = math.log(p50)
+            self.sigma = max(0.0, (math.log(p99) - self.mu) / _Z99)
+        else:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        """Seconds to wait"""
+        if self.kind == "fixed":
+            ms = self.value
+        elif self.kind == "uniform":
+            ms = self._random.uniform(self.low, self.high)
+        else:
+            ms = self._random.lognormvariate(self.mu, self.sigma)
+        return ms / 1000
+
+
+FAKE_FLOW = {
+    "steps": [
+        {"step_id": 1, "component": "eligibility_banner", "api_calls": ["edr"]},
+        {"step_id": 2, "component": "recipient_card_single", "api_calls": ["tax"]},
+        {"step_id": 3, "component": "form_step", "api_calls": []},
+    ],
+    "components": ["eligibility_banner", "recipient_card_single", "form_step"],
+    "api_calls": ["edr", "tax"],
+}
+
+FAKE_JUDGE = {
+    "component_compliance_score": 92,
+    "flow_length_score": 85,
+    "api_dependency_score": 88,
+    "wcag_score": 90,
+    "total_score": 89,
+    "justification": "Benchmark stand-in evaluation",
+    "violations": [],
+}
+
+
+def create_fake_app(ollama: LatencyModel, openai: LatencyModel) -> FastAPI:
+    """ASGI app that mimics the Ollama and OpenAI HTTP APIs"""
+    app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.requests = {"ollama": 0, "openai": 0}
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        body = await request.json()
+        app.state.requests["ollama"] += 1
+        await asyncio.sleep(ollama.sample())
+        return {
+            "model": body.get("model", "llama3.1"),
+            "response": json.dumps(FAKE_FLOW, ensure_ascii=False),
+            "done": True,
+        }
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        app.state.requests["openai"] += 1
+        await asyncio.sleep(openai.sample())
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        content = json.dumps(FAKE_JUDGE, ensure_ascii=False)
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+            },
+        }
+
+    return app
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn in a daemon thread on a free port"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.config = uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False, lifespan="on")
+        self.server = uvicorn.Server(self.config)
+        self._thread = threading.Thread(target=self.server.run, name="bench-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "BackgroundServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Benchmark server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
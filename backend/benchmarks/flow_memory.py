@@ -0,0 +1,127 @@
+"""
+Flow memory benchmark: байти на flow (dict / pydantic Flow / CompactFlow) та швидкість конвертацій
+
+    python -m benchmarks.flow_memory --flows 10000
+    python -m benchmarks.flow_memory --flows 50000 --json flow_memory.json
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from .scenarios import BACKEND_DIR
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from models.compact_flow import CompactFlow  # noqa: E402
+from models.flow_models import Flow  # noqa: E402
+
+_FIELDS = (
+    ("full_name", "text", "ПІБ"), ("inn", "text", "РНОКПП"), ("email", "email", "Email"),
+    ("phone", "tel", "Номер телефону"), ("birth_date", "date", "Дата народження"),
+    ("address", "textarea", "Адреса реєстрації"), ("kved", "select", "КВЕД"),
+    ("income", "number", "Місячний дохід"), ("consent", "checkbox", "Згода на обробку даних"),
+)
+_STEPS = ("form", "form_step", "eligibility_banner", "recipient_card_single", "confirmation", "error_modal")
+
+
+def synthetic_flows(count: int, seed: int = 42) -> List[str]:
+    """Flow JSON documents (3-8 steps, up to 6 fields) as they arrive from an agent"""
+    rng = random.Random(seed)
+    documents = []
+    for number in range(count):
+        steps = []
+        for index in range(rng.randint(3, 8)):
+            step_type = rng.choice(_STEPS)
+            step: Dict[str, Any] = {"id": f"step_{index + 1}", "type": step_type, "title": f"Крок {index + 1}"}
+            if step_type in ("form", "form_step", "recipient_card_single"):
+                step["fields"] = [
+                    {"name": name, "type": kind, "label": label, "required": rng.random() < 0.8}
+                    for name, kind, label in rng.sample(_FIELDS, rng.randint(1, 6))
+                ]
+            else:
+                step["message"] = "Перевірте дані, отримані з реєстрів, перед продовженням"
+            steps.append(step)
+        documents.append(json.dumps({
+            "id": f"flow_{number:06d}", "name": "Реєстрація ФОП", "description": "Згенерований flow",
+            "steps": steps, "metadata": {"version": "1.0"},
+        }, ensure_ascii=False))
+    return documents
+
+
+def _retained_bytes(build: Callable[[], list]) -> int:
+    """Bytes still allocated while the built objects are alive (intermediates excluded)"""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def _per_call_us(func: Callable[[Any], Any], items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return round((time.perf_counter() - started) / len(items) * 1e6, 2)
+
+
+def run_flow_memory_benchmark(flows: int = 10_000, seed: int = 42) -> Dict[str, Any]:
+    documents = synthetic_flows(flows, seed)
+    memory = {
+        "dict": _retained_bytes(lambda: [json.loads(document) for document in documents]),
+        "pydantic": _retained_bytes(lambda: [Flow.model_validate_json(document) for document in documents]),
+        "compact": _retained_bytes(lambda: [CompactFlow.from_dict(json.loads(document)) for document in documents]),
+    }
+
+    dicts = [Flow.model_validate_json(document).model_dump() for document in documents]
+    models = [Flow.model_validate(data) for data in dicts]
+    compacts = [CompactFlow.from_model(model) for model in models]
+    lossless = all(compact.to_model() == model and compact.to_dict() == data
+                   for compact, model, data in zip(compacts, models, dicts))
+
+    return {
+        "flows": flows,
+        "steps_per_flow": round(sum(len(model.steps) for model in models) / flows, 2),
+        "bytes_per_flow": {name: round(total / flows) for name, total in memory.items()},
+        "conversion_us": {
+            "Flow.model_validate(dict)": _per_call_us(Flow.model_validate, dicts),
+            "Flow.model_dump()": _per_call_us(lambda model: model.model_dump(), models),
+            "CompactFlow.from_model": _per_call_us(CompactFlow.from_model, models),
+            "CompactFlow.to_model": _per_call_us(lambda compact: compact.to_model(), compacts),
+            "CompactFlow.from_dict": _per_call_us(CompactFlow.from_dict, dicts),
+            "CompactFlow.to_dict": _per_call_us(lambda compact: compact.to_dict(), compacts),
+        },
+        "lossless": lossless,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.flow_memory", description="Flow memory / conversion")
+    parser.add_argument("--flows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results as JSON")
+    args = parser.parse_args()
+
+    result = run_flow_memory_benchmark(args.flows, args.seed)
+    print(f"{result['flows']} flows, {result['steps_per_flow']} steps per flow")
+    dict_bytes = result["bytes_per_flow"]["dict"]
+    for name, size in result["bytes_per_flow"].items():
+        print(f"{name:<10} {size:>8} B/flow   {size / dict_bytes:>5.2f}x dict")
+    for name, micros in result["conversion_us"].items():
+        print(f"{name:<28} {micros:>8} µs/flow")
+    print(f"lossless round-trip: {result['lossless']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 0 if result["lossless"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
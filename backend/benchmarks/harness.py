@@ -0,0 +1,165 @@
+"""
+Benchmark harness: піднімає fake upstreams + FastAPI app, ганяє сценарії, зберігає JSON результати
+"""
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from .fakes import BackgroundServer, LatencyModel, create_fake_app
+from .runner import run_open_loop
+from .scenarios import BACKEND_DIR, SCENARIOS, build_operations, configure_environment
+
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+# The MCP pipeline fans out to 3 Ollama calls behind OLLAMA_MAX_CONCURRENCY=2;
+# the global --rps would mostly measure 429s there
+DEFAULT_SCENARIO_RPS = {"mcp_pipeline": 1.0}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    scenarios: Iterable[str] = SCENARIOS,
+    rps: float = 20.0,
+    scenario_rps: Optional[Dict[str, float]] = None,
+    duration: float = 10.0,
+    warmup: float = 2.0,
+    ollama_latency: str = "lognormal:p50=200,p99=1000",
+    openai_latency: str = "lognormal:p50=300,p99=1500",
+    seed: Optional[int] = 42,
+    output: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Run scenarios against the app wired to fake upstreams
+
+    Args:
+        scenarios: Scenario names (see benchmarks.scenarios.SCENARIOS)
+        rps: Target arrival rate per scenario
+        scenario_rps: Per-scenario overrides (default: DEFAULT_SCENARIO_RPS)
+        duration: Measured seconds per scenario
+        warmup: Unmeasured seconds before each scenario
+        ollama_latency: LatencyModel spec for the fake Ollama
+        openai_latency: LatencyModel spec for the fake OpenAI (judge)
+        seed: RNG seed for latency sampling (None = random)
+        output: JSON path (default benchmarks/results/<timestamp>-<commit>.json)
+
+    Returns:
+        Results document (also written to `output`)
+    """
+    scenarios = list(scenarios)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    rates = {name: rps for name in scenarios}
+    for name, rate in {**DEFAULT_SCENARIO_RPS, **(scenario_rps or {})}.items():
+        if name in rates:
+            rates[name] = rate
+
+    fake_app = create_fake_app(LatencyModel(ollama_latency, seed), LatencyModel(openai_latency, seed))
+    with BackgroundServer(fake_app) as upstream:
+        configure_environment(upstream.url)
+        from main import app
+
+        with BackgroundServer(app) as server:
+            results = asyncio.run(_run_scenarios(server.url, scenarios, rates, duration, warmup))
+        upstream_calls = dict(fake_app.state.requests)
+
+    commit = _git_commit()
+    document = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "rps": rates,
+            "duration_s": duration,
+            "warmup_s": warmup,
+            "ollama_latency": ollama_latency,
+            "openai_latency": openai_latency,
+            "seed": seed,
+        },
+        "upstream_calls": upstream_calls,
+        "scenarios": results,
+    }
+
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json"
+    Path(output).write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+    document["output"] = str(output)
+    return document
+
+
+async def _run_scenarios(base_url: str, scenarios: List[str], rates: Dict[str, float], duration: float, warmup: float):
+    from utils.http_client import HTTPClientManager
+
+    limits = httpx.Limits(max_connections=500, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        operations = build_operations(client)
+        results = {}
+        for name in scenarios:
+            results[name] = await run_open_loop(operations[name], rates[name], duration, warmup)
+    # In-process scenarios opened the shared client on this loop: close it here, not in app shutdown
+    await HTTPClientManager.close()
+    return results
+
+
+# (metric, direction) - direction +1: higher is worse, -1: lower is worse
+COMPARED_METRICS = (
+    ("latency_ms.p50", 1),
+    ("latency_ms.p95", 1),
+    ("latency_ms.p99", 1),
+    ("throughput_rps", -1),
+    ("memory.rss_peak_mb", 1),
+)
+
+
+def _get(data: Dict[str, Any], dotted: str) -> float:
+    for key in dotted.split("."):
+        data = data[key]
+    return float(data)
+
+
+def compare_results(base: Dict[str, Any], head: Dict[str, Any], max_regression: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compare two result documents scenario by scenario
+
+    Args:
+        base: Baseline results
+        head: New results
+        max_regression: Allowed relative change in percent before a metric is flagged
+
+    Returns:
+        Rows with base/head values, change (%) and a `regression` flag
+    """
+    rows = []
+    for scenario, head_stats in head["scenarios"].items():
+        base_stats = base["scenarios"].get(scenario)
+        if base_stats is None:
+            continue
+        for metric, direction in COMPARED_METRICS:
+            before, after = _get(base_stats, metric), _get(head_stats, metric)
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append({
+                "scenario": scenario,
+                "metric": metric,
+                "base": before,
+                "head": after,
+                "change_pct": round(change, 1),
+                "regression": change * direction > max_regression,
+            })
+    return rows
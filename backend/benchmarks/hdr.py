@@ -0,0 +1,156 @@
+"""
+HDR histogram (High Dynamic Range) для latency: фіксована відносна точність на всьому діапазоні
+Формат percentile distribution сумісний з HdrHistogram plotter (.hgrm)
+"""
+import math
+from typing import Dict, Iterator, List, Tuple
+
+
+class HdrHistogram:
+    """
+    Log-linear histogram of integer values (e.g. microseconds)
+
+    Values are kept with `significant_figures` decimal digits of precision
+    between `lowest` and `highest`; larger values are clamped to `highest`.
+    """
+
+    def __init__(self, lowest: int = 1, highest: int = 60_000_000, significant_figures: int = 3):
+        if lowest < 1 or highest < 2 * lowest or not 1 <= significant_figures <= 5:
+            raise ValueError("Invalid HDR histogram range or precision")
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self.unit_magnitude = int(math.floor(math.log2(lowest)))
+        self.sub_bucket_half_count_magnitude = max(1, math.ceil(math.log2(largest_single_unit))) - 1
+        self.sub_bucket_count = 1 << (self.sub_bucket_half_count_magnitude + 1)
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+
+        smallest_untrackable = self.sub_bucket_count << self.unit_magnitude
+        self.bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            self.bucket_count += 1
+
+        self.counts: List[int] = [0] * ((self.bucket_count + 1) * self.sub_bucket_half_count)
+        self.total_count = 0
+        self.min_value = 0
+        self.max_value = 0
+        self.clamped = 0
+        self._sum = 0.0
+        self._sum_squares = 0.0
+
+    # ==================== Indexing ====================
+
+    def _counts_index(self, value: int) -> int:
+        bucket_index = (value | self.sub_bucket_mask).bit_length() - self.unit_magnitude - (self.sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        bucket_base = (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        return bucket_base + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def _value_range(self, index: int) -> Tuple[int, int]:
+        """(lowest, highest) value equivalent to counts[index]"""
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        shift = bucket_index + self.unit_magnitude
+        low = sub_bucket_index << shift
+        return low, low + (1 << shift) - 1
+
+    # ==================== Recording ====================
+
+    def record(self, value: int, count: int = 1) -> None:
+        value = max(0, int(value))
+        if value > self.highest:
+            self.clamped += count
+            value = self.highest
+        self.counts[self._counts_index(value)] += count
+        if self.total_count == 0 or value < self.min_value:
+            self.min_value = value
+        self.max_value = max(self.max_value, value)
+        self.total_count += count
+        self._sum += value * count
+        self._sum_squares += value * value * count
+
+    def merge(self, other: "HdrHistogram") -> None:
+        if len(other.counts) != len(self.counts) or other.unit_magnitude != self.unit_magnitude:
+            raise ValueError("Cannot merge histograms with different layouts")
+        if other.total_count == 0:
+            return
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.min_value = other.min_value if self.total_count == 0 else min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.total_count += other.total_count
+        self.clamped += other.clamped
+        self._sum += other._sum
+        self._sum_squares += other._sum_squares
+
+    # ==================== Queries ====================
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count if self.total_count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        if not self.total_count:
+            return 0.0
+        return math.sqrt(max(0.0, self._sum_squares / self.total_count - self.mean ** 2))
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Highest equivalent value at `percentile` (0-100)"""
+        if not self.total_count:
+            return 0
+        # round() drops float noise (99.9% of 100000 must be 99900, not 99901)
+        target = max(1, math.ceil(round(min(percentile, 100.0) / 100 * self.total_count, 6)))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return min(self._value_range(index)[1], self.max_value)
+        return self.max_value
+
+    def percentiles(self, points=(50, 90, 99, 99.9)) -> Dict[str, int]:
+        return {f"p{p:g}": self.value_at_percentile(p) for p in points}
+
+    def _distribution(self, ticks_per_half_distance: int) -> Iterator[Tuple[int, float, int]]:
+        """(value, percentile, cumulative count) at HdrHistogram-style percentile ticks"""
+        running = 0
+        next_percentile = 0.0
+        level = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            running += count
+            reached = running / self.total_count * 100
+            value = min(self._value_range(index)[1], self.max_value)
+            if running == self.total_count:
+                yield value, 100.0, running
+                return
+            while next_percentile <= reached:
+                yield value, next_percentile, running
+                level += 1
+                next_percentile = 100 * (1 - 0.5 ** (level / ticks_per_half_distance))
+
+    def percentile_distribution(self, scale: float = 1000.0, ticks_per_half_distance: int = 5) -> str:
+        """
+        Text report in HdrHistogram .hgrm format
+
+        Args:
+            scale: Divisor for values (1000 = µs recorded → ms reported)
+            ticks_per_half_distance: Percentile resolution
+        """
+        lines = [f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} {'1/(1-Percentile)':>14}", ""]
+        for value, percentile, running in self._distribution(ticks_per_half_distance):
+            fraction = percentile / 100
+            inverse = f"{1 / (1 - fraction):14.2f}" if fraction < 1 else f"{'inf':>14}"
+            lines.append(f"{value / scale:12.3f} {fraction:14.12f} {running:10d} {inverse}")
+        lines.append(f"#[Mean    = {self.mean / scale:12.3f}, StdDeviation   = {self.stddev / scale:12.3f}]")
+        lines.append(f"#[Max     = {self.max_value / scale:12.3f}, Total count    = {self.total_count:12d}]")
+        lines.append(f"#[Buckets = {self.bucket_count:12d}, SubBuckets     = {self.sub_bucket_count:12d}]")
+        return "\n".join(lines) + "\n"
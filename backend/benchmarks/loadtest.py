@@ -0,0 +1,268 @@
+"""
+Load-test для mock registry API (/api/mock/*) за сценарними файлами
+Open-loop з фіксованим arrival rate, HDR histogram latency по кожному route
+
+    python -m benchmarks.loadtest benchmarks/load_scenarios/fop_registration.json
+    python -m benchmarks.loadtest fop_registration --url http://localhost:8001 --rate 200 --hgrm-dir /tmp/hgrm
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .fakes import BackgroundServer
+from .hdr import HdrHistogram
+from .runner import arrivals
+from .scenarios import BACKEND_DIR, configure_environment
+
+SCENARIOS_DIR = BACKEND_DIR / "benchmarks" / "load_scenarios"
+
+
+class LoadScenario:
+    """
+    Weighted request mix loaded from a JSON scenario file
+
+    Format:
+        {
+          "name": "fop_registration",
+          "rate": 50, "duration": 30, "warmup": 5,
+          "variables": {"edrpou": ["12345678"]},
+          "requests": [
+            {"name": "edr", "method": "GET", "path": "/api/mock/edr/{edrpou}", "weight": 2,
+             "expect": [200]}
+          ]
+        }
+
+    `{var}` placeholders in path and string body values are filled from
+    `variables` (random pick per request); `expect` defaults to 2xx.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.name = data.get("name", "scenario")
+        self.description = data.get("description", "")
+        self.rate = float(data.get("rate", 20))
+        self.duration = float(data.get("duration", 30))
+        self.warmup = float(data.get("warmup", 0))
+        self.variables: Dict[str, List[Any]] = data.get("variables", {})
+        self.requests: List[Dict[str, Any]] = data.get("requests", [])
+
+        if not self.requests:
+            raise ValueError(f"Scenario '{self.name}' has no requests")
+        names = [request.get("name") for request in self.requests]
+        if None in names or len(set(names)) != len(names):
+            raise ValueError(f"Scenario '{self.name}': every request needs a unique name")
+        for request in self.requests:
+            request.setdefault("method", "GET")
+            request.setdefault("weight", 1)
+            if "path" not in request:
+                raise ValueError(f"Scenario '{self.name}': request '{request['name']}' has no path")
+        self.weights = [float(request["weight"]) for request in self.requests]
+
+    @classmethod
+    def load(cls, path_or_name: str) -> "LoadScenario":
+        """Load by file path or by name from benchmarks/load_scenarios/"""
+        path = Path(path_or_name)
+        if not path.exists():
+            path = SCENARIOS_DIR / f"{path_or_name}.json"
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def _fill(self, value: Any, values: Dict[str, Any]) -> Any:
+        if isinstance(value, str):
+            return value.format(**values)
+        if isinstance(value, dict):
+            return {key: self._fill(item, values) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._fill(item, values) for item in value]
+        return value
+
+    def pick(self, rng: random.Random) -> Dict[str, Any]:
+        """Next request (weighted) with variables substituted"""
+        request = rng.choices(self.requests, weights=self.weights)[0]
+        values = {name: rng.choice(options) for name, options in self.variables.items()}
+        return {
+            "name": request["name"],
+            "method": request["method"],
+            "path": self._fill(request["path"], values),
+            "json": self._fill(request.get("body"), values),
+            "expect": request.get("expect"),
+        }
+
+
+class RouteStats:
+    """Per-route latency histogram (µs) and outcome counters"""
+
+    def __init__(self):
+        self.histogram = HdrHistogram()
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        h = self.histogram
+        return {
+            "count": h.total_count,
+            "errors": self.errors,
+            "throughput_rps": round(h.total_count / elapsed, 2) if elapsed else 0.0,
+            "statuses": self.statuses,
+            "latency_ms": {
+                **{key: value / 1000 for key, value in h.percentiles((50, 90, 99, 99.9)).items()},
+                "max": h.max_value / 1000,
+                "mean": round(h.mean / 1000, 3),
+            },
+        }
+
+
+async def run_load_test(
+    scenario: LoadScenario,
+    base_url: str,
+    rate: Optional[float] = None,
+    duration: Optional[float] = None,
+    seed: Optional[int] = 42,
+    max_in_flight: int = 5000
+) -> Dict[str, Any]:
+    """
+    Run a scenario open-loop against `base_url`
+
+    Latency is measured from each request's scheduled start, so a stalled
+    server is charged for the requests queued behind it (no coordinated omission).
+
+    Returns:
+        Report with per-route stats, HDR histograms under "_histograms"
+    """
+    rate = rate or scenario.rate
+    duration = duration or scenario.duration
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        if scenario.warmup:
+            await _drive(client, scenario, rng, rate, scenario.warmup, max_in_flight, {})
+
+        routes: Dict[str, RouteStats] = {request["name"]: RouteStats() for request in scenario.requests}
+        started = time.perf_counter()
+        totals = await _drive(client, scenario, rng, rate, duration, max_in_flight, routes)
+        elapsed = time.perf_counter() - started
+
+    combined = HdrHistogram()
+    for stats in routes.values():
+        combined.merge(stats.histogram)
+
+    return {
+        "scenario": scenario.name,
+        "base_url": base_url,
+        "target_rate": rate,
+        "duration_s": round(elapsed, 3),
+        "dropped": totals["dropped"],
+        "schedule_lag_ms_max": round(totals["lag_max"] * 1000, 3),
+        "routes": {name: stats.to_dict(elapsed) for name, stats in routes.items()},
+        "total": _wrap(combined, routes).to_dict(elapsed),
+        "_histograms": {"total": combined, **{name: stats.histogram for name, stats in routes.items()}},
+    }
+
+
+def _wrap(histogram: HdrHistogram, routes: Dict[str, RouteStats]) -> RouteStats:
+    total = RouteStats()
+    total.histogram = histogram
+    total.errors = sum(stats.errors for stats in routes.values())
+    for stats in routes.values():
+        for status, count in stats.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+    return total
+
+
+async def _drive(client, scenario, rng, rate, duration, max_in_flight, routes: Dict[str, RouteStats]):
+    in_flight = set()
+    totals = {"dropped": 0, "lag_max": 0.0}
+
+    async def one(request: Dict[str, Any], intended: float) -> None:
+        stats = routes.get(request["name"])
+        try:
+            response = await client.request(request["method"], request["path"], json=request["json"])
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if stats is None:
+            return
+        stats.histogram.record((time.perf_counter() - intended) * 1_000_000)
+        key = str(status)
+        stats.statuses[key] = stats.statuses.get(key, 0) + 1
+        expect = request["expect"]
+        if not isinstance(status, int) or (status not in expect if expect else not 200 <= status < 300):
+            stats.errors += 1
+
+    async for intended in arrivals(rate, duration):
+        totals["lag_max"] = max(totals["lag_max"], time.perf_counter() - intended)
+        if len(in_flight) >= max_in_flight:
+            totals["dropped"] += 1
+            continue
+        task = asyncio.ensure_future(one(scenario.pick(rng), intended))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return totals
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Scenario {report['scenario']} @ {report['target_rate']} req/s for {report['duration_s']}s → {report['base_url']}",
+        f"{'route':<22}{'count':>8}{'err':>6}{'rps':>9}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}  (ms)",
+    ]
+    for name, stats in [*report["routes"].items(), ("TOTAL", report["total"])]:
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{name:<22}{stats['count']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9}"
+            f"{latency['p50']:>10.3f}{latency['p90']:>10.3f}{latency['p99']:>10.3f}"
+            f"{latency['p99.9']:>10.3f}{latency['max']:>10.3f}"
+        )
+    if report["dropped"]:
+        lines.append(f"WARNING: {report['dropped']} arrivals dropped (max in-flight reached)")
+    # Generator fell behind its own schedule: results understate the offered load
+    if report["schedule_lag_ms_max"] > 100:
+        lines.append(f"WARNING: load generator lagged its schedule by up to {report['schedule_lag_ms_max']} ms")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Open-loop load test for /api/mock/*")
+    parser.add_argument("scenario", help=f"Scenario file or name from {SCENARIOS_DIR.relative_to(BACKEND_DIR)}/")
+    parser.add_argument("--url", help="Target base URL (default: start the app in-process)")
+    parser.add_argument("--rate", type=float, help="Arrival rate override (req/s)")
+    parser.add_argument("--duration", type=float, help="Duration override (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--hgrm-dir", type=Path, help="Write per-route .hgrm percentile distributions here")
+    parser.add_argument("--json", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    scenario = LoadScenario.load(args.scenario)
+
+    if args.url:
+        report = asyncio.run(run_load_test(scenario, args.url, args.rate, args.duration, args.seed))
+    else:
+        configure_environment()
+        from main import app
+        with BackgroundServer(app) as server:
+            report = asyncio.run(run_load_test(scenario, server.url, args.rate, args.duration, args.seed))
+
+    histograms = report.pop("_histograms")
+    print(format_report(report))
+
+    if args.hgrm_dir:
+        args.hgrm_dir.mkdir(parents=True, exist_ok=True)
+        for name, histogram in histograms.items():
+            (args.hgrm_dir / f"{scenario.name}.{name}.hgrm").write_text(histogram.percentile_distribution(), encoding="utf-8")
+        print(f"HDR distributions: {args.hgrm_dir}")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
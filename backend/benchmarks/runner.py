@@ -0,0 +1,161 @@
+"""
+Open-loop load driver: запити стартують за розкладом (target RPS), незалежно від відповідей
+Latency рахується від запланованого старту - без coordinated omission
+"""
+import asyncio
+import os
+import resource
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+def rss_mb() -> float:
+    """Current resident set size (MB)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # No procfs (macOS): fall back to peak RSS (bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    return {
+        "p50": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99": round(percentile(ordered, 0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+class MemorySampler:
+    """Tracks peak RSS while a run is in progress"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start = rss_mb()
+        self.peak = self.start
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            self.peak = max(self.peak, rss_mb())
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "MemorySampler":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._task.cancel()
+        self.end = rss_mb()
+        self.peak = max(self.peak, self.end)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "rss_start_mb": round(self.start, 2),
+            "rss_end_mb": round(self.end, 2),
+            "rss_peak_mb": round(self.peak, 2),
+            "rss_growth_mb": round(self.end - self.start, 2),
+        }
+
+
+async def arrivals(rps: float, duration: float):
+    """Yield scheduled start times (perf_counter) at a fixed rate, sleeping until each one"""
+    interval = 1.0 / rps
+    start = time.perf_counter()
+    for i in range(int(duration * rps)):
+        intended = start + i * interval
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield intended
+
+
+async def run_open_loop(
+    operation: Operation,
+    rps: float,
+    duration: float,
+    warmup: float = 0.0,
+    max_in_flight: int = 1000
+) -> Dict[str, Any]:
+    """
+    Fire `operation` at a fixed arrival rate
+
+    Args:
+        operation: Async callable; raising counts as an error
+        rps: Target arrival rate (requests/second)
+        duration: Measured seconds
+        warmup: Seconds of load before measurement starts (results discarded)
+        max_in_flight: Arrivals beyond this many outstanding calls are dropped (and reported)
+
+    Returns:
+        Run statistics (throughput, latency percentiles, errors, memory)
+    """
+    if warmup > 0:
+        await _drive(operation, rps, warmup, max_in_flight)
+
+    with MemorySampler() as memory:
+        started = time.perf_counter()
+        latencies, errors, dropped, error_types = await _drive(operation, rps, duration, max_in_flight)
+        elapsed = time.perf_counter() - started
+
+    completed = len(latencies)
+    return {
+        "target_rps": rps,
+        "duration_s": round(elapsed, 3),
+        "requests": completed + errors,
+        "errors": errors,
+        "error_types": error_types,
+        "dropped": dropped,
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize(latencies),
+        "memory": memory.to_dict(),
+    }
+
+
+async def _drive(operation: Operation, rps: float, duration: float, max_in_flight: int):
+    latencies: List[float] = []
+    error_types: Dict[str, int] = {}
+    errors = 0
+    dropped = 0
+    in_flight = set()
+
+    async def one(intended: float) -> None:
+        nonlocal errors
+        try:
+            await operation()
+        except Exception as e:
+            errors += 1
+            name = type(e).__name__
+            error_types[name] = error_types.get(name, 0) + 1
+        else:
+            latencies.append(time.perf_counter() - intended)
+
+    async for intended in arrivals(rps, duration):
+        if len(in_flight) >= max_in_flight:
+            dropped += 1
+            continue
+        task = asyncio.ensure_future(one(intended))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return latencies, errors, dropped, error_types
@@ -0,0 +1,97 @@
+"""
+Benchmark scenarios: /api/generate, mock registry routes, MCP tools, MCP pipeline (Ollama + Judge)
+"""
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+GENERATE_PROMPT = "Створити форму реєстрації ФОП з перевіркою в ЄДР та податковій"
+
+REGISTRY_REQUESTS = (
+    ("GET", "/api/mock/edr/12345678", None),
+    ("GET", "/api/mock/tax/1234567890", None),
+    ("GET", "/api/mock/vehicle/AA1234BB", None),
+    ("GET", "/api/mock/diia/documents/passport?inn=1234567890", None),
+    ("GET", "/api/mock/land/3222410100:01:001:0001", None),
+    ("POST", "/api/mock/subsidies/check", {
+        "inn": "1234567890",
+        "full_name": "Шевченко Тарас Григорович",
+        "family_size": 3,
+        "total_monthly_income": 12000,
+        "utilities_cost": 3500,
+    }),
+)
+
+
+def configure_environment(upstream_url: Optional[str] = None) -> None:
+    """
+    Point the app at the fake upstreams (must run before importing main/services)
+
+    Credentials are only defaulted, so a real .env still wins for them.
+    Without `upstream_url` LLM endpoints are left as configured.
+    """
+    if upstream_url:
+        os.environ["LLM_ENDPOINT_GENERATOR"] = f"{upstream_url}/api/generate"
+        os.environ["OPENAI_BASE_URL"] = f"{upstream_url}/v1"
+    os.environ["RATE_LIMIT_REQUESTS"] = "1000000000"
+    # Fake flows must not end up as few-shot examples in data/flows.db
+    os.environ.setdefault("FLOW_STORE_PATH", ":memory:")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    for name in ("CODEMIE_USERNAME", "CODEMIE_PASSWORD", "CODEMIE_API_KEY",
+                 "AGENT_FLOW_GENERATOR", "AGENT_UI_RENDERER", "OPENAI_API_KEY", "OPENAI_API_KEY_JUDGE"):
+        os.environ.setdefault(name, "benchmark")
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _http_operation(client: httpx.AsyncClient, requests) -> Callable[[], Awaitable[Any]]:
+    cycle = itertools.cycle(requests)
+
+    async def operation() -> None:
+        method, path, body = next(cycle)
+        response = await client.request(method, path, json=body)
+        response.raise_for_status()
+
+    return operation
+
+
+def build_operations(client: httpx.AsyncClient) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """Scenario name → async operation (one request / tool call per invocation)"""
+    from services.service_registry import service_registry
+
+    mcp_server = service_registry.get("mcp")
+    from services.mcp_integration import generate_flow_with_mcp
+
+    mcp_calls = itertools.cycle((
+        ("search_diia_component", {"query": "показати помилку користувачу", "limit": 3}),
+        ("call_ukraine_api", {"api_type": "edr", "identifier": "12345678"}),
+        ("validate_flow", {"flow_json": {"steps": [
+            {"step_id": 1, "component": {"component_name": "eligibility_banner"}},
+            {"step_id": 2, "component": {"component_name": "form_step"}, "api_calls": [{"api_type": "edr"}]},
+        ]}}),
+    ))
+
+    async def mcp_tools() -> None:
+        tool_name, kwargs = next(mcp_calls)
+        result = await mcp_server.handle_tool_call(tool_name, **kwargs)
+        if isinstance(result, dict) and "error" in result:
+            raise RuntimeError(result["error"])
+
+    async def mcp_pipeline() -> None:
+        await generate_flow_with_mcp(GENERATE_PROMPT)
+
+    return {
+        "generate": _http_operation(client, [("POST", "/api/generate", {"prompt": GENERATE_PROMPT})]),
+        "registry": _http_operation(client, REGISTRY_REQUESTS),
+        "mcp_tools": mcp_tools,
+        "mcp_pipeline": mcp_pipeline,
+    }
+
+
+SCENARIOS = ("generate", "registry", "mcp_tools", "mcp_pipeline")
@@ -0,0 +1,109 @@
+"""
+Startup benchmark: cold import `main` та час від spawn uvicorn worker до першого 200 на /health
+
+    python -m benchmarks.startup --repeat 5
+    python -m benchmarks.startup --warmup all --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from .scenarios import BACKEND_DIR, configure_environment
+
+_IMPORT_PROBE = (
+    "import time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_cold_import(env: Dict[str, str]) -> float:
+    """Seconds to `import main` in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_worker_spawn(env: Dict[str, str], timeout: float = 60.0) -> float:
+    """Seconds from spawning a uvicorn worker to its first successful /health"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Worker exited with code {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("Worker did not become healthy in time")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _summary(samples: List[float]) -> Dict[str, Any]:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "samples_ms": [round(s * 1000, 1) for s in samples],
+    }
+
+
+def run_startup_benchmark(repeat: int = 5, warmup: str = "") -> Dict[str, Any]:
+    """
+    Args:
+        repeat: Fresh processes per measurement
+        warmup: SERVICE_WARMUP value for the spawned workers
+    """
+    configure_environment()
+    env = {**os.environ, "SERVICE_WARMUP": warmup, "LOOP_WATCHDOG_ENABLED": "false"}
+    return {
+        "repeat": repeat,
+        "service_warmup": warmup,
+        "cold_import": _summary([measure_cold_import(env) for _ in range(repeat)]),
+        "worker_spawn": _summary([measure_worker_spawn(env) for _ in range(repeat)]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Cold-start / worker-spawn timing")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", default="", help='SERVICE_WARMUP for spawned workers ("all", "codemie,judge", ...)')
+    parser.add_argument("--json", help="Write results as JSON")
+    args = parser.parse_args()
+
+    result = run_startup_benchmark(args.repeat, args.warmup)
+    for name in ("cold_import", "worker_spawn"):
+        stats = result[name]
+        print(f"{name:<14} median {stats['median_ms']:>8} ms   min {stats['min_ms']:>8} ms   max {stats['max_ms']:>8} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
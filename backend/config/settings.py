@@ -3,7 +3,7 @@ Centralized Settings using Pydantic BaseSettings
 Reads from environment variables with validation
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -25,13 +25,94 @@ class Settings(BaseSettings):
     cors_origins: str = "http://localhost:3000,http://localhost:3001"
     
     # Rate Limiting
-    rate_limit_requests: int = 10
+    rate_limit_requests: int = 10  # per client, 0 = unlimited
     rate_limit_period: int = 60  # seconds
     
+    # Upstream admission control (CodeMie / Ollama / OpenAI)
+    codemie_max_concurrency: int = 8
+    ollama_max_concurrency: int = 2
+    openai_max_concurrency: int = 8
+    upstream_max_queue: int = 32  # waiters per upstream before 429
+    upstream_rate_limit: float = 0  # requests/sec per upstream, 0 = unlimited
+    upstream_queue_timeout: float = 30  # seconds, sync callers only
+    
+    # Retries: global retry budget + per-upstream circuit breakers
+    retry_budget_ratio: float = 0.2  # max extra load from retries over a 10s window
+    retry_budget_min_retries: int = 3  # retries always allowed per window
+    circuit_failure_threshold: int = 5  # consecutive failures before the circuit opens
+    circuit_recovery_timeout: float = 30  # seconds before a half-open probe
+    
+    # Hedged requests (tail latency); calls must be idempotent
+    hedge_enabled: bool = False
+    hedge_percentile: float = 0.9  # fire hedge after observed p90
+    hedge_max_ratio: float = 0.05  # max share of calls that get hedged
+    hedge_min_samples: int = 20
+    
+    # Tracing: none / file / otlp
+    trace_exporter: str = "none"
+    trace_file: str = "traces.jsonl"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    trace_sample_rate: float = 1.0
+    
+    # Event loop watchdog; strict = fail on shutdown (tests) if the loop was blocked
+    loop_watchdog_enabled: bool = True
+    loop_block_threshold_ms: float = 100
+    loop_block_strict: bool = False
+    
+    # Lazy services built at startup: "" = none (on first use), "all" or comma list
+    # (codemie, dual_llm, judge, mcp, semantic_cache)
+    service_warmup: str = ""
+    
+    # Judge prompt: system + user prompt tokens; RAG context is trimmed to fit
+    judge_max_prompt_tokens: int = 6000
+    
+    # Prompt prefix caching: static system prompts go first and byte-identical;
+    # OpenAI: prompt_cache_key; Ollama: static part as `system`, model (and its KV cache) kept loaded
+    openai_prompt_cache_key: bool = True
+    ollama_prefix_cache: bool = True
+    ollama_keep_alive: str = "30m"
+    
+    # Streaming LLM output: JSON parsed incrementally, malformed output fails mid-stream;
+    # the Judge stream is dropped as soon as a score makes PASSED unreachable
+    llm_stream: bool = True
+    judge_early_abort: bool = True
+    
+    # Template UI renderer: flows built only from known components are rendered from
+    # compiled templates; the CodeMie UI agent handles the rest
+    ui_template_renderer: bool = True
+    ui_fragment_cache_bytes: int = 8 * 1024 * 1024  # rendered steps LRU by total size, 0 = off
+    
+    # Flow store: scored flows (SQLite FTS5), best ones for similar BRDs become Generator few-shot examples
+    flow_store_path: Optional[str] = None  # SQLite file, None = data/flows.db, ":memory:" = per-process only
+    flow_store_few_shot: int = 2  # examples per Generator prompt, 0 = off
+    flow_store_min_score: float = 70.0
+    
+    # Semantic prompt cache in front of /api/generate: paraphrased prompts reuse a cached flow + UI
+    semantic_cache_max_entries: int = 2000  # 0 = off; when full the entry with fewest hits goes
+    semantic_cache_ttl: int = 86400  # seconds
+    semantic_cache_embedder: str = "openai"  # "openai" (local without OPENAI_API_KEY) or "local"
+    semantic_cache_embedding_model: str = "text-embedding-3-small"
+    semantic_cache_threshold: Optional[float] = None  # cosine, None = embedder default (openai 0.85, local 0.9)
+    semantic_cache_opt_out: str = ""  # comma-separated client ids (X-Client-ID) that bypass the cache
+    
     # API Timeouts
     codemie_timeout: int = 30  # seconds
     
+    # Job Queue (async generation mode)
+    job_workers: int = 4
+    job_queue_max_pending: int = 100
+    job_timeout: int = 300  # seconds
+    job_result_ttl: int = 3600  # seconds
+    job_store_path: Optional[str] = None  # SQLite file, None = in-memory only
+    job_store_recover: bool = True  # mark unfinished jobs failed on open (serve.py does it once, in the master)
+    
+    # Multi-worker server (serve.py)
+    web_workers: int = 1
+    graceful_timeout: int = 30  # seconds for in-flight requests on reload / shutdown
+    shared_cache_path: Optional[str] = None  # SQLite file shared by workers, None = per-process memory
+    
     # Security
+    admin_token: Optional[str] = None  # X-Admin-Token for /api/admin/*, None = disabled
     max_prompt_length: int = 2000
     min_prompt_length: int = 10
     
@@ -45,6 +126,11 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins string to list"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
+    
+    @property
+    def semantic_cache_opt_out_list(self) -> List[str]:
+        """Parse semantic cache opt-out tenants to list"""
+        return [tenant.strip() for tenant in self.semantic_cache_opt_out.split(",") if tenant.strip()]
 
 
 # Global settings instance
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -26,11 +27,31 @@ from utils.error_handlers import (
     codemie_api_error_handler,
     ValidationError,
     validation_error_handler,
+    RateLimitError,
+    rate_limit_error_handler,
+    CircuitOpenError,
+    circuit_open_error_handler,
 )
 from utils.http_client import HTTPClientManager
+from services.job_queue import job_queue
+from services.service_registry import service_registry
+from services.semantic_cache import log_semantic_cache_config, semantic_cache_info
+from services.static_data import get_static_data
+from utils.rate_limit import admission
+from utils.retry import breaker_states, retry_budget
+from utils.hedging import hedge_states
+from utils.loop_monitor import loop_watchdog
+from utils.metrics import registry as metrics_registry, MetricsMiddleware
+from utils.tracing import setup_tracing, shutdown_tracing, TracingMiddleware
 
 # Setup structured logging
 logger = setup_logger(settings.log_level)
+setup_tracing(
+    exporter=settings.trace_exporter,
+    file_path=settings.trace_file,
+    otlp_endpoint=settings.otlp_endpoint,
+    sample_rate=settings.trace_sample_rate
+)
 
 
 @asynccontextmanager
@@ -38,11 +59,23 @@ async def lifespan(app: FastAPI):
     """Lifecycle manager for app startup/shutdown"""
     # Startup
     logger.info("Starting Yana.Diia Backend", port=settings.port)
+    if settings.loop_watchdog_enabled:
+        loop_watchdog.start()
+    log_semantic_cache_config()
+    if settings.service_warmup:
+        names = None if settings.service_warmup == "all" else [n.strip() for n in settings.service_warmup.split(",")]
+        await service_registry.warmup(names)
+    await job_queue.start()
     yield
     # Shutdown
     logger.info("Shutting down Yana.Diia Backend")
+    await job_queue.stop()
+    await service_registry.shutdown()
     # Cleanup HTTP client connections
     await HTTPClientManager.close()
+    shutdown_tracing()
+    # Strict mode raises here if the loop was blocked during the run
+    await loop_watchdog.stop()
 
 
 # Create FastAPI app
@@ -62,11 +95,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (pure ASGI - low overhead)
+app.add_middleware(MetricsMiddleware)
+# Tracing is outermost so the server span covers everything below
+app.add_middleware(TracingMiddleware)
+
 # Register exception handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, request_validation_error_handler)
 app.add_exception_handler(CodeMieAPIError, codemie_api_error_handler)
 app.add_exception_handler(ValidationError, validation_error_handler)
+app.add_exception_handler(RateLimitError, rate_limit_error_handler)
+app.add_exception_handler(CircuitOpenError, circuit_open_error_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
 
@@ -74,19 +114,41 @@ app.add_exception_handler(Exception, generic_exception_handler)
 async def health_check():
     """Health check endpoint"""
     from datetime import datetime
+    breakers = breaker_states()
+    degraded = any(b["state"] != "closed" for b in breakers.values())
     return {
-        "status": "ok",
+        "status": "degraded" if degraded else "ok",
         "service": "yana-diia-backend",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "circuit_breakers": breakers,
+        "retry_budget": retry_budget.snapshot(),
+        "hedging": hedge_states(),
+        "admission": admission.snapshot(),
+        "job_queue": {"pending": job_queue.pending},
+        "services": service_registry.snapshot(),
+        "semantic_cache": semantic_cache_info(),
+        "static_data": {key: value for key, value in get_static_data().info().items() if key != "path"},
+        "event_loop": loop_watchdog.snapshot()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Import routes
-from routes import generate, registry
+from routes import generate, registry, jobs, admin
 
 app.include_router(generate.router, prefix="/api", tags=["generate"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 app.include_router(registry.router, prefix="/api", tags=["registry"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
 
 
 
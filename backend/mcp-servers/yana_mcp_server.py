@@ -6,6 +6,10 @@ import os
 import json
 from typing import Dict, Any, List, Optional
 import structlog
+from utils.metrics import track_stage
+from services.component_catalog import component_catalog
+from services.static_data import static_data
+from services.rubric_engine import rubric_engine
 
 logger = structlog.get_logger()
 
@@ -22,74 +26,8 @@ class ComponentSearchTool:
         # TODO: Initialize Weaviate client when ready
         self.mock_mode = True  # Demo Day fallback
         
-        # Mock component database
-        self.mock_components = {
-            "eligibility_banner": {
-                "component_name": "eligibility_banner",
-                "display_name": "Банер Перевірки Права",
-                "category": "banner",
-                "usage_context": "Показати результат автоматичної перевірки права на послугу через API",
-                "props_schema": {
-                    "eligible": "boolean",
-                    "title": "string",
-                    "message": "string",
-                    "actionLabel": "string"
-                },
-                "example_code": "<EligibilityBanner eligible={true} title='Ви маєте право' />"
-            },
-            "error_modal": {
-                "component_name": "error_modal",
-                "display_name": "Модальне Вікно Помилки",
-                "category": "modal",
-                "usage_context": "Показати критичну помилку або блокуючу ситуацію",
-                "props_schema": {
-                    "title": "string (required)",
-                    "description": "string",
-                    "primaryAction": "object",
-                    "secondaryAction": "object"
-                },
-                "example_code": "<ErrorModal title='Помилка' description='Сервіс недоступний' />"
-            },
-            "form_step": {
-                "component_name": "form_step",
-                "display_name": "Крок Форми",
-                "category": "form",
-                "usage_context": "Багатокроковий флоу з формами, валідацією, навігацією",
-                "props_schema": {
-                    "stepNumber": "number",
-                    "totalSteps": "number",
-                    "fields": "array",
-                    "onNext": "function",
-                    "onBack": "function"
-                },
-                "example_code": "<FormStep stepNumber={1} totalSteps={4} fields={[...]} />"
-            },
-            "recipient_card_single": {
-                "component_name": "recipient_card_single",
-                "display_name": "Картка Отримувача",
-                "category": "card",
-                "usage_context": "Відобразити дані отримувача, завантажені через API (ПІБ, РНОКПП)",
-                "props_schema": {
-                    "fullName": "string",
-                    "inn": "string",
-                    "address": "string",
-                    "editable": "boolean (default: false)"
-                },
-                "example_code": "<RecipientCardSingle fullName='Шевченко Т.Г.' inn='1234567890' />"
-            },
-            "unavailable_banner": {
-                "component_name": "unavailable_banner",
-                "display_name": "Банер Недоступності",
-                "category": "banner",
-                "usage_context": "Послуга тимчасово недоступна через технічні причини",
-                "props_schema": {
-                    "title": "string",
-                    "reason": "string",
-                    "estimatedRestore": "string"
-                },
-                "example_code": "<UnavailableBanner title='Послуга недоступна' reason='Технічні роботи' />"
-            }
-        }
+        # Shared component catalog (data/components.json)
+        self.catalog = component_catalog
     
     async def search(self, query: str, limit: int = 1) -> List[Dict[str, Any]]:
         """
@@ -105,21 +43,8 @@ class ComponentSearchTool:
         logger.info("Component search", query=query, mock_mode=self.mock_mode)
         
         if self.mock_mode:
-            # Simple keyword matching for demo
-            query_lower = query.lower()
-            results = []
-            
-            for comp_name, comp_data in self.mock_components.items():
-                if any(keyword in query_lower for keyword in [
-                    'помилк' if 'error' in comp_name else '',
-                    'форм' if 'form' in comp_name else '',
-                    'перевірк' if 'eligibility' in comp_name else '',
-                    'недоступн' if 'unavailable' in comp_name else '',
-                    'картк' if 'card' in comp_name else ''
-                ]):
-                    results.append(comp_data)
-            
-            return results[:limit] if results else [self.mock_components["form_step"]]
+            # Keyword search over the catalog index, form_step when nothing matches
+            return [component.to_dict() for component in self.catalog.search(query, limit)]
         
         # TODO: Real Weaviate search
         # client.query.get("DiiaComponent", [...]).with_near_text({"concepts": [query]})
@@ -199,32 +124,33 @@ class FlowValidatorTool:
     """
     
     def __init__(self):
-        self.weights = {
-            "flow_length": 0.25,
-            "component_compliance": 0.30,
-            "wcag": 0.20,
-            "screen_saturation": 0.15,
-            "api_dependency": 0.10
-        }
+        rubric = static_data.section("rubric")["validator"]
+        self.weights = rubric["weights"]
+        self.pass_threshold = rubric["pass_threshold"]
+        self.engine = rubric_engine
     
-    async def validate(self, flow_json: Dict[str, Any]) -> Dict[str, Any]:
+    async def validate(self, flow_json: Dict[str, Any], html: Optional[str] = None) -> Dict[str, Any]:
         """
         Оцінити flow за 5 критеріями
         
         Args:
             flow_json: DiiaFlow JSON object
+            html: Згенерований UI (optional) для WCAG перевірок
             
         Returns:
             Scores та feedback
         """
         logger.info("Flow validation", flow_id=flow_json.get("flow_id", "unknown"))
         
+        # Local rule checks (catalog, props_schema, WCAG, registry fields)
+        report = self.engine.check(flow_json, html)
+        
         scores = {
             "flow_length_score": self._score_flow_length(flow_json),
-            "component_compliance_score": self._score_component_compliance(flow_json),
-            "wcag_score": self._score_wcag(flow_json),
+            "component_compliance_score": report["component_compliance_score"],
+            "wcag_score": report["wcag_score"],
             "screen_saturation_score": self._score_screen_saturation(flow_json),
-            "api_dependency_score": self._score_api_dependency(flow_json),
+            "api_dependency_score": self._score_api_dependency(flow_json, report),
         }
         
         # Calculate weighted total
@@ -233,13 +159,14 @@ class FlowValidatorTool:
             for key in scores
         )
         
-        issues = self._find_issues(flow_json, scores)
+        issues = report["issues"] + self._find_issues(flow_json, scores)
         
         return {
             "total_score": round(total_score, 2),
             "breakdown": scores,
-            "passed": total_score >= 70,
+            "passed": total_score >= self.pass_threshold,
             "issues": issues,
+            "manual_input_fields": report["manual_input_fields"],
             "suggestions": self._generate_suggestions(flow_json, scores)
         }
     
@@ -258,16 +185,6 @@ class FlowValidatorTool:
         else:
             return max(50, 100 - (num_steps - 7) * 5)  # Penalize long flows
     
-    def _score_component_compliance(self, flow: Dict) -> float:
-        """All components must be from Diia Design System"""
-        # Mock: assume all components are valid for demo
-        return 95
-    
-    def _score_wcag(self, flow: Dict) -> float:
-        """WCAG AA compliance"""
-        # Mock: return high score for demo
-        return 85
-    
     def _score_screen_saturation(self, flow: Dict) -> float:
         """Cognitive load check"""
         steps = flow.get("steps", [])
@@ -282,8 +199,8 @@ class FlowValidatorTool:
         else:
             return max(60, 90 - (avg_fields_per_step - 5) * 5)
     
-    def _score_api_dependency(self, flow: Dict) -> float:
-        """Penalize manual input when API available"""
+    def _score_api_dependency(self, flow: Dict, report: Dict) -> float:
+        """Reward API usage, penalize manual input of data available from registries"""
         steps = flow.get("steps", [])
         api_steps = sum(1 for step in steps if step.get("api_calls"))
         
@@ -291,7 +208,7 @@ class FlowValidatorTool:
             return 50
         
         api_ratio = api_steps / len(steps)
-        return min(100, api_ratio * 150)  # Reward API usage
+        return max(0, min(100, api_ratio * 150) - report["manual_input_penalty"])
     
     def _find_issues(self, flow: Dict, scores: Dict) -> List[Dict]:
         """Identify specific issues"""
@@ -334,6 +251,8 @@ class YanaMCPServer:
     Provides tools для Generator та Judge LLMs
     """
     
+    TOOLS = ("search_diia_component", "call_ukraine_api", "validate_flow")
+    
     def __init__(self):
         self.component_search = ComponentSearchTool()
         self.api_caller = APICallerTool()
@@ -355,6 +274,11 @@ class YanaMCPServer:
         Returns:
             Tool result
         """
+        stage = f"mcp.{tool_name}" if tool_name in self.TOOLS else "mcp.unknown"
+        with track_stage(stage):
+            return await self._dispatch(tool_name, **kwargs)
+    
+    async def _dispatch(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         if tool_name == "search_diia_component":
             return await self.component_search.search(
                 query=kwargs.get("query", ""),
@@ -363,20 +287,26 @@ class YanaMCPServer:
         
         elif tool_name == "call_ukraine_api":
             return await self.api_caller.call_api(
-                api_type=kwargs.get("api_type"),
-                identifier=kwargs.get("identifier"),
+                api_type=kwargs.pop("api_type", None),
+                identifier=kwargs.pop("identifier", None),
                 **kwargs
             )
         
         elif tool_name == "validate_flow":
             return await self.flow_validator.validate(
-                flow_json=kwargs.get("flow_json", {})
+                flow_json=kwargs.get("flow_json", {}),
+                html=kwargs.get("html")
             )
         
         else:
             return {"error": f"Unknown tool: {tool_name}"}
 
 
-# ==================== Instantiate Server ====================
+# ==================== Lazy Server Instance ====================
 
-mcp_server = YanaMCPServer()
+def __getattr__(name: str):
+    # `mcp_server` is built on first access (see services.service_registry)
+    if name == "mcp_server":
+        from services.service_registry import service_registry
+        return service_registry.get("mcp")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
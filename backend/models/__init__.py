@@ -1,15 +1,19 @@
 """
 Data models package for Yana.Diia Backend
 """
-from .request_models import GenerateRequest
-from .response_models import GenerateResponse, StatusResponse, HealthResponse
+from .request_models import GenerateRequest, JobCreateRequest, RegenerateRequest
+from .response_models import GenerateResponse, RegenerateResponse, StatusResponse, HealthResponse, JobResponse
 from .flow_models import FlowStep, Flow
 
 __all__ = [
     "GenerateRequest",
+    "JobCreateRequest",
+    "RegenerateRequest",
     "GenerateResponse",
+    "RegenerateResponse",
     "StatusResponse",
     "HealthResponse",
+    "JobResponse",
     "FlowStep",
     "Flow",
 ]
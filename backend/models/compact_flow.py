@@ -0,0 +1,134 @@
+"""
+Compact in-memory flow representation для кешів, batch judging та аналітики
+Slotted об'єкти замість pydantic моделей / nested dicts: повторювані рядки (типи, імена й labels полів, id кроків)
+interned, списки - tuples. Конвертація в/з Flow (models/flow_models.py) без втрат
+"""
+import sys
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .flow_models import Flow, FlowField, FlowStep
+
+
+class CompactField:
+    """FlowField: name / type / label interned"""
+
+    __slots__ = ("name", "type", "label", "required", "placeholder")
+
+    def __init__(self, name: str, type: str, label: str, required: bool = True, placeholder: Optional[str] = None):
+        self.name = sys.intern(name)
+        self.type = sys.intern(type)
+        self.label = sys.intern(label)
+        self.required = required
+        self.placeholder = placeholder
+
+    @classmethod
+    def from_model(cls, field: FlowField) -> "CompactField":
+        return cls(field.name, field.type, field.label, field.required, field.placeholder)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CompactField":
+        return cls(data["name"], data["type"], data["label"], data.get("required", True), data.get("placeholder"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "type": self.type, "label": self.label,
+                "required": self.required, "placeholder": self.placeholder}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompactField) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CompactField({self.name!r}, {self.type!r})"
+
+
+class CompactStep:
+    """FlowStep: id / type interned, fields - tuple (None stays None)"""
+
+    __slots__ = ("id", "type", "title", "message", "fields")
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        title: str,
+        message: Optional[str] = None,
+        fields: Optional[Tuple[CompactField, ...]] = None
+    ):
+        self.id = sys.intern(id)
+        self.type = sys.intern(type)
+        self.title = title
+        self.message = message
+        self.fields = fields
+
+    @classmethod
+    def from_model(cls, step: FlowStep) -> "CompactStep":
+        fields = None if step.fields is None else tuple(CompactField.from_model(field) for field in step.fields)
+        return cls(step.id, step.type, step.title, step.message, fields)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CompactStep":
+        fields = data.get("fields")
+        if fields is not None:
+            fields = tuple(CompactField.from_dict(field) for field in fields)
+        return cls(data["id"], data["type"], data["title"], data.get("message"), fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        fields = None if self.fields is None else [field.to_dict() for field in self.fields]
+        return {"id": self.id, "type": self.type, "title": self.title, "message": self.message, "fields": fields}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompactStep) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CompactStep({self.id!r}, {self.type!r})"
+
+
+class CompactFlow:
+    """
+    Flow with compact steps
+
+    Example:
+        compact = CompactFlow.from_model(flow)
+        assert compact.to_model() == flow
+    """
+
+    __slots__ = ("id", "name", "description", "steps", "metadata")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        steps: Tuple[CompactStep, ...],
+        description: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.steps = steps
+        self.metadata = metadata
+
+    @classmethod
+    def from_model(cls, flow: Flow) -> "CompactFlow":
+        return cls(flow.id, flow.name, tuple(CompactStep.from_model(step) for step in flow.steps),
+                   flow.description, flow.metadata)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CompactFlow":
+        """From a Flow-shaped dict (already validated, e.g. model_dump() or a cached response)"""
+        return cls(data["id"], data["name"], tuple(CompactStep.from_dict(step) for step in data["steps"]),
+                   data.get("description"), data.get("metadata"))
+
+    def to_model(self) -> Flow:
+        # model_validate (pydantic-core) beats the pure-Python model_construct on nested models
+        return Flow.model_validate(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same as Flow.model_dump()"""
+        return {"id": self.id, "name": self.name, "description": self.description,
+                "steps": [step.to_dict() for step in self.steps], "metadata": self.metadata}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompactFlow) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CompactFlow({self.id!r}, steps={len(self.steps)})"
@@ -1,9 +1,11 @@
 """
 Request models for API endpoints
 """
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, Literal, List, Dict, Any
 from utils.validators import validate_prompt, sanitize_input
+from utils.metrics import track_stage
+from services.flow_diff import check_steps
 
 
 class GenerateRequest(BaseModel):
@@ -26,11 +28,12 @@ class GenerateRequest(BaseModel):
     @classmethod
     def validate_and_sanitize_prompt(cls, v: str) -> str:
         """Validate and sanitize prompt"""
-        # Sanitize input
-        sanitized = sanitize_input(v)
-        
-        # Validate
-        is_valid, error_msg = validate_prompt(sanitized)
+        with track_stage("validation"):
+            # Sanitize input
+            sanitized = sanitize_input(v)
+            
+            # Validate
+            is_valid, error_msg = validate_prompt(sanitized)
         if not is_valid:
             raise ValueError(error_msg)
         
@@ -43,3 +46,75 @@ class GenerateRequest(BaseModel):
                 "model": None
             }
         }
+
+
+class JobCreateRequest(GenerateRequest):
+    """Request model for /jobs endpoint (async generation mode)"""
+    
+    priority: Literal["high", "normal", "low"] = Field(
+        "normal",
+        description="Пріоритет задачі в черзі"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "prompt": "Створити форму для реєстрації ФОП з перевіркою через ЄДР",
+                "priority": "normal"
+            }
+        }
+
+
+class RegenerateRequest(BaseModel):
+    """Request model for /generate/diff endpoint (incremental re-generation)"""
+    
+    previous_flow: Dict[str, Any] = Field(
+        ...,
+        description="Flow з попередньої відповіді /generate"
+    )
+    
+    previous_ui: Optional[str] = Field(
+        None,
+        description="UI з попередньої відповіді /generate"
+    )
+    
+    prompt: Optional[str] = Field(
+        None,
+        min_length=10,
+        max_length=2000,
+        description="Змінений prompt (flow генерується заново, кроки порівнюються за id)"
+    )
+    
+    edited_steps: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Відредаговані кроки (за id); нові id додаються в кінець"
+    )
+    
+    @field_validator('prompt')
+    @classmethod
+    def validate_and_sanitize_prompt(cls, v: Optional[str]) -> Optional[str]:
+        """Same checks as GenerateRequest.prompt"""
+        return GenerateRequest.validate_and_sanitize_prompt(v) if v is not None else v
+    
+    @model_validator(mode="after")
+    def check_change(self) -> "RegenerateRequest":
+        """Something to regenerate, and steps carry unique ids to match on"""
+        if self.prompt is None and not self.edited_steps:
+            raise ValueError("prompt or edited_steps is required")
+        check_steps(self.previous_flow.get("steps") or [])
+        check_steps(self.edited_steps or [])
+        return self
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "previous_flow": {
+                    "id": "flow_001",
+                    "name": "Реєстрація у Дія",
+                    "steps": [{"id": "step_1", "type": "form", "title": "Введіть дані", "fields": []}]
+                },
+                "previous_ui": "<div>...</div>",
+                "edited_steps": [{"id": "step_1", "type": "form", "title": "Контактні дані", "fields": []}]
+            }
+        }
+
@@ -2,7 +2,7 @@
 Response models for API endpoints
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class GenerateResponse(BaseModel):
@@ -18,6 +18,11 @@ class GenerateResponse(BaseModel):
         description="HTML/Tailwind UI prototype"
     )
     
+    wcag: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Static WCAG 2.1 AA report for ui (score, issues)"
+    )
+    
     status: str = Field(
         ...,
         description="Status: ready, processing, error"
@@ -49,6 +54,49 @@ class GenerateResponse(BaseModel):
         }
 
 
+class RegenerateResponse(BaseModel):
+    """Response model for /generate/diff endpoint"""
+    
+    patch: List[Dict[str, Any]] = Field(
+        ...,
+        description="RFC 6902 JSON patch against the previous output {\"flow\": ..., \"ui\": ...}"
+    )
+    
+    changed_steps: List[str] = Field(
+        default_factory=list,
+        description="Ids of added / changed steps (regenerated and re-rendered)"
+    )
+    
+    removed_steps: List[str] = Field(
+        default_factory=list,
+        description="Ids of removed steps"
+    )
+    
+    wcag: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Static WCAG 2.1 AA report for the new ui (None when ui did not change)"
+    )
+    
+    status: str = Field(
+        ...,
+        description="Status: ready, error"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "patch": [
+                    {"op": "replace", "path": "/flow/steps/0", "value": {"id": "step_1", "type": "form", "title": "Контактні дані"}},
+                    {"op": "replace", "path": "/ui", "value": "<div>...</div>"}
+                ],
+                "changed_steps": ["step_1"],
+                "removed_steps": [],
+                "wcag": {"score": 100, "issues": []},
+                "status": "ready"
+            }
+        }
+
+
 class StatusResponse(BaseModel):
     """Response model for /status endpoint"""
     
@@ -100,3 +148,37 @@ class HealthResponse(BaseModel):
         None,
         description="Current timestamp"
     )
+
+
+class JobResponse(BaseModel):
+    """Response model for /jobs endpoints"""
+    
+    job_id: str = Field(..., description="Job ID")
+    
+    status: str = Field(
+        ...,
+        description="Status: queued, running, completed, failed, cancelled"
+    )
+    
+    stage: Optional[str] = Field(
+        None,
+        description="Current pipeline stage (generate_flow, generate_ui)"
+    )
+    
+    progress: float = Field(0.0, description="Progress 0.0-1.0")
+    
+    priority: str = Field(..., description="Job priority")
+    
+    result: Optional[Dict[str, Any]] = Field(
+        None,
+        description="GenerateResponse payload when status=completed"
+    )
+    
+    error: Optional[str] = Field(
+        None,
+        description="Error message if status=failed"
+    )
+    
+    created_at: float = Field(..., description="Unix timestamp")
+    started_at: Optional[float] = Field(None, description="Unix timestamp")
+    finished_at: Optional[float] = Field(None, description="Unix timestamp")
@@ -0,0 +1,63 @@
+"""
+Admin API Routes (діагностика живого worker)
+Доступ лише з X-Admin-Token == ADMIN_TOKEN; без ADMIN_TOKEN endpoints вимкнені
+"""
+import asyncio
+import secrets
+import threading
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import structlog
+from config import settings
+from utils.profiler import profile
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """FastAPI dependency: admin token check"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def run_profiler(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    thread: Literal["loop", "all"] = "loop"
+):
+    """
+    Sample stacks for N seconds and return collapsed stacks
+
+    thread=loop keeps only the event loop thread (shows what blocks it);
+    thread=all includes worker threads. Render with flamegraph.pl or speedscope.
+    """
+    # Async handlers run on the event loop thread
+    loop_thread = threading.get_ident() if thread == "loop" else None
+    profiler = await asyncio.to_thread(profile, seconds, interval_ms / 1000, loop_thread)
+    if profiler is None:
+        raise HTTPException(status_code=409, detail="Profiling already in progress")
+
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Profile-Stacks": str(len(profiler.stacks)),
+        }
+    )
+
+
+@router.post("/admin/catalog/reload", dependencies=[Depends(require_admin)])
+async def reload_component_catalog():
+    """
+    Re-read data/components.json into this worker's component catalog
+
+    Only changed components are re-indexed; returns their names.
+    """
+    from services.component_catalog import component_catalog
+    diff = await asyncio.to_thread(component_catalog.reload)
+    return {"version": component_catalog.version, "components": len(component_catalog), **diff}
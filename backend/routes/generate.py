@@ -1,10 +1,14 @@
 """
 API Routes для генерації flows та UI
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+from fastapi import APIRouter, HTTPException, Response, status, Depends
 import structlog
 from services.codemie_service import CodeMieService
-from models import GenerateRequest, GenerateResponse, StatusResponse
+from services.service_registry import service_registry
+from models import GenerateRequest, GenerateResponse, RegenerateRequest, RegenerateResponse, StatusResponse
+from utils.error_handlers import CodeMieAPIError, RateLimitError, CircuitOpenError
+from utils.rate_limit import enforce_client_rate_limit
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -13,10 +17,10 @@ router = APIRouter()
 def get_codemie_service() -> CodeMieService:
     """
     Dependency injection for CodeMie service
-    Lazy initialization - creates service on first request
+    Lazy singleton - created on first request (or at startup warmup)
     """
     try:
-        return CodeMieService()
+        return service_registry.get("codemie")
     except Exception as e:
         logger.error("Failed to initialize CodeMie service", error=str(e))
         raise HTTPException(
@@ -25,10 +29,19 @@ def get_codemie_service() -> CodeMieService:
         )
 
 
+async def get_semantic_cache():
+    """Lazy semantic cache; the first build (OpenAI SDK import) runs off the event loop"""
+    if service_registry.is_initialized("semantic_cache"):
+        return service_registry.get("semantic_cache")
+    return await asyncio.to_thread(service_registry.get, "semantic_cache")
+
+
 @router.post("/generate", response_model=GenerateResponse, status_code=status.HTTP_200_OK)
 async def generate(
     request: GenerateRequest,
-    service: CodeMieService = Depends(get_codemie_service)
+    response: Response,
+    service: CodeMieService = Depends(get_codemie_service),
+    client_id: str = Depends(enforce_client_rate_limit)
 ):
     """
     Generate flow and UI prototype from prompt
@@ -37,17 +50,35 @@ async def generate(
     1. Generate flow structure (Agent 1)
     2. Generate UI prototype (Agent 2)
     
+    A semantic cache answers paraphrases of earlier prompts without
+    generation (X-Semantic-Cache: hit / miss / bypass)
+    
     Returns complete flow + UI or error
     """
-    logger.info("Received generate request", prompt_length=len(request.prompt))
+    logger.info("Received generate request", prompt_length=len(request.prompt), client_id=client_id)
     
     try:
+        semantic_cache = await get_semantic_cache()
+        cached, embedding, similarity = await semantic_cache.lookup(request.prompt, client_id)
+        if cached is not None:
+            response.headers["X-Semantic-Cache"] = f"hit; similarity={similarity:.3f}"
+            return GenerateResponse(**cached, prompt=request.prompt)
+        response.headers["X-Semantic-Cache"] = "miss" if semantic_cache.enabled_for(client_id) else "bypass"
+        
         # Call CodeMie service
         result = await service.generate_complete(request.prompt)
+        if result.get("status") == "ready":
+            await semantic_cache.store(
+                request.prompt, embedding,
+                {key: result[key] for key in ("flow", "ui", "wcag", "status") if key in result},
+                client_id
+            )
         
         # Return response
         return GenerateResponse(**result)
         
+    except (RateLimitError, CircuitOpenError):
+        raise  # handled by dedicated handlers (429/503 + Retry-After)
     except ValueError as e:
         logger.error("Validation error", error=str(e))
         raise HTTPException(
@@ -68,6 +99,51 @@ async def generate(
         )
 
 
+@router.post("/generate/diff", response_model=RegenerateResponse, status_code=status.HTTP_200_OK)
+async def generate_diff(
+    request: RegenerateRequest,
+    service: CodeMieService = Depends(get_codemie_service),
+    client_id: str = Depends(enforce_client_rate_limit)
+):
+    """
+    Incremental re-generation for iterative design sessions
+    
+    Works out which steps of the previous flow changed (edited steps or a
+    modified prompt), re-renders only those and returns a JSON patch
+    against the previous {"flow", "ui"} output
+    """
+    logger.info(
+        "Received generate diff request",
+        edited_steps=len(request.edited_steps or ()),
+        has_prompt=request.prompt is not None,
+        client_id=client_id
+    )
+    
+    try:
+        result = await service.regenerate(
+            request.previous_flow,
+            prompt=request.prompt,
+            edited_steps=request.edited_steps,
+            previous_ui=request.previous_ui
+        )
+        return RegenerateResponse(**result)
+        
+    except (RateLimitError, CircuitOpenError, CodeMieAPIError):
+        raise
+    except ValueError as e:
+        logger.error("Validation error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid input: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("Unexpected error", error=str(e), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error: {str(e)}"
+        )
+
+
 @router.get("/status", response_model=StatusResponse)
 async def status_check(service: CodeMieService = Depends(get_codemie_service)):
     """Check if CodeMie service is available"""
@@ -0,0 +1,110 @@
+"""
+API Routes для асинхронного режиму генерації (Job Queue)
+POST /jobs → job_id одразу, результат через polling або SSE
+"""
+import asyncio
+import json
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+import structlog
+from services.job_queue import JobNotOwnedError, job_queue
+from models import JobCreateRequest, JobResponse
+from utils.rate_limit import enforce_client_rate_limit
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+# Keep-alive comment interval for SSE streams (seconds)
+SSE_KEEPALIVE = 15.0
+# Job store polling interval for jobs processed by another worker (seconds)
+SSE_POLL_INTERVAL = 1.0
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    body: JobCreateRequest,
+    client_id: str = Depends(enforce_client_rate_limit)
+):
+    """
+    Submit generation job (returns immediately)
+
+    Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events.
+    Full queue → 429 with Retry-After.
+    """
+    job = job_queue.submit(body.prompt, client_id=client_id, priority=body.priority)
+    return JobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get job status and result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job не знайдено")
+    return JobResponse(**job.to_dict())
+
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel queued or running job (409 if another worker processes it)"""
+    try:
+        job = job_queue.cancel(job_id)
+    except JobNotOwnedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job не знайдено")
+    return JobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events stream with job progress updates
+
+    Jobs of this worker are pushed as they change; jobs processed by another
+    worker (shared job store) are polled from the store.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job не знайдено")
+
+    queue = job_queue.subscribe(job_id)
+    polling = not job.is_terminal and not job_queue.owns(job)
+
+    async def poll_store(last: Dict[str, Any]) -> Dict[str, Any]:
+        waited = 0.0
+        while waited < SSE_KEEPALIVE:
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            waited += SSE_POLL_INTERVAL
+            current = job_queue.get(job_id)
+            if current is not None and current.to_dict() != last:
+                return current.to_dict()
+        raise asyncio.TimeoutError
+
+    async def event_stream():
+        event: Dict[str, Any] = {}
+        try:
+            while True:
+                try:
+                    if polling and queue.empty():
+                        event = await poll_store(event)
+                    else:
+                        event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield f"event: {event['status']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["status"] in ("completed", "failed", "cancelled"):
+                    return
+        finally:
+            job_queue.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -6,6 +6,8 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import structlog
+from utils.metrics import track_stage
+from services.static_data import static_data
 
 logger = structlog.get_logger()
 
@@ -13,75 +15,15 @@ router = APIRouter()
 
 # ==================== Mock Data ====================
 
-# ЄДР (Єдиний Державний Реєстр)
-MOCK_EDR_DATA = {
-    "12345678": {
-        "edrpou": "12345678",
-        "name": "ФОП Іваненко Іван Петрович",
-        "type": "fop",
-        "status": "active",
-        "registration_date": "2020-01-15",
-        "kved": [{"code": "62.01", "description": "Комп'ютерне програмування"}],
-        "address": {"region": "Київська область", "city": "Київ", "street": "вул. Хрещатик, 1"}
-    },
-    "87654321": {
-        "edrpou": "87654321",
-        "name": "ТОВ 'Діджитал Солюшнс'",
-        "type": "tov",
-        "status": "active",
-        "registration_date": "2018-03-20",
-        "kved": [{"code": "62.01", "description": "Комп'ютерне програмування"}],
-        "authorized_capital": 500000
-    }
-}
-
-# Податкова
-MOCK_TAX_DATA = {
-    "1234567890": {
-        "inn": "1234567890",
-        "taxpayer_type": "fop",
-        "registration_date": "2020-01-15",
-        "tax_status": "active",
-        "debts": {"has_debt": False, "total_amount": 0},
-        "last_declaration": {"period": "2024-Q3", "submitted_at": "2024-10-15", "tax_paid": 15000},
-        "privileges": {"simplified_tax": True, "group": 2, "rate": 5}
-    }
-}
-
-# Транспорт
-MOCK_VEHICLE_DATA = {
-    "AA1234BB": {
-        "license_plate": "AA1234BB",
-        "vin": "WBADT43452G123456",
-        "vehicle": {"brand": "BMW", "model": "X5", "year": 2019, "color": "Чорний"},
-        "owner": {"inn": "1234567890", "name": "Шевченко Тарас Григорович"},
-        "technical_inspection": {"valid_until": "2025-05-09"}
-    }
-}
-
-# Diia Documents
-MOCK_DIIA_DOCS = {
-    "passport": {
-        "1234567890": {
-            "document_type": "passport",
-            "data": {
-                "series": "ЕН",
-                "number": "123456",
-                "issued_by": "Дніпровським РВ ГУ ДМС України",
-                "issued_date": "2022-03-15",
-                "valid_until": "2032-03-15",
-                "full_name": "Шевченко Тарас Григорович",
-                "birth_date": "1990-05-20",
-                "gender": "Ч",
-                "inn": "1234567890"
-            }
-        }
-    }
-}
+# Datasets live in data/registry.json and are served from the memory-mapped snapshot
+MOCK_EDR_DATA = static_data.section("registry.edr")  # ЄДР (Єдиний Державний Реєстр)
+MOCK_TAX_DATA = static_data.section("registry.tax")  # Податкова
+MOCK_VEHICLE_DATA = static_data.section("registry.vehicle")  # Транспорт
 
 # ==================== API Routes ====================
 
 @router.get("/mock/edr/{edrpou}")
+@track_stage("registry.edr")
 async def get_edr_data(edrpou: str) -> Dict[str, Any]:
     """Mock ЄДР API - Дані про ФОП/Компанії"""
     logger.info("EDR mock API called", edrpou=edrpou)
@@ -93,6 +35,7 @@ async def get_edr_data(edrpou: str) -> Dict[str, Any]:
 
 
 @router.get("/mock/tax/{inn}")
+@track_stage("registry.tax")
 async def get_tax_data(inn: str) -> Dict[str, Any]:
     """Mock Tax API - Податкові дані"""
     logger.info("Tax mock API called", inn=inn)
@@ -104,6 +47,7 @@ async def get_tax_data(inn: str) -> Dict[str, Any]:
 
 
 @router.get("/mock/vehicle/{plate}")
+@track_stage("registry.vehicle")
 async def get_vehicle_data(plate: str) -> Dict[str, Any]:
     """Mock Vehicle Registry - Дані про транспорт"""
     logger.info("Vehicle mock API called", plate=plate)
@@ -121,17 +65,19 @@ async def get_vehicle_data(plate: str) -> Dict[str, Any]:
 
 
 @router.get("/mock/diia/documents/{doc_type}")
+@track_stage("registry.diia_documents")
 async def get_diia_document(doc_type: str, inn: str) -> Dict[str, Any]:
     """Mock Diia Documents API"""
     logger.info("Diia docs mock API called", doc_type=doc_type, inn=inn)
     
-    if doc_type not in MOCK_DIIA_DOCS:
+    documents = static_data.get_section(f"registry.diia_docs.{doc_type}")
+    if documents is None:
         raise HTTPException(status_code=400, detail=f"Тип документу '{doc_type}' не підтримується")
     
-    if inn not in MOCK_DIIA_DOCS[doc_type]:
+    if inn not in documents:
         raise HTTPException(status_code=404, detail="Документ не знайдено")
     
-    return MOCK_DIIA_DOCS[doc_type][inn]
+    return documents[inn]
 
 
 # ==================== Subsidy Check ====================
@@ -145,6 +91,7 @@ class SubsidyRequest(BaseModel):
 
 
 @router.post("/mock/subsidies/check")
+@track_stage("registry.subsidies")
 async def check_subsidy_eligibility(request: SubsidyRequest) -> Dict[str, Any]:
     """Mock Subsidy API - Перевірка права на субсидію"""
     logger.info("Subsidy check called", inn=request.inn)
@@ -175,6 +122,7 @@ async def check_subsidy_eligibility(request: SubsidyRequest) -> Dict[str, Any]:
 # ==================== Land Cadastre ====================
 
 @router.get("/mock/land/{cadastral_number}")
+@track_stage("registry.land")
 async def get_land_data(cadastral_number: str) -> Dict[str, Any]:
     """Mock Land Cadastre API"""
     logger.info("Land cadastre called", cadastral_number=cadastral_number)
@@ -0,0 +1,38 @@
+"""
+Build step: компілює backend/data/*.json (components, API specs, rubric, registry datasets) у data/snapshot.bin
+
+    python scripts/build_snapshot.py
+    python scripts/build_snapshot.py --check   # exit 1, якщо snapshot застарів (CI)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.static_data import SNAPSHOT_PATH, build_snapshot, is_stale  # noqa: E402
+from utils.snapshot import Snapshot  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the static data snapshot")
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_PATH)
+    parser.add_argument("--check", action="store_true", help="Only check that the snapshot is up to date")
+    args = parser.parse_args()
+
+    if args.check:
+        stale = is_stale(args.output)
+        print(f"{args.output}: {'stale' if stale else 'up to date'}")
+        return 1 if stale else 0
+
+    build_snapshot(args.output)
+    snapshot = Snapshot.open(str(args.output))
+    print(f"✅ {args.output} version {snapshot.version}")
+    for name, count in snapshot.info()["sections"].items():
+        print(f"  • {name}: {count}")
+    snapshot.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
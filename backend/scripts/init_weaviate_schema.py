@@ -2,11 +2,20 @@
 Weaviate Schema Initialization для Yana.Diia.AI
 3 критичні схеми для RAG-системи
 """
+import json
+import os
+import sys
+from pathlib import Path
+
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
-import os
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.component_catalog import component_catalog  # noqa: E402
+from services.static_data import static_data  # noqa: E402
+
 load_dotenv()
 
 def init_weaviate_client():
@@ -193,57 +202,13 @@ def seed_critical_components(client):
     """
     collection = client.collections.get("DiiaComponents")
     
+    # Single source: data/components.json via services.component_catalog
     critical_components = [
         {
-            "component_name": "eligibility_banner",
-            "display_name": "Банер Перевірки Права",
-            "category": "banner",
-            "usage_context": "Показати результат автоматичної перевірки права на послугу через API. Використовувати замість ручного введення даних для підтвердження права.",
-            "props_schema": '{"eligible": "boolean", "title": "string", "message": "string", "actionLabel": "string"}',
-            "accessibility_level": "AA",
-            "example_code": "<EligibilityBanner eligible={true} title='Ви маєте право' message='Перевірка через ЄДР пройдена' actionLabel='Продовжити' />",
-            "diia_kit_url": "https://github.com/diia-open-source/diia-ui-kit"
-        },
-        {
-            "component_name": "error_modal",
-            "display_name": "Модальне Вікно Помилки",
-            "category": "modal",
-            "usage_context": "Показати критичну помилку або блокуючу ситуацію. Вимагає дії користувача. НЕ використовувати для warning або info повідомлень.",
-            "props_schema": '{"title": "string (required)", "description": "string", "primaryAction": "object", "secondaryAction": "object"}',
-            "accessibility_level": "AA",
-            "example_code": "<ErrorModal title='Помилка' description='Сервіс недоступний' primaryAction={{label: 'Спробувати ще', onClick: retry}} />",
-            "diia_kit_url": "https://github.com/diia-open-source/diia-ui-kit"
-        },
-        {
-            "component_name": "form_step",
-            "display_name": "Крок Форми",
-            "category": "form",
-            "usage_context": "Багатокроковий флоу з формами. Містить поля, валідацію, навігацію. Використовувати для збору даних які НЕ доступні через API.",
-            "props_schema": '{"stepNumber": "number", "totalSteps": "number", "fields": "array", "onNext": "function", "onBack": "function"}',
-            "accessibility_level": "AA",
-            "example_code": "<FormStep stepNumber={1} totalSteps={4} fields={[{name: 'kved', type: 'select'}]} onNext={handleNext} />",
-            "diia_kit_url": "https://github.com/diia-open-source/diia-ui-kit"
-        },
-        {
-            "component_name": "recipient_card_single",
-            "display_name": "Картка Отримувача",
-            "category": "card",
-            "usage_context": "Відобразити дані отримувача послуги, попередньо завантажені через API (ПІБ, РНОКПП, адреса). НЕ дозволяти редагування якщо дані з реєстру.",
-            "props_schema": '{"fullName": "string", "inn": "string", "address": "string", "editable": "boolean (default: false)"}',
-            "accessibility_level": "AA",
-            "example_code": "<RecipientCardSingle fullName='Шевченко Т.Г.' inn='1234567890' address='Київ, вул. Хрещатик, 1' editable={false} />",
-            "diia_kit_url": "https://github.com/diia-open-source/diia-ui-kit"
-        },
-        {
-            "component_name": "unavailable_banner",
-            "display_name": "Банер Недоступності",
-            "category": "banner",
-            "usage_context": "Показати що послуга тимчасово недоступна через технічні причини або відсутність даних в реєстрі. Використовувати коли API повертає помилку.",
-            "props_schema": '{"title": "string", "reason": "string", "estimatedRestore": "string"}',
-            "accessibility_level": "AA",
-            "example_code": "<UnavailableBanner title='Послуга недоступна' reason='Технічні роботи в реєстрі ЄДР' estimatedRestore='12:00' />",
-            "diia_kit_url": "https://github.com/diia-open-source/diia-ui-kit"
+            **component.to_dict(),
+            "props_schema": json.dumps(dict(component.props_schema), ensure_ascii=False),
         }
+        for component in component_catalog
     ]
     
     for component in critical_components:
@@ -258,47 +223,10 @@ def seed_api_mocks(client):
     """
     collection = client.collections.get("APIMock")
     
+    # Single source: data/api_specs.json (static data snapshot)
     api_mocks = [
-        {
-            "api_name": "edr",
-            "api_name_ua": "Єдиний Державний Реєстр",
-            "available_fields": ["edrpou", "name", "type", "status", "registration_date", "kved", "address"],
-            "field_descriptions": '{"edrpou": "ЄДРПОУ код", "name": "Повна назва", "type": "fop/tov", "status": "active/closed"}',
-            "endpoint": "/api/mock/edr/{edrpou}",
-            "requires_auth": False
-        },
-        {
-            "api_name": "tax",
-            "api_name_ua": "Державна Податкова Служба",
-            "available_fields": ["inn", "taxpayer_type", "has_debt", "last_declaration", "simplified_tax"],
-            "field_descriptions": '{"inn": "РНОКПП", "has_debt": "Наявність боргів", "simplified_tax": "Спрощена система"}',
-            "endpoint": "/api/mock/tax/{inn}",
-            "requires_auth": True
-        },
-        {
-            "api_name": "vehicle",
-            "api_name_ua": "Реєстр Транспортних Засобів",
-            "available_fields": ["license_plate", "vin", "brand", "model", "year", "owner_inn"],
-            "field_descriptions": '{"license_plate": "Номерний знак", "vin": "VIN код", "owner_inn": "РНОКПП власника"}',
-            "endpoint": "/api/mock/vehicle/{plate}",
-            "requires_auth": False
-        },
-        {
-            "api_name": "diia_docs",
-            "api_name_ua": "Документи Дія",
-            "available_fields": ["full_name", "inn", "birth_date", "passport_series", "passport_number"],
-            "field_descriptions": '{"full_name": "ПІБ громадянина", "inn": "РНОКПП", "birth_date": "Дата народження"}',
-            "endpoint": "/api/mock/diia/documents/{type}",
-            "requires_auth": True
-        },
-        {
-            "api_name": "subsidies",
-            "api_name_ua": "Реєстр Субсидій",
-            "available_fields": ["inn", "family_size", "monthly_income", "utilities_cost", "eligible"],
-            "field_descriptions": '{"eligible": "Право на субсидію", "monthly_income": "Дохід на місяць"}',
-            "endpoint": "/api/mock/subsidies/check",
-            "requires_auth": True
-        }
+        {**spec, "field_descriptions": json.dumps(spec["field_descriptions"], ensure_ascii=False)}
+        for spec in static_data.section("api_specs").values()
     ]
     
     for api_mock in api_mocks:
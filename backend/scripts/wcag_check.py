@@ -0,0 +1,63 @@
+"""
+Batch WCAG перевірка збережених UI прототипів (HTML файли або JSONL з полем "ui")
+
+    python scripts/wcag_check.py prototypes/*.html
+    python scripts/wcag_check.py results.jsonl --processes 4 --min-score 80   # exit 1, якщо є нижче порогу
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.wcag import analyze_batch  # noqa: E402
+
+
+def load_documents(paths: List[Path]) -> List[Tuple[str, str]]:
+    """(name, html) from .html files and JSONL lines with a "ui" field"""
+    documents = []
+    for path in paths:
+        if path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    record = json.loads(line) if line.strip() else {}
+                    if record.get("ui"):
+                        documents.append((f"{path}:{number}", record["ui"]))
+        else:
+            documents.append((str(path), path.read_text(encoding="utf-8")))
+    return documents
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Static WCAG 2.1 AA check of generated UI")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--min-score", type=int, default=0, help="Fail if any document scores below")
+    parser.add_argument("--verbose", action="store_true", help="Print issues of every document")
+    args = parser.parse_args()
+
+    documents = load_documents(args.paths)
+    started = time.perf_counter()
+    reports = analyze_batch([html for _, html in documents], processes=args.processes)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for (name, _), report in zip(documents, reports):
+        below = report["score"] < args.min_score
+        failed += below
+        if below or args.verbose:
+            print(f"{'❌' if below else '•'} {name}: {report['score']}")
+            for issue in report["issues"]:
+                print(f"    [{issue['severity']}] {issue['message']} ×{issue['count']}")
+
+    average = sum(report["score"] for report in reports) / max(len(reports), 1)
+    print(f"{len(reports)} documents, average score {average:.1f}, "
+          f"{len(reports) / max(elapsed, 1e-9):.0f} docs/s, {failed} below {args.min_score}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
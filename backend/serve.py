@@ -0,0 +1,385 @@
+"""
+Production launcher: pre-fork master з N uvicorn workers на одному listening socket
+
+    python serve.py --workers 4 --port 8001
+    kill -HUP  <master>   # rolling restart: нові workers стартують, старі дочікують in-flight запити
+    kill -USR2 <master>   # re-exec master з новим кодом (спершу перевіряє `import main`)
+    kill -TTIN <master>   # +1 worker;  kill -TTOU <master>  # -1 worker
+    kill -TERM <master>   # graceful shutdown
+
+З --preload (default) master імпортує app і будує read-only дані (mock registry datasets,
+component index) до fork, тож workers ділять їх copy-on-write.
+"""
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+from dotenv import load_dotenv
+
+# Load environment variables FIRST (before config is imported)
+load_dotenv()
+
+logger = structlog.get_logger()
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LISTEN_FD_ENV = "YANA_LISTEN_FD"
+OLD_WORKERS_ENV = "YANA_OLD_WORKERS"
+
+MASTER_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGUSR2, signal.SIGTTIN, signal.SIGTTOU)
+
+
+def configure_environment(port: int, runtime_dir: Optional[str]) -> str:
+    """
+    Defaults that make per-worker state coherent; must run before `config` is imported
+
+    Job store, shared cache and flow store go to SQLite files in `runtime_dir` unless set
+    explicitly. Workers never run job recovery - the master does it once.
+
+    Returns:
+        Runtime directory
+    """
+    runtime_dir = runtime_dir or os.path.join(tempfile.gettempdir(), f"yana-diia-{port}")
+    os.makedirs(runtime_dir, exist_ok=True)
+    os.environ.setdefault("JOB_STORE_PATH", os.path.join(runtime_dir, "jobs.db"))
+    os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(runtime_dir, "shared_cache.db"))
+    os.environ.setdefault("FLOW_STORE_PATH", os.path.join(runtime_dir, "flows.db"))
+    os.environ["JOB_STORE_RECOVER"] = "false"
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return runtime_dir
+
+
+def preload():
+    """Import the app and build read-only data in the master (shared copy-on-write by workers)"""
+    from main import app
+    from services.service_registry import service_registry
+
+    # Component index + scoring rubric; no sockets or threads, so safe to build before fork
+    service_registry.get("mcp")
+    return app
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket, or the one inherited from the previous master on USR2 re-exec"""
+    inherited = os.environ.pop(LISTEN_FD_ENV, None)
+    if inherited:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    sock.set_inheritable(False)
+    return sock
+
+
+class Worker:
+    """Master-side record of one worker process"""
+
+    def __init__(self, pid: int, age: int, generation: int, ready: bool = False):
+        self.pid = pid
+        self.age = age
+        self.generation = generation
+        self.ready = ready
+        self.started_at = time.monotonic()
+
+
+class Master:
+    """
+    Pre-fork process manager
+
+    Keeps `workers` uvicorn processes running on a shared socket, respawns
+    crashed ones (with backoff while they keep failing at startup) and swaps
+    whole generations on reload only after the new one reports ready.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        sock: socket.socket,
+        workers: int,
+        log_level: str,
+        graceful_timeout: float,
+        startup_timeout: float = 60.0,
+        preloaded: bool = True
+    ):
+        self.app = app
+        self.sock = sock
+        self.target = workers
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.startup_timeout = startup_timeout
+        self.preloaded = preloaded
+        self.workers: Dict[int, Worker] = {}
+        self.generation = 0
+        self._age = 0
+        self._signals: List[int] = []
+        self._reload_started: Optional[float] = None
+        self._failures = 0
+        self._respawn_at = 0.0
+        self._stopping = False
+
+    # ==================== Main loop ====================
+
+    def run(self) -> int:
+        self._ready_r, self._ready_w = os.pipe()
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w)
+        for sig in MASTER_SIGNALS:
+            signal.signal(sig, lambda signum, frame: self._signals.append(signum))
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        # Workers of the previous master (USR2 re-exec) serve until our generation is ready
+        for pid in filter(None, os.environ.pop(OLD_WORKERS_ENV, "").split(",")):
+            self.workers[int(pid)] = Worker(int(pid), age=0, generation=-1, ready=True)
+        if self.workers:
+            self._reload_started = time.monotonic()
+
+        logger.info("Master started", pid=os.getpid(), workers=self.target, preload=self.preloaded,
+                    listen=str(self.sock.getsockname()))
+        self._maintain()
+        while True:
+            readable, _, _ = select.select([wakeup_r, self._ready_r], [], [], 1.0)
+            if wakeup_r in readable:
+                os.read(wakeup_r, 512)
+            if self._ready_r in readable:
+                self._mark_ready(os.read(self._ready_r, 4096))
+
+            while self._signals:
+                self._handle_signal(self._signals.pop(0))
+            self._reap()
+
+            if self._stopping:
+                return self._shutdown()
+            self._check_reload()
+            self._maintain()
+
+    def _handle_signal(self, signum: int) -> None:
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            logger.info("Master shutting down", signal=signal.Signals(signum).name)
+            self._stopping = True
+        elif signum == signal.SIGHUP:
+            self._reload()
+        elif signum == signal.SIGUSR2:
+            self._reexec()
+        elif signum == signal.SIGTTIN:
+            self.target += 1
+            logger.info("Scaling workers", workers=self.target)
+        elif signum == signal.SIGTTOU and self.target > 1:
+            self.target -= 1
+            logger.info("Scaling workers", workers=self.target)
+            current = self._current()
+            if len(current) > self.target:
+                self._stop(max(current, key=lambda worker: worker.age))
+
+    # ==================== Workers ====================
+
+    def _current(self) -> List[Worker]:
+        return [worker for worker in self.workers.values() if worker.generation == self.generation]
+
+    def _spawn(self) -> None:
+        self._age += 1
+        # Objects created so far stay out of GC scans in workers (no copy-on-write from gc)
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                code = _worker_main(self.app, self.sock, self._ready_w, self._age, self.log_level, self.graceful_timeout)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+        self.workers[pid] = Worker(pid, self._age, self.generation)
+        logger.info("Worker spawned", pid=pid, worker=self._age, generation=self.generation)
+
+    def _stop(self, worker: Worker, sig: int = signal.SIGTERM) -> None:
+        try:
+            os.kill(worker.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _mark_ready(self, data: bytes) -> None:
+        for line in data.decode().split():
+            worker = self.workers.get(int(line))
+            if worker is not None:
+                worker.ready = True
+                self._failures = 0
+                logger.info("Worker ready", pid=worker.pid, worker=worker.age,
+                            startup_ms=round((time.monotonic() - worker.started_at) * 1000))
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            retired = worker.generation != self.generation or self._stopping
+            if not retired and not worker.ready:
+                # Crashed during startup (bad config, import error): back off instead of fork-looping
+                self._failures += 1
+                self._respawn_at = time.monotonic() + min(30.0, 0.5 * 2 ** self._failures)
+            log = logger.info if retired or exit_code == 0 else logger.warning
+            log("Worker exited", pid=pid, worker=worker.age, exit_code=exit_code, retired=retired)
+
+    def _maintain(self) -> None:
+        if time.monotonic() < self._respawn_at:
+            return
+        for _ in range(self.target - len(self._current())):
+            self._spawn()
+
+    # ==================== Reload ====================
+
+    def _reload(self) -> None:
+        """Start a new generation; the old one is stopped once all new workers are ready"""
+        if not self.preloaded:
+            logger.info("Reloading workers (application code is re-imported)")
+        else:
+            logger.info("Reloading workers (preloaded code; use USR2 to pick up code changes)")
+            # Data files are re-read here so the new generation forks with them
+            from services.component_catalog import component_catalog
+            component_catalog.reload()
+        self.generation += 1
+        self._reload_started = time.monotonic()
+        self._respawn_at = 0.0
+
+    def _check_reload(self) -> None:
+        if self._reload_started is None:
+            return
+        old = [worker for worker in self.workers.values() if worker.generation != self.generation]
+        current = self._current()
+        if len(current) >= self.target and all(worker.ready for worker in current):
+            for worker in old:
+                self._stop(worker)
+            logger.info("Reload complete", generation=self.generation, retired=len(old))
+            self._reload_started = None
+        elif time.monotonic() - self._reload_started > self.startup_timeout:
+            # New generation does not come up: keep serving with the old one
+            logger.error("Reload failed: new workers not ready in time, keeping the old ones")
+            for worker in current:
+                self._stop(worker, signal.SIGKILL)
+            self.generation = max(worker.generation for worker in old) if old else self.generation
+            self._reload_started = None
+
+    def _reexec(self) -> None:
+        """Replace the master with freshly imported code, handing over the socket and live workers"""
+        check = subprocess.run(
+            [sys.executable, "-c", "import main"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+        )
+        if check.returncode != 0:
+            logger.error("Re-exec aborted: new code does not import", error=check.stderr.strip()[-2000:])
+            return
+        logger.info("Re-executing master", workers=len(self.workers))
+        self.sock.set_inheritable(True)
+        env = {
+            **os.environ,
+            LISTEN_FD_ENV: str(self.sock.fileno()),
+            OLD_WORKERS_ENV: ",".join(str(pid) for pid in self.workers),
+        }
+        signal.set_wakeup_fd(-1)
+        os.execve(sys.executable, sys.orig_argv, env)
+
+    # ==================== Shutdown ====================
+
+    def _shutdown(self) -> int:
+        for worker in list(self.workers.values()):
+            self._stop(worker)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self._reap()
+        for worker in list(self.workers.values()):
+            logger.warning("Worker did not stop in time, killing", pid=worker.pid)
+            self._stop(worker, signal.SIGKILL)
+        self.sock.close()
+        logger.info("Master stopped")
+        return 0
+
+
+def _worker_main(app: Any, sock: socket.socket, ready_fd: int, age: int, log_level: str, graceful_timeout: float) -> int:
+    import uvicorn
+
+    class WorkerServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets)
+            # `started` stays False if lifespan startup failed
+            if self.started:
+                try:
+                    os.write(ready_fd, f"{os.getpid()}\n".encode())
+                except OSError:
+                    pass
+
+    signal.set_wakeup_fd(-1)
+    for sig in MASTER_SIGNALS + (signal.SIGCHLD,):
+        signal.signal(sig, signal.SIG_DFL)
+    # uvicorn installs its own TERM/INT handlers while serving and re-raises
+    # the signal after graceful shutdown; ignored here so the worker exits 0
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_IGN)
+    gc.enable()
+    structlog.contextvars.bind_contextvars(worker=age)
+
+    server = WorkerServer(uvicorn.Config(
+        app,
+        log_level=log_level.lower(),
+        timeout_graceful_shutdown=graceful_timeout,
+    ))
+    server.run(sockets=[sock])
+    return 0 if server.started else 3
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python serve.py", description="Multi-worker production server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, help="Default: PORT setting (8001)")
+    parser.add_argument("--workers", type=int, help="Default: WEB_CONCURRENCY or WEB_WORKERS setting")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="Import the app in each worker (HUP then also reloads code)")
+    parser.add_argument("--runtime-dir", help="Shared job store / cache files (default: $TMPDIR/yana-diia-<port>)")
+    parser.add_argument("--graceful-timeout", type=float, help="Default: GRACEFUL_TIMEOUT setting")
+    args = parser.parse_args()
+
+    port = args.port or int(os.environ.get("PORT", 8001))
+    configure_environment(port, args.runtime_dir)
+
+    # Keep preloaded objects in as few pages as possible; collected again in workers
+    gc.disable()
+
+    from config import settings
+    from utils.logger import setup_logger
+    setup_logger(settings.log_level)
+
+    workers = args.workers or int(os.environ.get("WEB_CONCURRENCY", settings.web_workers))
+    graceful_timeout = args.graceful_timeout if args.graceful_timeout is not None else settings.graceful_timeout
+
+    if settings.job_store_path and OLD_WORKERS_ENV not in os.environ:
+        from services.job_queue import recover_interrupted_jobs
+        recovered = recover_interrupted_jobs(settings.job_store_path)
+        if recovered:
+            logger.info("Marked interrupted jobs as failed", jobs=recovered)
+
+    sock = bind_socket(args.host, port)
+    app = preload() if args.preload else "main:app"
+    return Master(app, sock, max(1, workers), settings.log_level, graceful_timeout, preloaded=args.preload).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
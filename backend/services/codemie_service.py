@@ -5,9 +5,17 @@ CodeMie SDK Service для Yana.Diia.AI
 import os
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from config import settings
+from services.ui_renderer import ui_renderer, UI_RENDERS
+from services.flow_diff import check_steps, diff_steps, merge_steps, flow_patch, value_patch
 from utils.retry import async_retry
 from utils.http_client import get_http_client
+from utils.rate_limit import admission
+from utils.hedging import hedged
+from utils.metrics import track_stage
+from utils.wcag import analyze_html
+from utils.error_handlers import CodeMieAPIError, RateLimitError, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +51,15 @@ class CodeMieService:
         #     api_url=self.api_url
         # )
     
-    @async_retry(max_attempts=3, initial_delay=1.0, exceptions=(Exception,))
+    @track_stage("generate_flow")
+    @hedged("codemie")
+    @async_retry(max_attempts=3, initial_delay=1.0, breaker="codemie")
+    @admission.limit("codemie")
     async def generate_flow(self, prompt: str) -> Dict[str, Any]:
         """
         Generate flow using CodeMie Agent 1 (Flow Generator)
-        With automatic retry on failure (3 attempts, exponential backoff)
+        With automatic retry on transient failures (3 attempts, full-jitter backoff,
+        circuit breaker + global retry budget)
         
         Args:
             prompt: User prompt describing the desired flow
@@ -95,11 +107,32 @@ class CodeMieService:
             logger.error(f"Flow generation failed: {str(e)}")
             raise
     
-    @async_retry(max_attempts=3, initial_delay=1.0, exceptions=(Exception,))
+    @track_stage("generate_ui")
     async def generate_ui(self, flow: Dict[str, Any]) -> str:
+        """
+        Generate UI: compiled templates first (microseconds, no LLM),
+        CodeMie Agent 2 only for components / layouts the renderer does not have
+        
+        Args:
+            flow: Flow structure from generate_flow()
+            
+        Returns:
+            HTML/Tailwind UI prototype as string
+        """
+        if settings.ui_template_renderer:
+            html = ui_renderer.try_render(flow)
+            if html is not None:
+                return html
+        return await self.generate_ui_agent(flow)
+    
+    @hedged("codemie")
+    @async_retry(max_attempts=3, initial_delay=1.0, breaker="codemie")
+    @admission.limit("codemie")
+    async def generate_ui_agent(self, flow: Dict[str, Any]) -> str:
         """
         Generate UI using CodeMie Agent 2 (UI Renderer)
-        With automatic retry on failure (3 attempts, exponential backoff)
+        With automatic retry on transient failures (3 attempts, full-jitter backoff,
+        circuit breaker + global retry budget)
         
         Args:
             flow: Flow structure from generate_flow()
@@ -143,6 +176,7 @@ class CodeMieService:
             """
             
             logger.info("UI generated successfully")
+            UI_RENDERS.inc(1.0, "agent")
             return mock_ui.strip()
             
         except Exception as e:
@@ -169,10 +203,14 @@ class CodeMieService:
             return {
                 "flow": flow,
                 "ui": ui_html,
+                "wcag": analyze_html(ui_html),  # Static check, no LLM estimate
                 "status": "ready",
                 "prompt": prompt
             }
             
+        except (RateLimitError, CircuitOpenError):
+            # Backpressure must reach the client as 429/503, not as status=error
+            raise
         except Exception as e:
             logger.error(f"Complete generation failed: {str(e)}")
             return {
@@ -182,3 +220,61 @@ class CodeMieService:
                 "error": str(e),
                 "prompt": prompt
             }
+    
+    async def regenerate(
+        self,
+        previous_flow: Dict[str, Any],
+        prompt: Optional[str] = None,
+        edited_steps: Optional[List[Dict[str, Any]]] = None,
+        previous_ui: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Incremental re-generation of a previous /generate result
+        
+        Edited steps are merged into the previous flow without the Flow agent;
+        a modified prompt regenerates the flow and steps are matched by id.
+        UI is rebuilt only when the flow changed (template renderer reuses
+        cached fragments of unchanged steps).
+        
+        Args:
+            previous_flow: Flow returned by /generate
+            prompt: Modified prompt (optional)
+            edited_steps: Steps edited by the user, matched by id (optional)
+            previous_ui: UI returned by /generate (optional)
+            
+        Returns:
+            Dict with patch (RFC 6902 against {"flow", "ui"}), changed_steps, removed_steps, wcag and status
+            
+        Raises:
+            CodeMieAPIError: 502 if the regenerated flow has steps without unique ids
+        """
+        if prompt:
+            flow = await self.generate_flow(prompt)
+            # Agent output is matched by step id like user input, but a bad one is an upstream fault
+            try:
+                if not isinstance(flow, dict):
+                    raise ValueError("flow must be an object")
+                check_steps(flow.get("steps", []))
+            except ValueError as e:
+                raise CodeMieAPIError(f"Flow agent returned an invalid flow: {e}", status_code=502)
+        else:
+            flow = dict(previous_flow)
+        if edited_steps:
+            flow = {**flow, "steps": merge_steps(flow.get("steps", []), edited_steps)}
+        
+        diff = diff_steps(previous_flow.get("steps", []), flow.get("steps", []))
+        ui = previous_ui
+        if previous_ui is None or flow != previous_flow:
+            ui = await self.generate_ui(flow)
+        
+        logger.info(
+            f"Regenerated flow {flow.get('id', 'unknown')}: {len(diff.affected)} steps changed, "
+            f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged"
+        )
+        return {
+            "patch": flow_patch(previous_flow, flow) + value_patch(previous_ui, ui, "/ui"),
+            "changed_steps": diff.affected,
+            "removed_steps": diff.removed,
+            "wcag": analyze_html(ui) if ui != previous_ui else None,
+            "status": "ready"
+        }
@@ -0,0 +1,230 @@
+"""
+Component catalog: єдине джерело Diia Design System компонентів (data/components.json → snapshot)
+Спільний для MockRAG, ComponentSearchTool (MCP) та Weaviate seed
+"""
+import re
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+import structlog
+
+from services.static_data import get_static_data, load_snapshot
+
+logger = structlog.get_logger()
+
+DEFAULT_COMPONENT = "form_step"
+
+# Text search keys: word prefixes of this length (crude stemming for Ukrainian inflection)
+STEM_LENGTH = 5
+MIN_WORD_LENGTH = 3
+KEYWORD_WEIGHT = 3
+TEXT_WEIGHT = 1
+
+_WORD_RE = re.compile(r"[\w']+")
+
+# listener(added, removed, changed) - component names
+ChangeListener = Callable[[Set[str], Set[str], Set[str]], None]
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD_RE.findall(text.lower().replace("_", " ")) if len(word) >= MIN_WORD_LENGTH]
+
+
+class Component:
+    """Immutable catalog record; strings are interned, props are a tuple of (name, type) pairs"""
+
+    __slots__ = ("name", "display_name", "category", "usage_context", "props_schema",
+                 "accessibility_level", "example_code", "diia_kit_url", "keywords", "search_keys")
+
+    def __init__(self, data: Mapping[str, Any]):
+        self.name = sys.intern(data["component_name"])
+        self.display_name = data.get("display_name", "")
+        self.category = sys.intern(data.get("category", ""))
+        self.usage_context = data.get("usage_context", "")
+        self.props_schema: Tuple[Tuple[str, str], ...] = tuple(
+            (sys.intern(prop), kind) for prop, kind in data.get("props_schema", {}).items()
+        )
+        self.accessibility_level = sys.intern(data.get("accessibility_level", ""))
+        self.example_code = data.get("example_code", "")
+        self.diia_kit_url = sys.intern(data.get("diia_kit_url", ""))
+        self.keywords: Tuple[str, ...] = tuple(sys.intern(keyword.lower()) for keyword in data.get("keywords", ()))
+        self.search_keys = self._build_search_keys()
+
+    def _build_search_keys(self) -> Tuple[Tuple[str, int], ...]:
+        """(key, weight): explicit keywords outweigh stems of name / display name / category / usage context"""
+        keys: Dict[str, int] = {}
+        for word in _words(" ".join((self.name, self.display_name, self.category, self.usage_context))):
+            keys[sys.intern(word[:STEM_LENGTH])] = TEXT_WEIGHT
+        for keyword in self.keywords:
+            keys[keyword] = KEYWORD_WEIGHT
+        return tuple(keys.items())
+
+    def _fields(self) -> tuple:
+        return (self.display_name, self.category, self.usage_context, self.props_schema,
+                self.accessibility_level, self.example_code, self.diia_kit_url, self.keywords)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Component) and self.name == other.name and self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __repr__(self) -> str:
+        return f"Component({self.name!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public representation (fresh dict - safe for callers to mutate)"""
+        return {
+            "component_name": self.name,
+            "display_name": self.display_name,
+            "category": self.category,
+            "usage_context": self.usage_context,
+            "props_schema": dict(self.props_schema),
+            "accessibility_level": self.accessibility_level,
+            "example_code": self.example_code,
+            "diia_kit_url": self.diia_kit_url,
+        }
+
+
+class ComponentCatalog:
+    """
+    Components by name with an inverted search index
+
+    `apply()` diffs new source data against the current records, re-indexes
+    only the added / removed / changed ones and notifies subscribers, so
+    dependent indexes can update incrementally as well.
+    """
+
+    def __init__(self, source: Mapping[str, Mapping[str, Any]]):
+        self._components: Dict[str, Component] = {}
+        self._order: Dict[str, int] = {}
+        self._index: Dict[str, Dict[str, int]] = {}
+        self._max_key_length = 0
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.Lock()
+        self.version = 0
+        self.apply(source)
+
+    def __len__(self) -> int:
+        return len(self._components)
+
+    def __iter__(self) -> Iterator[Component]:
+        return iter(list(self._components.values()))
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._components
+
+    def get(self, name: str) -> Optional[Component]:
+        return self._components.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._components)
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Call `listener(added, removed, changed)` after every catalog change"""
+        self._listeners.append(listener)
+
+    # ==================== Updates ====================
+
+    def apply(self, source: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Replace the catalog contents with `source` (name → component data)
+
+        Returns:
+            Names of added / removed / changed components
+        """
+        with self._lock:
+            incoming = {name: Component(data) for name, data in source.items()}
+            added = set(incoming) - set(self._components)
+            removed = set(self._components) - set(incoming)
+            changed = {name for name in set(incoming) & set(self._components) if incoming[name] != self._components[name]}
+
+            index = self._reindexed(
+                [self._components[name] for name in removed | changed],
+                [incoming[name] for name in added | changed]
+            )
+
+            # Unchanged records are kept, so references held by consumers stay valid
+            initial = not self._components
+            components = {
+                name: incoming[name] if name in added or name in changed else self._components[name]
+                for name in incoming
+            }
+            # Readers never take the lock: build everything aside, then swap references
+            self._order = {name: position for position, name in enumerate(components)}
+            self._components = components
+            self._max_key_length = max((len(key) for key in index), default=0)
+            self._index = index
+            if added or removed or changed:
+                self.version += 1
+
+        if not initial and (added or removed or changed):
+            logger.info("Component catalog updated", version=self.version,
+                        added=len(added), removed=len(removed), changed=len(changed))
+            for listener in self._listeners:
+                try:
+                    listener(added, removed, changed)
+                except Exception as e:
+                    logger.warning("Component catalog listener failed", error=str(e))
+        return {"added": sorted(added), "removed": sorted(removed), "changed": sorted(changed)}
+
+    def reload(self) -> Dict[str, List[str]]:
+        """Re-read data/components.json (rebuilding the snapshot if the source changed)"""
+        return self.apply(load_snapshot().section("components"))
+
+    def _reindexed(self, remove: List[Component], add: List[Component]) -> Dict[str, Dict[str, int]]:
+        """Copy of the index with `remove` dropped and `add` indexed; only touched posting dicts are copied"""
+        index = dict(self._index)
+        copied: Set[str] = set()
+
+        def postings(key: str) -> Dict[str, int]:
+            if key not in copied:
+                index[key] = dict(index.get(key, ()))
+                copied.add(key)
+            return index[key]
+
+        for component in remove:
+            for key, _ in component.search_keys:
+                postings(key).pop(component.name, None)
+        for component in add:
+            for key, weight in component.search_keys:
+                postings(key)[component.name] = weight
+        for key in copied:
+            if not index[key]:
+                del index[key]
+        return index
+
+    # ==================== Search ====================
+
+    def search(self, query: str, limit: int = 1, fallback: bool = True) -> List[Component]:
+        """
+        Keyword search over precomputed keys
+
+        Every prefix of a query word is looked up in the index, so "помилку"
+        hits the keyword "помилк" and the stem "помил". Ties keep catalog order.
+
+        Args:
+            query: Опис потреби (напр. "показати помилку користувачу")
+            limit: Max results
+            fallback: Return the default component (form_step) when nothing matches
+        """
+        # One reference each: a concurrent apply() swaps in new objects, never mutates these
+        index, components, order = self._index, self._components, self._order
+        scores: Dict[str, int] = {}
+        for word in _words(query):
+            matched: Dict[str, int] = {}
+            for length in range(MIN_WORD_LENGTH, min(len(word), self._max_key_length) + 1):
+                for name, weight in index.get(word[:length], {}).items():
+                    matched[name] = max(matched.get(name, 0), weight)
+            for name, weight in matched.items():
+                scores[name] = scores.get(name, 0) + weight
+
+        ranked = sorted(scores, key=lambda name: (-scores[name], order.get(name, 0)))
+        results = [components[name] for name in ranked[:limit] if name in components]
+        if not results and fallback and DEFAULT_COMPONENT in components:
+            results = [components[DEFAULT_COMPONENT]]
+        return results
+
+
+# Global instance
+component_catalog = ComponentCatalog(get_static_data().section("components"))
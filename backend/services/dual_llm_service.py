@@ -3,9 +3,36 @@ Dual-LLM Service: Generator + Judge Architecture
 Implements LLM-as-a-Judge pattern for Diia flow validation
 """
 import os
+import json
+import asyncio
 import requests
-from typing import List, Dict
-from openai import OpenAI
+from typing import List, Dict, Optional
+from openai import OpenAI, AsyncOpenAI
+import structlog
+from utils.rate_limit import admission
+from utils.retry import async_retry
+from utils.hedging import hedged
+from utils.metrics import track_stage, record_token_usage
+from utils.http_client import get_http_client, traced_async_client, traced_sync_client
+from utils.tracing import SPAN_KIND_CLIENT, start_span
+from utils.error_handlers import RateLimitError, CircuitOpenError
+from utils.prompt_builder import prompt_cache_params, compact_json
+from utils.json_stream import IncrementalJSONParser, JSONStreamError
+from services.flow_store import flow_store
+from config import settings
+
+logger = structlog.get_logger()
+
+# Generator instructions: constant, sent ahead of the BRD so Ollama can reuse the evaluated prefix
+GENERATOR_SYSTEM_PROMPT = """You generate user flows for Ukrainian government services (Diia ecosystem).
+
+Requirements:
+- Use only components from Diia Design System
+- Minimize number of steps
+- Maximize automation through APIs
+- Ensure WCAG AA compliance
+
+Output as JSON with structure: {"steps": [], "components": [], "api_calls": []}"""
 
 
 class DualLLMService:
@@ -21,7 +48,11 @@ class DualLLMService:
         self.generator_model = os.getenv("LLM_MODEL_GENERATOR", "llama3.1")
         
         # Judge (Cloud)
-        self.judge_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.judge_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=traced_sync_client())
+        # Retries are handled by async_retry (budget + breaker), not by the SDK
+        self.async_judge_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, http_client=traced_async_client()
+        )
         self.judge_model = os.getenv("LLM_MODEL_JUDGE", "gpt-4")
         
         # Scoring weights
@@ -32,55 +63,240 @@ class DualLLMService:
             "screen_saturation": float(os.getenv("SCORING_SCREEN_SATURATION_WEIGHT", 0.15)),
             "api_dependency": float(os.getenv("SCORING_API_DEPENDENCY_WEIGHT", 0.10))
         }
+        self.judge_system_prompt = self._build_judge_system_prompt()
+        self._prompt_cache_params = prompt_cache_params(self.judge_system_prompt)
     
-    def generate_flow_variants(self, brd_text: str, n_variants: int = 3) -> List[Dict]:
+    async def aclose(self) -> None:
+        """Release HTTP connection pools of the Judge clients"""
+        await self.async_judge_client.close()
+        self.judge_client.close()
+    
+    def _few_shot(self, brd_text: str) -> str:
+        """Best-scoring stored flows for similar BRDs (flow store), once per BRD"""
+        if settings.flow_store_few_shot <= 0:
+            return ""
+        examples = flow_store.similar(
+            brd_text, limit=settings.flow_store_few_shot, min_score=settings.flow_store_min_score
+        )
+        if not examples:
+            return ""
+        logger.info("Few-shot flows retrieved", flow_ids=[example["id"] for example in examples])
+        return "\n".join(
+            ["High-scoring flows for similar services:"]
+            + [f"- score {example['score']:.0f}: {compact_json(example['flow'])}" for example in examples]
+        ) + "\n\n"
+    
+    def _variant_prompt(self, brd_text: str, index: int, few_shot: str = "") -> str:
+        """
+        Generator prompt for variant N
+
+        Static instructions first, then few-shot examples and the BRD, the
+        variant number last: all variants of a BRD share the longest possible
+        prefix for KV-cache reuse. With ollama_prefix_cache the instructions
+        go separately as `system`.
+        """
+        prompt = f"""{few_shot}BRD: {brd_text}
+
+Generate user flow variant {index+1}."""
+        if settings.ollama_prefix_cache:
+            return prompt
+        return f"{GENERATOR_SYSTEM_PROMPT}\n\n{prompt}"
+    
+    def _generator_payload(self, prompt: str, temperature: float) -> Dict:
+        payload = {
+            "model": self.generator_model,
+            "prompt": prompt,
+            "stream": settings.llm_stream,
+            "format": "json",
+            "temperature": temperature
+        }
+        if settings.ollama_prefix_cache:
+            # Same system text on every call + model kept loaded → Ollama reuses the evaluated prefix
+            payload["system"] = GENERATOR_SYSTEM_PROMPT
+            payload["keep_alive"] = settings.ollama_keep_alive
+        return payload
+    
+    @staticmethod
+    def _record_generator_usage(data: Dict) -> None:
+        """Ollama reports evaluated prompt tokens only - a reused prefix shows up as a smaller prompt_eval_count"""
+        record_token_usage("ollama", {
+            "prompt_tokens": data.get("prompt_eval_count"),
+            "completion_tokens": data.get("eval_count"),
+        })
+    
+    def _build_judge_system_prompt(self) -> str:
+        """Judge rubric: built once per process, identical for every call (cacheable prefix)"""
+        return f"""You are an expert UX auditor for Ukrainian government services (Diia ecosystem).
+
+Evaluate the flow variants given by the user using Diia Flow Scoring Rubric:
+
+Criteria (weights in parentheses):
+1. Flow Length Score ({self.weights['flow_length']*100}%): Fewer steps = higher score
+2. Component Compliance ({self.weights['component_compliance']*100}%): All components must exist in Diia Design System
+3. WCAG Score ({self.weights['wcag']*100}%): Accessibility compliance (AA minimum)
+4. Screen Saturation ({self.weights['screen_saturation']*100}%): Cognitive load, spacing, no horizontal scroll
+5. API Dependency ({self.weights['api_dependency']*100}%): Penalize manual data entry when API exists
+
+For each variant, provide:
+- Individual scores (0-100) for each criterion
+- Total weighted score
+- Detailed justification
+- Specific violations (if any)
+
+Return the BEST variant with all scores and explanations in JSON format.
+"""
+    
+    def _judge_prompt(self, variants: List[Dict], rag_context: str) -> str:
+        """Per-call part of the Judge prompt (knowledge base + variants)"""
+        return f"""Knowledge Base (Diia Design System):
+{rag_context}
+
+Flow Variants to Evaluate:
+{variants}
+"""
+    
+    def _judge_request(self, variants: List[Dict], rag_context: str) -> Dict:
+        """Chat completion parameters shared by sync and async clients"""
+        return {
+            "model": self.judge_model,
+            "messages": [
+                {"role": "system", "content": self.judge_system_prompt},
+                {"role": "user", "content": self._judge_prompt(variants, rag_context)}
+            ],
+            "temperature": 0.1,  # Low temperature for consistent evaluation
+            **self._prompt_cache_params
+        }
+    
+    def _judge_result(self, response) -> Dict:
+        record_token_usage("openai", response.usage)
+        return {
+            "evaluation": response.choices[0].message.content,
+            "model": self.judge_model,
+            "usage": response.usage.dict() if response.usage else {}
+        }
+    
+    @track_stage("generate_variants")
+    def generate_flow_variants(
+        self, brd_text: str, n_variants: int = 3, few_shot_query: Optional[str] = None
+    ) -> List[Dict]:
         """
         Generator Module: Create N flow variants from BRD
         
         Args:
             brd_text: Business Requirements Document
             n_variants: Number of variants to generate
+            few_shot_query: Text to look up few-shot flows by (default brd_text);
+                the raw BRD when brd_text carries added context
             
         Returns:
             List of flow variants
         """
         variants = []
+        few_shot = self._few_shot(few_shot_query or brd_text)
         
         for i in range(n_variants):
-            prompt = f"""
-            Generate user flow variant {i+1} for the following government service:
-            
-            BRD: {brd_text}
-            
-            Requirements:
-            - Use only components from Diia Design System
-            - Minimize number of steps
-            - Maximize automation through APIs
-            - Ensure WCAG AA compliance
-            
-            Output as JSON with structure: {{"steps": [], "components": [], "api_calls": []}}
-            """
-            
             # Call Ollama
-            response = requests.post(
-                self.generator_endpoint,
-                json={
-                    "model": self.generator_model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7 + (i * 0.1)  # Vary creativity
-                },
-                timeout=120
-            )
+            try:
+                flow = self._call_generator(
+                    self._variant_prompt(brd_text, i, few_shot),
+                    temperature=0.7 + (i * 0.1)  # Vary creativity
+                )
+            except (requests.HTTPError, JSONStreamError) as e:
+                logger.warning("Generator variant failed", variant_id=i + 1, error=str(e))
+                continue
             
-            if response.status_code == 200:
-                variants.append({
-                    "variant_id": i + 1,
-                    "flow": response.json()["response"]
-                })
+            variants.append({
+                "variant_id": i + 1,
+                "flow": flow
+            })
+        
+        return variants
+    
+    @admission.limit("ollama")
+    def _call_generator(self, prompt: str, temperature: float) -> Dict:
+        """Single Ollama call (admission-controlled), returns the parsed flow"""
+        parser = IncrementalJSONParser()
+        # requests bypasses the traced httpx transports, so open the client span here
+        with start_span(
+            "ollama.generate", SPAN_KIND_CLIENT,
+            **{"http.method": "POST", "http.url": self.generator_endpoint}
+        ) as span:
+            headers = {"traceparent": span.traceparent} if span is not None else {}
+            with requests.post(
+                self.generator_endpoint,
+                json=self._generator_payload(prompt, temperature),
+                headers=headers,
+                timeout=120,
+                stream=settings.llm_stream
+            ) as response:
+                if span is not None:
+                    span.set_attribute("http.status_code", response.status_code)
+                response.raise_for_status()
+                # Streaming body is NDJSON; a non-streaming one is the same final message on one line
+                for line in response.iter_lines() if settings.llm_stream else [response.content]:
+                    self._feed_generator_line(line, parser)
+        return parser.close()
+    
+    @hedged("ollama")
+    @async_retry(max_attempts=2, initial_delay=0.5, breaker="ollama")
+    @admission.limit("ollama")
+    async def _acall_generator(self, prompt: str, temperature: float) -> Dict:
+        """Single async Ollama call (hedged, admission-controlled, circuit-broken), returns the parsed flow"""
+        parser = IncrementalJSONParser()
+        async with get_http_client().stream(
+            "POST",
+            self.generator_endpoint,
+            json=self._generator_payload(prompt, temperature),
+            timeout=120
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                self._feed_generator_line(line, parser)
+        return parser.close()
+    
+    def _feed_generator_line(self, line, parser: IncrementalJSONParser) -> None:
+        """
+        One Ollama message: generated text goes to the incremental parser
+
+        Malformed flow JSON raises JSONStreamError mid-stream; leaving the
+        response context closes the connection and Ollama stops generating.
+        """
+        if not line or not line.strip():
+            return
+        message = json.loads(line)
+        if "error" in message:
+            raise JSONStreamError(f"Ollama error: {message['error']}", parser.position)
+        parser.feed(message.get("response", ""))
+        if message.get("done"):
+            self._record_generator_usage(message)
+    
+    @track_stage("generate_variants")
+    async def agenerate_flow_variants(
+        self, brd_text: str, n_variants: int = 3, few_shot_query: Optional[str] = None
+    ) -> List[Dict]:
+        """Async Generator Module: variants are generated concurrently"""
+        few_shot = await asyncio.to_thread(self._few_shot, few_shot_query or brd_text)
+        results = await asyncio.gather(
+            *[
+                self._acall_generator(self._variant_prompt(brd_text, i, few_shot), temperature=0.7 + (i * 0.1))
+                for i in range(n_variants)
+            ],
+            return_exceptions=True
+        )
+        
+        variants = []
+        for i, result in enumerate(results):
+            if isinstance(result, (RateLimitError, CircuitOpenError)):
+                raise result
+            if isinstance(result, Exception):
+                logger.warning("Generator variant failed", variant_id=i + 1, error=str(result))
+                continue
+            variants.append({"variant_id": i + 1, "flow": result})
         
         return variants
     
+    @track_stage("judge")
+    @admission.limit("openai")
     def judge_flows(self, variants: List[Dict], rag_context: str = "") -> Dict:
         """
         Judge Module: Evaluate flows using Diia Flow Scoring Rubric
@@ -92,62 +308,35 @@ class DualLLMService:
         Returns:
             Best variant with scores
         """
-        judge_prompt = f"""
-        You are an expert UX auditor for Ukrainian government services (Diia ecosystem).
-        
-        Evaluate the following flow variants using Diia Flow Scoring Rubric:
-        
-        Criteria (weights in parentheses):
-        1. Flow Length Score ({self.weights['flow_length']*100}%): Fewer steps = higher score
-        2. Component Compliance ({self.weights['component_compliance']*100}%): All components must exist in Diia Design System
-        3. WCAG Score ({self.weights['wcag']*100}%): Accessibility compliance (AA minimum)
-        4. Screen Saturation ({self.weights['screen_saturation']*100}%): Cognitive load, spacing, no horizontal scroll
-        5. API Dependency ({self.weights['api_dependency']*100}%): Penalize manual data entry when API exists
-        
-        Knowledge Base (Diia Design System):
-        {rag_context}
-        
-        Flow Variants to Evaluate:
-        {variants}
+        response = self.judge_client.chat.completions.create(**self._judge_request(variants, rag_context))
         
-        For each variant, provide:
-        - Individual scores (0-100) for each criterion
-        - Total weighted score
-        - Detailed justification
-        - Specific violations (if any)
-        
-        Return the BEST variant with all scores and explanations in JSON format.
-        """
-        
-        response = self.judge_client.chat.completions.create(
-            model=self.judge_model,
-            messages=[
-                {"role": "system", "content": "You are a UX auditor for Diia government services."},
-                {"role": "user", "content": judge_prompt}
-            ],
-            temperature=0.1  # Low temperature for consistent evaluation
-        )
+        return self._judge_result(response)
+    
+    @track_stage("judge")
+    @hedged("openai")
+    @async_retry(max_attempts=2, initial_delay=0.5, breaker="openai")
+    @admission.limit("openai")
+    async def ajudge_flows(self, variants: List[Dict], rag_context: str = "") -> Dict:
+        """Async Judge Module (hedged, admission-controlled, circuit-broken)"""
+        response = await self.async_judge_client.chat.completions.create(**self._judge_request(variants, rag_context))
         
-        return {
-            "evaluation": response.choices[0].message.content,
-            "model": self.judge_model,
-            "usage": response.usage.dict() if response.usage else {}
-        }
+        return self._judge_result(response)
     
-    def orchestrate(self, brd_text: str, rag_context: str = "") -> Dict:
+    def orchestrate(self, brd_text: str, rag_context: str = "", few_shot_query: Optional[str] = None) -> Dict:
         """
         Full Dual-LLM pipeline: Generate → Judge → Return best
         
         Args:
             brd_text: Business Requirements Document
             rag_context: Retrieved context from RAG
+            few_shot_query: Few-shot lookup text (see generate_flow_variants)
             
         Returns:
             Best flow variant with scores
         """
         # Step 1: Generate variants
         print("🎨 Generating flow variants...")
-        variants = self.generate_flow_variants(brd_text, n_variants=3)
+        variants = self.generate_flow_variants(brd_text, n_variants=3, few_shot_query=few_shot_query)
         
         # Step 2: Judge variants
         print("⚖️ Evaluating with Judge module...")
@@ -158,7 +347,26 @@ class DualLLMService:
             "evaluation": evaluation,
             "best_variant": evaluation  # Judge returns best
         }
+    
+    async def aorchestrate(self, brd_text: str, rag_context: str = "", few_shot_query: Optional[str] = None) -> Dict:
+        """Async Dual-LLM pipeline (does not block the event loop)"""
+        logger.info("Generating flow variants")
+        variants = await self.agenerate_flow_variants(brd_text, n_variants=3, few_shot_query=few_shot_query)
+        
+        logger.info("Evaluating with Judge module")
+        evaluation = await self.ajudge_flows(variants, rag_context)
+        
+        return {
+            "variants": variants,
+            "evaluation": evaluation,
+            "best_variant": evaluation  # Judge returns best
+        }
 
 
-# Instantiate service
-dual_llm_service = DualLLMService()
+def __getattr__(name: str):
+    # `from services.dual_llm_service import dual_llm_service` keeps working,
+    # the instance is built on first access (see services.service_registry)
+    if name == "dual_llm_service":
+        from services.service_registry import service_registry
+        return service_registry.get("dual_llm")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,150 @@
+"""
+Flow diff: які кроки змінились між двома версіями flow + RFC 6902 JSON patch
+Для інкрементальної регенерації: перегенеровуються й перерендерюються лише змінені кроки
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from utils.metrics import registry
+
+REGENERATED_STEPS = registry.counter(
+    "yana_regenerate_steps_total", "Steps seen by incremental regeneration by kind of change", ("change",)
+)
+
+JSONPatch = List[Dict[str, Any]]
+
+
+def _pointer(base: str, key: Any) -> str:
+    """Child of a JSON Pointer (RFC 6901) prefix"""
+    return f"{base}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+@dataclass
+class FlowDiff:
+    """Step ids by kind of change (steps are matched by id)"""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    reordered: bool = False
+
+    @property
+    def affected(self) -> List[str]:
+        """Steps that need regeneration / re-rendering"""
+        return self.added + self.changed
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.reordered)
+
+
+def check_steps(steps: Any) -> None:
+    """
+    Steps are matched by id: they must be objects with unique, non-empty str/int ids
+
+    Raises:
+        ValueError: first problem found
+    """
+    if not isinstance(steps, list):
+        raise ValueError("steps must be a list")
+    seen = set()
+    for step in steps:
+        step_id = step.get("id") if isinstance(step, dict) else None
+        if not step_id or not isinstance(step_id, (str, int)):
+            raise ValueError("every step needs an id")
+        if step_id in seen:
+            raise ValueError(f"duplicate step id: {step_id}")
+        seen.add(step_id)
+
+
+def diff_steps(old_steps: Sequence[Mapping[str, Any]], new_steps: Sequence[Mapping[str, Any]]) -> FlowDiff:
+    """
+    Compare two step lists by step id
+
+    Args:
+        old_steps: Steps of the previous flow
+        new_steps: Steps of the modified flow
+
+    Returns:
+        FlowDiff
+    """
+    old = {step["id"]: step for step in old_steps}
+    new_ids = [step["id"] for step in new_steps]
+    diff = FlowDiff(removed=[step_id for step_id in old if step_id not in set(new_ids)])
+    kept = set(old) - set(diff.removed)
+    for step in new_steps:
+        previous = old.get(step["id"])
+        if previous is None:
+            diff.added.append(step["id"])
+        elif previous == step:
+            diff.unchanged.append(step["id"])
+        else:
+            diff.changed.append(step["id"])
+    diff.reordered = [step_id for step_id in old if step_id in kept] != [step_id for step_id in new_ids if step_id in kept]
+    for change in ("added", "removed", "changed", "unchanged"):
+        if getattr(diff, change):
+            REGENERATED_STEPS.inc(float(len(getattr(diff, change))), change)
+    return diff
+
+
+def merge_steps(steps: Sequence[Mapping[str, Any]], edited: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace steps by id with their edited versions; edited steps with new ids are appended"""
+    edits = {step["id"]: dict(step) for step in edited}
+    merged = [edits.pop(step["id"], dict(step)) for step in steps]
+    return merged + list(edits.values())
+
+
+def steps_patch(old_steps: Sequence[Mapping[str, Any]], new_steps: Sequence[Mapping[str, Any]], base: str) -> JSONPatch:
+    """
+    JSON patch turning old_steps (at JSON Pointer `base`) into new_steps
+
+    Operations use indices of the document as it is after the previous
+    operation: removals first (from the end), then moves / adds / replaces
+    walking the new order.
+    """
+    new_ids = {step["id"] for step in new_steps}
+    patch: JSONPatch = []
+    current = list(old_steps)
+    for index in range(len(current) - 1, -1, -1):
+        if current[index]["id"] not in new_ids:
+            patch.append({"op": "remove", "path": _pointer(base, index)})
+            del current[index]
+
+    for index, step in enumerate(new_steps):
+        position = next((i for i in range(index, len(current)) if current[i]["id"] == step["id"]), None)
+        if position is None:
+            patch.append({"op": "add", "path": _pointer(base, index), "value": step})
+            current.insert(index, step)
+            continue
+        if position != index:
+            patch.append({"op": "move", "from": _pointer(base, position), "path": _pointer(base, index)})
+            current.insert(index, current.pop(position))
+        if current[index] != step:
+            patch.append({"op": "replace", "path": _pointer(base, index), "value": step})
+            current[index] = step
+    return patch
+
+
+def flow_patch(old: Mapping[str, Any], new: Mapping[str, Any], base: str = "/flow") -> JSONPatch:
+    """JSON patch for a flow: top-level fields, then steps (see steps_patch)"""
+    patch: JSONPatch = []
+    for key in old.keys() - new.keys():
+        patch.append({"op": "remove", "path": _pointer(base, key)})
+    for key, value in new.items():
+        if key == "steps" and "steps" in old:
+            patch.extend(steps_patch(old["steps"], value, _pointer(base, "steps")))
+        elif key not in old:
+            patch.append({"op": "add", "path": _pointer(base, key), "value": value})
+        elif old[key] != value:
+            patch.append({"op": "replace", "path": _pointer(base, key), "value": value})
+    return patch
+
+
+def value_patch(old: Optional[Any], new: Optional[Any], path: str) -> JSONPatch:
+    """Single add / replace / remove for a whole value (ui HTML, wcag report)"""
+    if old == new:
+        return []
+    if new is None:
+        return [{"op": "remove", "path": path}]
+    return [{"op": "add" if old is None else "replace", "path": path, "value": new}]
@@ -0,0 +1,246 @@
+"""
+Flow store: згенеровані flows у локальному SQLite (FTS5 по BRD + індекси по послузі, компонентах, API, score)
+Generator бере найкраще оцінені flows для схожих BRD як few-shot приклади
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+import structlog
+
+from config import settings
+from services.static_data import DATA_DIR
+from utils.metrics import registry
+
+logger = structlog.get_logger()
+
+FLOW_STORE_LOOKUP = registry.histogram(
+    "yana_flow_store_lookup_seconds", "Similar-flow lookups in the flow store",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+FLOW_STORE_SAVED = registry.counter("yana_flow_store_saved_total", "Flows written to the flow store")
+
+# Same stemming as the component catalog search: prefix match covers Ukrainian word endings
+STEM_LENGTH = 5
+MIN_WORD_LENGTH = 3
+MAX_QUERY_TERMS = 24
+_WORD_RE = re.compile(r"\w+")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS flows ("
+    "id INTEGER PRIMARY KEY, service_name TEXT, brd TEXT NOT NULL, flow TEXT NOT NULL, "
+    "score REAL NOT NULL, passed INTEGER NOT NULL, created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS flows_service ON flows (service_name, score DESC)",
+    "CREATE INDEX IF NOT EXISTS flows_score ON flows (score DESC)",
+    "CREATE TABLE IF NOT EXISTS flow_components (flow_id INTEGER NOT NULL, component TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS flow_components_name ON flow_components (component, flow_id)",
+    "CREATE TABLE IF NOT EXISTS flow_apis (flow_id INTEGER NOT NULL, api TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS flow_apis_name ON flow_apis (api, flow_id)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS flows_fts USING fts5(brd, service_name, content='flows', content_rowid='id')",
+)
+
+
+def flow_components(flow: Mapping[str, Any]) -> Set[str]:
+    """Component names: DiiaFlow steps, generator `components` list or Flow model step types"""
+    names = {name for name in flow.get("components") or () if isinstance(name, str)}
+    for step in flow.get("steps") or ():
+        if not isinstance(step, dict):
+            continue
+        component = step.get("component")
+        if isinstance(component, dict) and component.get("component_name"):
+            names.add(component["component_name"])
+        elif isinstance(step.get("type"), str):
+            names.add(step["type"])
+    return names
+
+
+def flow_apis(flow: Mapping[str, Any]) -> Set[str]:
+    """Registry APIs: `required_apis` and `api_calls` of the flow and its steps"""
+    apis = {name for name in flow.get("required_apis") or () if isinstance(name, str)}
+    calls = list(flow.get("api_calls") or ())
+    for step in flow.get("steps") or ():
+        if isinstance(step, dict):
+            calls.extend(step.get("api_calls") or ())
+    for call in calls:
+        if isinstance(call, dict) and call.get("api_type"):
+            apis.add(call["api_type"])
+        elif isinstance(call, str):
+            apis.add(call)
+    return apis
+
+
+def fts_query(text: str) -> Optional[str]:
+    """FTS5 OR-query of quoted word stems (user text never reaches FTS syntax)"""
+    stems = []
+    for word in _WORD_RE.findall(text.lower()):
+        stem = word[:STEM_LENGTH]
+        if len(word) >= MIN_WORD_LENGTH and not word.isdigit() and stem not in stems:
+            stems.append(stem)
+    return " OR ".join(f'"{stem}"*' for stem in stems[:MAX_QUERY_TERMS]) or None
+
+
+def _record(row: tuple) -> Dict[str, Any]:
+    return {"id": row[0], "service_name": row[1], "brd": row[2], "flow": json.loads(row[3]),
+            "score": row[4], "passed": bool(row[5])}
+
+
+class FlowStore:
+    """
+    Persistent store of scored flows
+
+    The connection is opened lazily per process (safe across fork);
+    ":memory:" keeps flows for the lifetime of the process only.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                db.execute(statement)
+            db.commit()
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def save(
+        self,
+        brd: str,
+        flow: Mapping[str, Any],
+        score: float,
+        passed: bool = False,
+        service_name: Optional[str] = None
+    ) -> int:
+        """
+        Store a scored flow
+
+        Args:
+            brd: BRD / prompt the flow was generated from
+            flow: Flow JSON (any of the repo's flow shapes)
+            score: Total score 0-100 (validator / Judge)
+            passed: Whether the flow passed validation
+            service_name: Defaults to flow["service_name"]
+
+        Returns:
+            Flow id in the store
+        """
+        service_name = service_name or flow.get("service_name")
+        with self._lock:
+            db = self._connection()
+            with db:
+                flow_id = db.execute(
+                    "INSERT INTO flows (service_name, brd, flow, score, passed, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (service_name, brd, json.dumps(flow, ensure_ascii=False), float(score), int(passed), time.time())
+                ).lastrowid
+                db.execute(
+                    "INSERT INTO flows_fts (rowid, brd, service_name) VALUES (?, ?, ?)",
+                    (flow_id, brd, service_name or "")
+                )
+                db.executemany("INSERT INTO flow_components (flow_id, component) VALUES (?, ?)",
+                               [(flow_id, name) for name in sorted(flow_components(flow))])
+                db.executemany("INSERT INTO flow_apis (flow_id, api) VALUES (?, ?)",
+                               [(flow_id, name) for name in sorted(flow_apis(flow))])
+        FLOW_STORE_SAVED.inc()
+        return flow_id
+
+    def similar(
+        self,
+        brd: str,
+        limit: int = 2,
+        min_score: float = 0.0,
+        service_name: Optional[str] = None,
+        component: Optional[str] = None,
+        api: Optional[str] = None,
+        candidates: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Best-scoring flows among the most similar BRDs
+
+        The `candidates` closest BRDs by BM25 (passing the filters) are
+        re-ranked by score.
+
+        Returns:
+            [{"id", "service_name", "brd", "flow", "score", "passed"}]
+        """
+        query = fts_query(brd)
+        if query is None:
+            return []
+        sql = ["SELECT f.id, f.service_name, f.brd, f.flow, f.score, f.passed FROM flows_fts "
+               "JOIN flows f ON f.id = flows_fts.rowid WHERE flows_fts MATCH ? AND f.score >= ?"]
+        params: List[Any] = [query, min_score]
+        if service_name:
+            sql.append("AND f.service_name = ?")
+            params.append(service_name)
+        if component:
+            sql.append("AND f.id IN (SELECT flow_id FROM flow_components WHERE component = ?)")
+            params.append(component)
+        if api:
+            sql.append("AND f.id IN (SELECT flow_id FROM flow_apis WHERE api = ?)")
+            params.append(api)
+        sql.append("ORDER BY bm25(flows_fts) LIMIT ?")
+        params.append(candidates)
+
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                rows = self._connection().execute(" ".join(sql), params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Flow store lookup failed", error=str(e))
+            return []
+        finally:
+            FLOW_STORE_LOOKUP.observe(time.perf_counter() - started)
+
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return [_record(row) for row in rows[:limit]]
+
+    def best(
+        self,
+        limit: int = 10,
+        service_name: Optional[str] = None,
+        component: Optional[str] = None,
+        api: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Top-scoring flows by secondary indexes only (no BRD)"""
+        sql = ["SELECT id, service_name, brd, flow, score, passed FROM flows WHERE 1 = 1"]
+        params: List[Any] = []
+        if service_name:
+            sql.append("AND service_name = ?")
+            params.append(service_name)
+        if component:
+            sql.append("AND id IN (SELECT flow_id FROM flow_components WHERE component = ?)")
+            params.append(component)
+        if api:
+            sql.append("AND id IN (SELECT flow_id FROM flow_apis WHERE api = ?)")
+            params.append(api)
+        sql.append("ORDER BY score DESC LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            rows = self._connection().execute(" ".join(sql), params).fetchall()
+        return [_record(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM flows").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+# Global instance (persistent by default: stored flows are the Generator few-shot examples)
+flow_store = FlowStore(settings.flow_store_path or str(DATA_DIR / "flows.db"))
@@ -0,0 +1,501 @@
+"""
+Job Queue для довготривалих генерацій
+Bounded worker pool з пріоритетами та fair queuing по клієнтах
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import structlog
+
+from config import settings
+from utils.error_handlers import RateLimitError
+from utils.metrics import registry, gauge_lines
+from utils.tracing import current_traceparent, start_span
+from utils.wcag import analyze_html
+
+logger = structlog.get_logger()
+
+# Пріоритети: менше значення = обробляється раніше
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+
+
+class QueueFullError(RateLimitError):
+    """Raised when the job queue reached its pending limit"""
+
+
+class JobNotOwnedError(Exception):
+    """Raised when a job is queued or running on another worker process"""
+
+
+class Job:
+    """Single generation job with progress tracking"""
+
+    def __init__(self, prompt: str, client_id: str, priority: str = "normal", job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.prompt = prompt
+        self.client_id = client_id
+        self.priority = priority
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Trace context of the submitting request (not persisted)
+        self.traceparent: Optional[str] = current_traceparent()
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public payload (API responses, SSE events)"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "priority": self.priority,
+            "prompt": self.prompt,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Persisted form: public payload + client_id"""
+        return {**self.to_dict(), "client_id": self.client_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["prompt"], data["client_id"], data["priority"], job_id=data["job_id"])
+        job.status = data["status"]
+        job.stage = data.get("stage")
+        job.progress = data.get("progress", 0.0)
+        job.result = data.get("result")
+        job.error = data.get("error")
+        job.created_at = data["created_at"]
+        job.started_at = data.get("started_at")
+        job.finished_at = data.get("finished_at")
+        return job
+
+
+class JobStore:
+    """In-process job store with TTL pruning of finished jobs"""
+
+    def __init__(self, result_ttl: int = 3600):
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+
+    def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        if job.is_terminal:
+            self._prune()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def save_progress(self, job: Job) -> None:
+        """Non-terminal update (running / stage / progress); may be persisted later"""
+        self.save(job)
+
+    async def flush(self) -> None:
+        """Persist pending progress updates"""
+
+    def close(self) -> None:
+        pass
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_terminal and job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store with SQLite write-through
+    Finished jobs survive restarts; jobs interrupted mid-flight are marked failed
+
+    Several worker processes may share one file: lookups of jobs owned by
+    another worker fall through to SQLite. The connection is opened on first
+    use, so a store created before fork is never shared between processes.
+
+    New and finished jobs are written synchronously; progress updates are
+    coalesced per job and written from a worker thread, off the event loop.
+    """
+
+    def __init__(self, path: str, result_ttl: int = 3600, recover: bool = True):
+        super().__init__(result_ttl)
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._progress: Dict[str, Dict[str, Any]] = {}  # job id -> latest unwritten record
+        self._flusher: Optional[asyncio.Task] = None
+        if recover:
+            recover_interrupted_jobs(path)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = _connect(self.path)
+        return self._db
+
+    def save(self, job: Job) -> None:
+        super().save(job)
+        self._progress.pop(job.id, None)
+        self._write([job.to_record()])
+
+    def save_progress(self, job: Job) -> None:
+        JobStore.save(self, job)
+        self._progress[job.id] = job.to_record()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save(job)
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self.flush())
+
+    async def flush(self) -> None:
+        while self._progress:
+            records, self._progress = list(self._progress.values()), {}
+            await asyncio.to_thread(self._write, records)
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        # A progress record written late never overwrites a finished job
+        with self._db_lock:
+            self.db.executemany(
+                "INSERT INTO jobs (id, status, data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = excluded.status, data = excluded.data, "
+                "updated_at = excluded.updated_at WHERE jobs.status NOT IN ('completed', 'failed', 'cancelled') "
+                "OR excluded.status IN ('completed', 'failed', 'cancelled')",
+                [
+                    (record["job_id"], record["status"], json.dumps(record, ensure_ascii=False), time.time())
+                    for record in records
+                ]
+            )
+            self.db.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = super().get(job_id)
+        if job is not None:
+            return job
+        with self._db_lock:
+            row = self.db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed', 'cancelled') AND updated_at < ?",
+                (time.time() - self.result_ttl,)
+            )
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+    )
+    return db
+
+
+def recover_interrupted_jobs(path: str) -> int:
+    """
+    Mark jobs left unfinished by a previous server run as failed
+
+    Must run once per server start, not per worker (it would fail jobs that
+    other live workers are processing).
+
+    Returns:
+        Number of jobs marked failed
+    """
+    db = _connect(path)
+    try:
+        cursor = db.execute(
+            "UPDATE jobs SET status = 'failed', "
+            "data = json_set(data, '$.status', 'failed', '$.error', 'Interrupted by server restart') "
+            "WHERE status NOT IN ('completed', 'failed', 'cancelled')"
+        )
+        db.commit()
+        return cursor.rowcount
+    finally:
+        db.close()
+
+
+JobRunner = Callable[[Job, Callable[[str, float], None]], Awaitable[Dict[str, Any]]]
+
+
+async def run_generation_job(job: Job, report: Callable[[str, float], None]) -> Dict[str, Any]:
+    """Default job runner: Flow (Agent 1) → UI (Agent 2) через CodeMie"""
+    from services.service_registry import service_registry
+
+    service = service_registry.get("codemie")
+
+    report("generate_flow", 0.1)
+    flow = await service.generate_flow(job.prompt)
+
+    report("generate_ui", 0.5)
+    ui_html = await service.generate_ui(flow)
+
+    return {"flow": flow, "ui": ui_html, "wcag": analyze_html(ui_html), "status": "ready", "prompt": job.prompt}
+
+
+class JobQueue:
+    """
+    Bounded worker pool for generation jobs
+
+    Jobs are grouped by priority; within a priority level clients are served
+    round-robin so one chatty client cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: JobRunner = run_generation_job,
+        workers: int = 4,
+        max_pending: int = 100,
+        job_timeout: float = 300.0
+    ):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+
+        # priority -> client_id -> job ids (OrderedDict gives round-robin order)
+        self._queues: Dict[int, "OrderedDict[str, Deque[str]]"] = {
+            level: OrderedDict() for level in PRIORITIES.values()
+        }
+        self._pending = 0
+        self._available: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self) -> None:
+        """Spawn worker tasks (called from app lifespan)"""
+        self._stopping = False
+        self._available = asyncio.Semaphore(0)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info("Job queue started", workers=self.workers, max_pending=self.max_pending)
+
+    async def stop(self) -> None:
+        """Cancel workers; in-flight jobs are marked failed (interrupted by shutdown)"""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.store.flush()
+        self.store.close()
+        logger.info("Job queue stopped")
+
+    def submit(self, prompt: str, client_id: str, priority: str = "normal") -> Job:
+        """
+        Enqueue a generation job
+
+        Raises:
+            QueueFullError: if max_pending jobs are already waiting
+            ValueError: on unknown priority
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if self._pending >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending)", retry_after=5)
+
+        job = Job(prompt, client_id, priority)
+        self.store.save(job)
+
+        client_queues = self._queues[PRIORITIES[priority]]
+        client_queues.setdefault(client_id, deque()).append(job.id)
+        self._pending += 1
+        self._available.release()
+
+        logger.info("Job queued", job_id=job.id, client_id=client_id, priority=priority, pending=self._pending)
+        self._publish(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def owns(self, job: Job) -> bool:
+        """Whether the job is queued or running in this process"""
+        if job.id in self._running:
+            return True
+        client_queue = self._queues[PRIORITIES[job.priority]].get(job.client_id)
+        return bool(client_queue) and job.id in client_queue
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job
+
+        Raises:
+            JobNotOwnedError: if the job belongs to another worker (shared job store)
+        """
+        job = self.store.get(job_id)
+        if job is None or job.is_terminal:
+            return job
+        if not self.owns(job):
+            raise JobNotOwnedError(f"Job {job_id} is processed by another worker")
+
+        if job.id in self._running:
+            self._running[job.id].cancel()
+        else:
+            self._queues[PRIORITIES[job.priority]][job.client_id].remove(job.id)
+            self._pending -= 1
+            self._finish(job, "cancelled")
+        return job
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Subscribe to progress events of a job"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        job = self.store.get(job_id)
+        if job is not None:
+            queue.put_nowait(job.to_dict())
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(job_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(job_id, None)
+
+    def _next_job_id(self) -> Optional[str]:
+        """Pick next job: highest priority first, round-robin across clients"""
+        for level in sorted(self._queues):
+            client_queues = self._queues[level]
+            while client_queues:
+                client_id, queue = client_queues.popitem(last=False)
+                if not queue:
+                    continue
+                job_id = queue.popleft()
+                if queue:
+                    client_queues[client_id] = queue  # back of the line
+                return job_id
+        return None
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            await self._available.acquire()
+            job_id = self._next_job_id()
+            if job_id is None:
+                continue  # cancelled while queued
+            self._pending -= 1
+
+            job = self.store.get(job_id)
+            if job is None or job.is_terminal:
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            self._running[job.id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                if self._stopping:
+                    # The worker itself is cancelled (shutdown), not just the job
+                    self._finish(job, "failed", "Interrupted by server shutdown")
+                    raise
+                if not task.cancelled():
+                    raise
+                self._finish(job, "cancelled")
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        self.store.save_progress(job)
+        self._publish(job)
+        logger.info("Job started", job_id=job.id, wait_time=round(job.started_at - job.created_at, 3))
+
+        def report(stage: str, progress: float) -> None:
+            job.stage = stage
+            job.progress = progress
+            self.store.save_progress(job)
+            self._publish(job)
+
+        try:
+            with start_span("job.run", parent=job.traceparent, job_id=job.id, priority=job.priority):
+                job.result = await asyncio.wait_for(self.runner(job, report), timeout=self.job_timeout)
+            self._finish(job, "completed")
+        except asyncio.TimeoutError:
+            self._finish(job, "failed", f"Job timeout (>{self.job_timeout:.0f}s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Job failed", job_id=job.id, error=str(e))
+            self._finish(job, "failed", str(e))
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        if status == "completed":
+            job.stage = None
+            job.progress = 1.0
+        self.store.save(job)
+        self._publish(job)
+        logger.info("Job finished", job_id=job.id, status=status)
+
+    def _publish(self, job: Job) -> None:
+        event = job.to_dict()
+        for queue in self._subscribers.get(job.id, []):
+            queue.put_nowait(event)
+
+
+def _create_store() -> JobStore:
+    if settings.job_store_path:
+        return SQLiteJobStore(
+            settings.job_store_path, result_ttl=settings.job_result_ttl, recover=settings.job_store_recover
+        )
+    return JobStore(result_ttl=settings.job_result_ttl)
+
+
+# Global instance
+job_queue = JobQueue(
+    store=_create_store(),
+    workers=settings.job_workers,
+    max_pending=settings.job_queue_max_pending,
+    job_timeout=settings.job_timeout
+)
+
+
+registry.register_collector(lambda: gauge_lines(
+    "yana_job_queue_pending", "Generation jobs waiting for a worker", [({}, job_queue.pending)]
+) + gauge_lines(
+    "yana_job_queue_running", "Generation jobs being processed", [({}, len(job_queue._running))]
+))
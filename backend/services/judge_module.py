@@ -3,13 +3,45 @@ Judge Module - Diia Flow Scoring Rubric Implementation
 LLM-as-a-Judge для оцінки GovTech-комплаєнсу flow
 """
 import os
-from openai import OpenAI
-from typing import Dict, Any, List
+from openai import OpenAI, AsyncOpenAI
+from typing import Dict, Any, List, Set, Tuple
 import json
+import re
 import structlog
+from utils.rate_limit import admission
+from utils.retry import async_retry
+from utils.hedging import hedged
+from utils.http_client import traced_async_client, traced_sync_client
+from utils.metrics import track_stage, record_token_usage, registry, FALLBACKS
+from utils.json_stream import IncrementalJSONParser
+from services.static_data import static_data
+from config import settings
+from utils.prompt_builder import (
+    BuiltPrompt, PromptBuilder, compact_json, count_tokens, prompt_cache_params, truncate_strings
+)
 
 logger = structlog.get_logger()
 
+JUDGE_EARLY_ABORTS = registry.counter(
+    "yana_judge_early_abort_total", "Judge streams stopped once the flow could no longer pass"
+)
+
+# Score field → weight key
+SCORE_FIELDS = {
+    "component_compliance_score": "component_compliance",
+    "flow_length_score": "flow_length",
+    "api_dependency_score": "api_dependency",
+}
+
+# Step strings longer than this are cut when the prompt does not fit the budget
+JUDGE_MAX_STRING_CHARS = 120
+
+_WORD_RE = re.compile(r"[^\W\d]+")
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD_RE.findall(text.lower()) if len(word) >= 3]
+
 # Критична система промптів для Judge
 JUDGE_SYSTEM_PROMPT = """
 Ви є LLM-Judge (Експертний Аудитор), який оцінює якість та GovTech-комплаєнс прототипів державних послуг «Дія».
@@ -83,6 +115,9 @@ JUDGE_SYSTEM_PROMPT = """
 """
 
 
+_PROMPT_CACHE_PARAMS = prompt_cache_params(JUDGE_SYSTEM_PROMPT)
+
+
 class DiiaJudge:
     """
     Judge Module для Dual-LLM Architecture
@@ -90,25 +125,45 @@ class DiiaJudge:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY_JUDGE"))
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY_JUDGE"), http_client=traced_sync_client())
+        # Retries are handled by async_retry (budget + breaker), not by the SDK
+        self.async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY_JUDGE"), max_retries=0, http_client=traced_async_client()
+        )
         self.model = os.getenv("LLM_MODEL_JUDGE", "gpt-4-turbo")
         
+        # Rubric defaults from data/rubric.json (snapshot), overridable via .env
+        rubric = static_data.section("rubric")["judge"]
+        weights, penalties = rubric["weights"], rubric["penalties"]
+        self.pass_threshold = rubric["pass_threshold"]
+        
         # Ваги з .env
         self.weights = {
-            "component_compliance": float(os.getenv("SCORING_COMPONENT_COMPLIANCE_WEIGHT", 0.40)),
-            "flow_length": float(os.getenv("SCORING_FLOW_LENGTH_WEIGHT", 0.30)),
-            "api_dependency": float(os.getenv("SCORING_API_DEPENDENCY_WEIGHT", 0.30)),
+            "component_compliance": float(os.getenv("SCORING_COMPONENT_COMPLIANCE_WEIGHT", weights["component_compliance"])),
+            "flow_length": float(os.getenv("SCORING_FLOW_LENGTH_WEIGHT", weights["flow_length"])),
+            "api_dependency": float(os.getenv("SCORING_API_DEPENDENCY_WEIGHT", weights["api_dependency"])),
         }
         
         # Штрафи з .env
         self.penalties = {
-            "custom_component": int(os.getenv("PENALTY_CUSTOM_COMPONENT", 15)),
-            "redundant_step": int(os.getenv("PENALTY_REDUNDANT_STEP", 10)),
-            "manual_input": int(os.getenv("PENALTY_MANUAL_INPUT", 20)),
+            "custom_component": int(os.getenv("PENALTY_CUSTOM_COMPONENT", penalties["custom_component"])),
+            "redundant_step": int(os.getenv("PENALTY_REDUNDANT_STEP", penalties["redundant_step"])),
+            "manual_input": int(os.getenv("PENALTY_MANUAL_INPUT", penalties["manual_input"])),
         }
         
-        logger.info("DiiaJudge initialized", model=self.model, weights=self.weights)
+        # User prompt budget = context window share minus the (fixed) system prompt
+        self.system_prompt_tokens = count_tokens(JUDGE_SYSTEM_PROMPT, self.model)
+        self.prompt_budget = max(settings.judge_max_prompt_tokens - self.system_prompt_tokens, 0)
+        
+        logger.info("DiiaJudge initialized", model=self.model, weights=self.weights,
+                    prompt_budget=self.prompt_budget)
+    
+    async def aclose(self) -> None:
+        """Release HTTP connection pools of the OpenAI clients"""
+        await self.async_client.close()
+        self.client.close()
     
+    @track_stage("judge")
     def judge_flow(
         self,
         flow_json: Dict[str, Any],
@@ -131,70 +186,233 @@ class DiiaJudge:
         
         try:
             # Виклик GPT-4
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.1,  # Низька для консистентності
-                max_tokens=1500,
-                response_format={"type": "json_object"}  # Force JSON
-            )
-            
-            evaluation = json.loads(response.choices[0].message.content)
-            
-            # Додаткова валідація
-            evaluation = self._validate_and_enhance(evaluation, flow_json)
-            
-            logger.info(
-                "Flow evaluation complete",
-                total_score=evaluation.get("total_weighted_score"),
-                passed=evaluation.get("overall_assessment") == "PASSED"
-            )
-            
-            return evaluation
+            if settings.llm_stream:
+                return self._finish_evaluation(self._call_judge_stream(user_prompt), flow_json)
+            response = self._call_judge(user_prompt)
+            return self._process_response(response, flow_json)
             
         except Exception as e:
             logger.error("Judge evaluation failed", error=str(e))
             # Fallback to rule-based scoring
             return self._fallback_scoring(flow_json)
     
+    @track_stage("judge")
+    async def ajudge_flow(
+        self,
+        flow_json: Dict[str, Any],
+        rag_context: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Async judge_flow (hedged, не блокує event loop)"""
+        logger.info("Starting flow evaluation", flow_id=flow_json.get("flow_id"))
+        
+        user_prompt = self._prepare_judge_prompt(flow_json, rag_context)
+        
+        try:
+            if settings.llm_stream:
+                return self._finish_evaluation(await self._acall_judge_stream(user_prompt), flow_json)
+            response = await self._acall_judge(user_prompt)
+            return self._process_response(response, flow_json)
+            
+        except Exception as e:
+            logger.error("Judge evaluation failed", error=str(e))
+            return self._fallback_scoring(flow_json)
+    
+    def _process_response(self, response, flow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse Judge JSON and run additional validation"""
+        record_token_usage("openai", response.usage)
+        return self._finish_evaluation(json.loads(response.choices[0].message.content), flow_json)
+    
+    def _finish_evaluation(self, evaluation: Dict[str, Any], flow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a parsed (complete or early-aborted) evaluation"""
+        # Додаткова валідація
+        evaluation = self._validate_and_enhance(evaluation, flow_json)
+        
+        logger.info(
+            "Flow evaluation complete",
+            total_score=evaluation.get("total_weighted_score"),
+            passed=evaluation.get("overall_assessment") == "PASSED"
+        )
+        
+        return evaluation
+    
+    def _judge_request(self, user_prompt: str) -> Dict[str, Any]:
+        """
+        Chat completion parameters shared by sync and async clients
+
+        The constant system prompt (rubric) is the first message, so every call
+        shares a byte-identical prefix the provider can serve from its prompt cache.
+        """
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.1,  # Низька для консистентності
+            "max_tokens": 1500,
+            "response_format": {"type": "json_object"},  # Force JSON
+            **_PROMPT_CACHE_PARAMS
+        }
+    
+    @admission.limit("openai")
+    def _call_judge(self, user_prompt: str):
+        """Single Judge LLM call (admission-controlled)"""
+        return self.client.chat.completions.create(**self._judge_request(user_prompt))
+    
+    @hedged("openai")
+    @async_retry(max_attempts=2, initial_delay=0.5, breaker="openai")
+    @admission.limit("openai")
+    async def _acall_judge(self, user_prompt: str):
+        """Single async Judge LLM call (hedged, admission-controlled, circuit-broken)"""
+        return await self.async_client.chat.completions.create(**self._judge_request(user_prompt))
+    
+    @admission.limit("openai")
+    def _call_judge_stream(self, user_prompt: str) -> Dict[str, Any]:
+        """Streaming Judge call: fields are parsed as they arrive (admission-controlled)"""
+        parser = IncrementalJSONParser()
+        with self.client.chat.completions.create(
+            **self._judge_request(user_prompt), stream=True, stream_options={"include_usage": True}
+        ) as stream:
+            for chunk in stream:
+                if self._consume_chunk(chunk, parser):
+                    return parser.fields
+        return parser.close()
+    
+    @hedged("openai")
+    @async_retry(max_attempts=2, initial_delay=0.5, breaker="openai")
+    @admission.limit("openai")
+    async def _acall_judge_stream(self, user_prompt: str) -> Dict[str, Any]:
+        """Async streaming Judge call (hedged, admission-controlled, circuit-broken)"""
+        parser = IncrementalJSONParser()
+        async with await self.async_client.chat.completions.create(
+            **self._judge_request(user_prompt), stream=True, stream_options={"include_usage": True}
+        ) as stream:
+            async for chunk in stream:
+                if self._consume_chunk(chunk, parser):
+                    return parser.fields
+        return parser.close()
+    
+    def _consume_chunk(self, chunk, parser: IncrementalJSONParser) -> bool:
+        """
+        Feed one stream chunk to the parser
+
+        Returns:
+            True when the stream can be dropped: a score arrived that makes
+            PASSED unreachable (closing the stream stops generation and billing)
+
+        Raises:
+            JSONStreamError: Malformed output - fail now instead of after the full response
+        """
+        if chunk.usage:
+            record_token_usage("openai", chunk.usage)
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            return False
+        for key, value in parser.feed(chunk.choices[0].delta.content):
+            if key in SCORE_FIELDS and settings.judge_early_abort and self._cannot_pass(parser.fields, key):
+                return True
+        return False
+    
+    def _cannot_pass(self, evaluation: Dict[str, Any], field: str) -> bool:
+        """Scores so far + 100 for the missing ones still below pass_threshold → mark the evaluation aborted"""
+        try:
+            best_total = sum(
+                self.weights[weight] * float(evaluation.get(score, 100)) for score, weight in SCORE_FIELDS.items()
+            )
+        except (TypeError, ValueError):
+            return False
+        if best_total >= self.pass_threshold:
+            return False
+        # Unscored fields stay None: filling them in would contradict the upper bound above
+        evaluation["aborted"] = True
+        evaluation["total_weighted_score"] = round(best_total, 2)
+        evaluation["early_abort"] = {"after_field": field, "max_total_weighted_score": round(best_total, 2)}
+        JUDGE_EARLY_ABORTS.inc()
+        logger.info("Judge stream aborted early", field=field, value=evaluation[field], max_total=best_total)
+        return True
+    
     def _prepare_judge_prompt(
         self,
         flow_json: Dict[str, Any],
         rag_context: Dict[str, Any]
     ) -> str:
-        """Підготувати промпт для Judge з RAG контекстом"""
-        
-        prompt = f"""
-Оцініть наступний User Flow для державної послуги:
+        """
+        Підготувати промпт для Judge з RAG контекстом
+
+        Flow steps go in as compact JSON; RAG components / APIs are ranked by
+        relevance to the flow and trimmed to the prompt token budget.
+        """
+        rag_context = rag_context or {}
+        steps = flow_json.get("steps", [])
+        used_components, used_apis, flow_words = self._flow_terms(flow_json)
+
+        # RAG results from several searches repeat entries - keep the first of each name
+        components = sorted(
+            {comp.get("component_name"): comp for comp in reversed(rag_context.get("components", []))}.values(),
+            key=lambda comp: (comp.get("component_name") not in used_components,
+                              -len(flow_words & set(_words(comp.get("usage_context", "")))))
+        )
+        apis = sorted(
+            {api.get("api_name_ua"): api for api in reversed(rag_context.get("api_mocks", []))}.values(),
+            key=lambda api: (api.get("api_name") not in used_apis,
+                             -len(flow_words & set(api.get("available_fields", []))))
+        )
+
+        prompt = self._assemble_prompt(flow_json, steps, components, apis)
+        if prompt.report["over_budget"]:
+            # Last resort: shorten long strings in step data (labels, descriptions, example text)
+            prompt = self._assemble_prompt(flow_json, truncate_strings(steps, JUDGE_MAX_STRING_CHARS), components, apis)
+
+        logger.info("Judge prompt built", flow_id=flow_json.get("flow_id"),
+                    system_tokens=self.system_prompt_tokens, **prompt.report)
+        if prompt.report["over_budget"]:
+            logger.warning("Judge prompt exceeds token budget", tokens=prompt.tokens, budget=self.prompt_budget)
+        return prompt.text
+
+    def _assemble_prompt(
+        self,
+        flow_json: Dict[str, Any],
+        steps: List[Dict[str, Any]],
+        components: List[Dict[str, Any]],
+        apis: List[Dict[str, Any]]
+    ) -> BuiltPrompt:
+        builder = PromptBuilder(self.prompt_budget, model=self.model, name="judge")
+        builder.add_text("flow", f"""Оцініть наступний User Flow для державної послуги:
 
 === FLOW DATA ===
 Service: {flow_json.get('service_name_ua', 'Unknown')}
 Total Steps: {flow_json.get('total_steps', 0)}
-
-Steps:
-{json.dumps(flow_json.get('steps', []), indent=2, ensure_ascii=False)}
-
+Steps: {compact_json(steps)}
 Required APIs: {', '.join(flow_json.get('required_apis', []))}
 
-=== RAG CONTEXT (Available Components) ===
-"""
-        
-        if rag_context and "components" in rag_context:
-            prompt += "\nDiia Design System Components:\n"
-            for comp in rag_context["components"]:
-                prompt += f"- {comp['component_name']}: {comp['usage_context']}\n"
-        
-        if rag_context and "api_mocks" in rag_context:
-            prompt += "\n\nAvailable API Data:\n"
-            for api in rag_context["api_mocks"]:
-                prompt += f"- {api['api_name_ua']}: {', '.join(api['available_fields'])}\n"
-        
-        prompt += "\n\nОцініть flow та поверніть JSON з оцінками."
-        
-        return prompt
+=== RAG CONTEXT ===""")
+        builder.add_ranked(
+            "components", "Diia Design System Components:",
+            [f"- {comp['component_name']}: {comp['usage_context']}" for comp in components],
+            priority=0
+        )
+        builder.add_ranked(
+            "api_mocks", "Available API Data:",
+            [f"- {api['api_name_ua']}: {', '.join(api['available_fields'])}" for api in apis],
+            priority=1
+        )
+        builder.add_text("instruction", "Оцініть flow та поверніть JSON з оцінками.")
+        return builder.build()
+
+    @staticmethod
+    def _flow_terms(flow_json: Dict[str, Any]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Component names, API names and lowercase words used by the flow (for RAG ranking)"""
+        components: Set[str] = set()
+        apis: Set[str] = set(flow_json.get("required_apis", []))
+        for step in flow_json.get("steps", []):
+            component = step.get("component")
+            if isinstance(component, dict):
+                components.add(component.get("component_name"))
+            elif isinstance(component, str):
+                components.add(component)
+            for call in step.get("api_calls", []) or []:
+                if isinstance(call, dict):
+                    apis.add(call.get("api_type"))
+        return components, apis, set(_words(compact_json(flow_json.get("steps", []))))
     
     def _validate_and_enhance(
         self,
@@ -210,8 +428,12 @@ Required APIs: {', '.join(flow_json.get('required_apis', []))}
             "api_dependency_score"
         ]
         
+        aborted = evaluation.get("aborted", False)
         for field in required_fields:
             if field not in evaluation:
+                if aborted:
+                    evaluation[field] = None  # Not scored: stream stopped early
+                    continue
                 logger.warning(f"Missing field in evaluation: {field}")
                 evaluation[field] = 50  # Default
         
@@ -230,7 +452,7 @@ Required APIs: {', '.join(flow_json.get('required_apis', []))}
         
         # Pass/Fail threshold
         evaluation["overall_assessment"] = (
-            "PASSED" if evaluation["total_weighted_score"] >= 70 else "FAILED"
+            "PASSED" if evaluation["total_weighted_score"] >= self.pass_threshold else "FAILED"
         )
         
         return evaluation
@@ -239,6 +461,7 @@ Required APIs: {', '.join(flow_json.get('required_apis', []))}
         """Rule-based fallback якщо Judge LLM недоступний"""
         
         logger.warning("Using fallback rule-based scoring")
+        FALLBACKS.inc(1.0, "judge")
         
         steps = flow_json.get("steps", [])
         num_steps = len(steps)
@@ -259,7 +482,7 @@ Required APIs: {', '.join(flow_json.get('required_apis', []))}
             "flow_length_score": flow_length_score,
             "api_dependency_score": api_dependency_score,
             "total_weighted_score": total_score,
-            "overall_assessment": "PASSED" if total_score >= 70 else "FAILED",
+            "overall_assessment": "PASSED" if total_score >= self.pass_threshold else "FAILED",
             "component_compliance_justification": "Fallback scoring (Judge LLM unavailable)",
             "flow_length_justification": f"Flow has {num_steps} steps",
             "api_dependency_justification": f"Uses {len(flow_json.get('required_apis', []))} APIs",
@@ -267,5 +490,10 @@ Required APIs: {', '.join(flow_json.get('required_apis', []))}
         }
 
 
-# Instantiate Judge
-diia_judge = DiiaJudge()
+def __getattr__(name: str):
+    # `from services.judge_module import diia_judge` keeps working,
+    # the instance is built on first access (see services.service_registry)
+    if name == "diia_judge":
+        from services.service_registry import service_registry
+        return service_registry.get("judge")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,14 +3,42 @@ Integration Layer: Dual-LLM + MCP Server
 Connects Generator/Judge with MCP Tools
 """
 import asyncio
-from typing import Dict, Any
-from services.dual_llm_service import dual_llm_service
-from mcp_servers.yana_mcp_server import mcp_server
+import json
+import sqlite3
+from typing import Dict, Any, Optional, Tuple
 import structlog
+from services.flow_store import flow_store
+from services.service_registry import service_registry
+from utils.metrics import track_stage
 
 logger = structlog.get_logger()
 
 
+def judged_best_variant(result: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], float, bool]]:
+    """
+    (flow, total score, passed) of the variant the Judge picked
+
+    None when the Judge output is not JSON naming one of the variants
+    with a numeric total_weighted_score.
+    """
+    try:
+        verdict = json.loads(result["evaluation"]["evaluation"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not isinstance(verdict, dict):
+        return None
+    best = verdict.get("best_variant", verdict)
+    if not isinstance(best, dict):
+        best = {"variant_id": best}
+    score = best.get("total_weighted_score", verdict.get("total_weighted_score"))
+    variant = next((v for v in result["variants"] if v.get("variant_id") == best.get("variant_id")), None)
+    if variant is None or not isinstance(variant.get("flow"), dict) or not isinstance(score, (int, float)):
+        return None
+    passed = best.get("overall_assessment", verdict.get("overall_assessment")) == "PASSED"
+    return variant["flow"], float(score), passed
+
+
+@track_stage("mcp_pipeline")
 async def generate_flow_with_mcp(brd_text: str) -> Dict[str, Any]:
     """
     Enhanced flow generation з MCP tools
@@ -28,6 +56,7 @@ async def generate_flow_with_mcp(brd_text: str) -> Dict[str, Any]:
         Best flow with scores and validation
     """
     logger.info("Starting flow generation with MCP", brd_text_length=len(brd_text))
+    mcp_server = service_registry.get("mcp")
     
     # Step 1: Search for relevant components
     logger.info("Step 1: Component search via MCP")
@@ -54,9 +83,11 @@ async def generate_flow_with_mcp(brd_text: str) -> Dict[str, Any]:
     
     # Step 3: Generate variants (Dual-LLM Service)
     logger.info("Step 2: Generating variants via Dual-LLM")
-    result = dual_llm_service.orchestrate(
+    result = await service_registry.get("dual_llm").aorchestrate(
         brd_text=enhanced_brd,
-        rag_context=component_context
+        rag_context=component_context,
+        # Component context is shared boilerplate: few-shot lookup by the BRD itself
+        few_shot_query=brd_text
     )
     
     # Step 4: Validate best variant with MCP
@@ -77,6 +108,18 @@ async def generate_flow_with_mcp(brd_text: str) -> Dict[str, Any]:
         flow_json=mock_flow
     )
     
+    # Step 5: Keep the Judge's best variant as a future few-shot example
+    # (not the placeholder flow above: the store would feed it back to the Generator)
+    best = judged_best_variant(result)
+    if best is None:
+        logger.info("Judge verdict names no parsed variant, flow store not updated")
+    else:
+        flow, score, passed = best
+        try:
+            await asyncio.to_thread(flow_store.save, brd_text, flow, score, passed)
+        except sqlite3.Error as e:
+            logger.warning("Flow store write failed", error=str(e))
+    
     return {
         "brd_text": brd_text,
         "components_found": components,
@@ -92,6 +135,7 @@ async def test_mcp_integration():
     """Test MCP integration"""
     
     print("🧪 Testing MCP Server Integration\n")
+    mcp_server = service_registry.get("mcp")
     
     # Test 1: Component Search
     print("1️⃣ Testing Component Search...")
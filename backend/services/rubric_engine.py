@@ -0,0 +1,234 @@
+"""
+Rubric engine: детерміновані локальні перевірки flow без LLM
+Компоненти проти catalog, props проти props_schema, WCAG heuristics, ручне введення даних, доступних з реєстрів
+"""
+import re
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from services.component_catalog import ComponentCatalog, component_catalog
+from services.static_data import static_data
+from utils.wcag import analyze_html
+
+# props_schema type → accepted JSON types; handlers ("function") arrive as names in flow JSON
+_PROP_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "function": (str,),
+}
+
+# Accessibility levels below the rubric minimum (AA)
+_WEAK_ACCESSIBILITY = frozenset({"", "A"})
+
+_SPACES_RE = re.compile(r"[\s\-]+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES_RE.sub(" ", text.strip().lower().replace("_", " "))
+
+
+def _issue(code: str, severity: str, message_ua: str, fix_suggestion: str, step_id: Any = None) -> Dict[str, Any]:
+    issue = {"code": code, "severity": severity, "message_ua": message_ua, "fix_suggestion": fix_suggestion}
+    if step_id is not None:
+        issue["step_id"] = step_id
+    return issue
+
+
+def step_fields(step: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+    """Form fields of a step: DiiaFlow `component.props.fields` or Flow model `fields`"""
+    component = step.get("component")
+    fields = component.get("props", {}).get("fields") if isinstance(component, dict) else None
+    if fields is None:
+        fields = step.get("fields")
+    return [field if isinstance(field, dict) else {"name": str(field)} for field in fields or ()]
+
+
+class RubricEngine:
+    """
+    Local rule checks for the Diia Flow Scoring Rubric
+
+    Lookup tables (component props, registry field index) are built once and
+    rebuilt when the component catalog changes, so `check()` is a single
+    pass over the flow steps (plus one over the HTML when given).
+    """
+
+    def __init__(
+        self,
+        catalog: ComponentCatalog = component_catalog,
+        api_specs: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        rubric: Optional[Mapping[str, Any]] = None
+    ):
+        self.catalog = catalog
+        rubric = rubric if rubric is not None else static_data.section("rubric")["validator"]
+        self.penalties = rubric["penalties"]
+        manual_input = rubric["manual_input"]
+        self._aliases = {_normalize(alias): field for alias, field in manual_input["aliases"].items()}
+        self._ignored = frozenset(manual_input["ignore"])
+        self._registry_fields = self._index_api_specs(api_specs if api_specs is not None else static_data.section("api_specs"))
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._rebuild_components()
+        catalog.subscribe(lambda added, removed, changed: self._rebuild_components())
+
+    # ==================== Lookup tables ====================
+
+    def _rebuild_components(self) -> None:
+        """name → {"props": {prop: (types, required)}, "accessibility_level": str}"""
+        components = {}
+        for component in self.catalog:
+            props = {}
+            for prop, kind in component.props_schema:
+                base = kind.split("(", 1)[0].strip().lower()
+                props[prop] = (_PROP_TYPES.get(base), "required" in kind)
+            components[component.name] = {"props": props, "accessibility_level": component.accessibility_level}
+        self._components = components
+
+    def _index_api_specs(self, api_specs: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[Tuple[str, str]]]:
+        """Registry field (and its Ukrainian description) → [(api_name, api_name_ua)]"""
+        index: Dict[str, List[Tuple[str, str]]] = {}
+        for api_name, spec in api_specs.items():
+            source = (api_name, spec.get("api_name_ua", api_name))
+            for field in spec.get("available_fields", ()):
+                index.setdefault(field, []).append(source)
+            for field, description in spec.get("field_descriptions", {}).items():
+                self._aliases.setdefault(_normalize(description), field)
+        return index
+
+    def registry_sources(self, field: Mapping[str, Any]) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """Registry field a form field duplicates (by name, then label) and the APIs that provide it"""
+        for text in (field.get("name"), field.get("label")):
+            if not text:
+                continue
+            key = _normalize(str(text))
+            canonical = self._aliases.get(key, key.replace(" ", "_"))
+            if canonical in self._ignored:
+                continue
+            sources = self._registry_fields.get(canonical)
+            if sources:
+                return canonical, sources
+        return None, []
+
+    # ==================== Checks ====================
+
+    def check(self, flow: Mapping[str, Any], html: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run all local checks
+
+        Args:
+            flow: DiiaFlow JSON (steps with component / api_calls) or Flow model dict
+            html: Generated UI (optional) for WCAG heuristics
+
+        Returns:
+            component_compliance_score, wcag_score, manual_input_fields and issues
+        """
+        issues: List[Dict[str, Any]] = []
+        compliance_penalty = 0
+        wcag_penalty = 0
+        manual_fields: List[Dict[str, Any]] = []
+        called_apis = set(flow.get("required_apis", ()))
+
+        steps = flow.get("steps", ())
+        for step in steps:
+            for call in step.get("api_calls") or ():
+                if isinstance(call, dict):
+                    called_apis.add(call.get("api_type"))
+
+        for step in steps:
+            step_id = step.get("step_id", step.get("id"))
+            component = step.get("component")
+            if isinstance(component, dict) and component.get("component_name"):
+                compliance_penalty += self._check_component(component, step_id, issues)
+                spec = self._components.get(component["component_name"])
+                if spec is not None and spec["accessibility_level"] in _WEAK_ACCESSIBILITY:
+                    wcag_penalty += self.penalties["wcag_issue"]
+                    issues.append(_issue(
+                        "weak_accessibility", "warning",
+                        f"Компонент '{component['component_name']}' не має рівня доступності AA",
+                        "Використати компонент з accessibility_level AA", step_id
+                    ))
+
+            for field in step_fields(step):
+                if not field.get("label") and field.get("type") != "hidden":
+                    wcag_penalty += self.penalties["wcag_issue"]
+                    issues.append(_issue(
+                        "field_without_label", "warning",
+                        f"Поле '{field.get('name', '?')}' без label",
+                        "Додати видимий label до кожного поля форми", step_id
+                    ))
+                registry_field, sources = self.registry_sources(field)
+                if registry_field:
+                    prefilled = [name for name, _ in sources if name in called_apis]
+                    manual_fields.append({
+                        "step_id": step_id, "field": field.get("name"), "registry_field": registry_field,
+                        "apis": [name for name, _ in sources], "api_already_called": bool(prefilled),
+                    })
+                    api_name_ua = next((ua for name, ua in sources if name in prefilled), sources[0][1])
+                    issues.append(_issue(
+                        "manual_input", "error",
+                        f"Поле '{field.get('name')}' вводиться вручну, але доступне з реєстру ({api_name_ua})",
+                        "Отримати значення через API і показати його без ручного введення", step_id
+                    ))
+
+        wcag_score = 100
+        if html:
+            report = analyze_html(html)
+            wcag_score = report["score"]
+            for issue in report["issues"]:
+                issues.append(_issue(
+                    issue["code"], "error" if issue["severity"] == "error" else "warning",
+                    f"WCAG: {issue['message']}" + (f" (×{issue['count']})" if issue["count"] > 1 else ""),
+                    "Виправити розмітку за WCAG 2.1 AA"
+                ))
+
+        return {
+            "component_compliance_score": max(0, 100 - compliance_penalty),
+            "wcag_score": max(0, wcag_score - wcag_penalty),
+            "manual_input_fields": manual_fields,
+            "manual_input_penalty": self.penalties["manual_input"] * len(manual_fields),
+            "issues": issues,
+        }
+
+    def _check_component(self, component: Mapping[str, Any], step_id: Any, issues: List[Dict[str, Any]]) -> int:
+        """Penalty for one step component: unknown to the catalog, bad / missing props"""
+        name = component["component_name"]
+        spec = self._components.get(name)
+        if spec is None:
+            issues.append(_issue(
+                "custom_component", "error",
+                f"Компонент '{name}' відсутній у Diia Design System",
+                "Замінити на компонент з каталогу (search_diia_component)", step_id
+            ))
+            return self.penalties["custom_component"]
+
+        penalty = 0
+        props = component.get("props") or {}
+        schema = spec["props"]
+        for prop, value in props.items():
+            if prop not in schema:
+                penalty += self.penalties["invalid_prop"]
+                issues.append(_issue(
+                    "unknown_prop", "warning", f"'{name}' не має prop '{prop}'",
+                    f"Допустимі props: {', '.join(schema)}", step_id
+                ))
+                continue
+            types = schema[prop][0]
+            if types and value is not None and (not isinstance(value, types) or (bool not in types and isinstance(value, bool))):
+                penalty += self.penalties["invalid_prop"]
+                issues.append(_issue(
+                    "invalid_prop_type", "warning",
+                    f"'{name}.{prop}' має тип {type(value).__name__}, очікується {types[0].__name__}",
+                    "Виправити тип значення prop", step_id
+                ))
+        for prop, (_, required) in schema.items():
+            if required and prop not in props:
+                penalty += self.penalties["missing_required_prop"]
+                issues.append(_issue(
+                    "missing_required_prop", "error", f"'{name}' без обов'язкового prop '{prop}'",
+                    f"Додати '{prop}'", step_id
+                ))
+        return penalty
+
+
+# Global instance
+rubric_engine = RubricEngine()
@@ -0,0 +1,250 @@
+"""
+Semantic prompt cache перед /api/generate: результат для перефразованого prompt без повторної генерації
+Embedding prompt → найближчий сусід у in-process LSH індексі (random hyperplanes) → hit, якщо cosine ≥ threshold
+"""
+import asyncio
+import random
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from config import settings
+from utils.embeddings import DIMENSIONS, EMBEDDERS, create_embedder, dot, resolve_embedder
+from utils.metrics import registry, gauge_lines
+from services.service_registry import service_registry
+
+logger = structlog.get_logger()
+
+SEMANTIC_CACHE_OPS = registry.counter(
+    "yana_semantic_cache_total", "Semantic prompt cache lookups by result", ("result",)
+)
+
+
+class SimHashIndex:
+    """
+    Approximate nearest neighbours for unit vectors (cosine)
+
+    Each vector gets a `bands * band_bits` bit signature from random
+    hyperplanes; vectors sharing all bits of any band are candidates and
+    only candidates are compared exactly. With 16 bands of 8 bits a
+    neighbour at cosine 0.85 is a candidate with probability ~0.98, one at
+    0.3 with ~0.2.
+    """
+
+    def __init__(self, dimensions: int = DIMENSIONS, bands: int = 16, band_bits: int = 8, seed: int = 17):
+        rng = random.Random(seed)
+        self.bands = bands
+        self.band_bits = band_bits
+        self._planes = [array("f", (rng.gauss(0.0, 1.0) for _ in range(dimensions))) for _ in range(bands * band_bits)]
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(bands)]
+        self._vectors: Dict[int, Tuple[array, Tuple[int, ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def _signature(self, vector: array) -> Tuple[int, ...]:
+        keys = []
+        for band in range(self.bands):
+            key = 0
+            for plane in self._planes[band * self.band_bits:(band + 1) * self.band_bits]:
+                key = (key << 1) | (dot(plane, vector) >= 0.0)
+            keys.append(key)
+        return tuple(keys)
+
+    def add(self, item_id: int, vector: array) -> None:
+        signature = self._signature(vector)
+        self._vectors[item_id] = (vector, signature)
+        for band, key in enumerate(signature):
+            self._buckets[band].setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        entry = self._vectors.pop(item_id, None)
+        if entry is None:
+            return
+        for band, key in enumerate(entry[1]):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def nearest(self, vector: array) -> Tuple[Optional[int], float]:
+        """(item id, cosine) of the closest candidate, (None, 0.0) when there is none"""
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._signature(vector)):
+            candidates |= self._buckets[band].get(key, set())
+        best_id, best_similarity = None, 0.0
+        for item_id in candidates:
+            similarity = dot(self._vectors[item_id][0], vector)
+            if similarity > best_similarity:
+                best_id, best_similarity = item_id, similarity
+        return best_id, best_similarity
+
+
+class SemanticCache:
+    """
+    Generation results keyed by prompt meaning
+
+    Entries expire after `ttl`; with one TTL for all entries insertion order
+    is expiry order, so expiry pops the front of an OrderedDict. When the
+    cache is full the entry with the fewest hits is evicted (on ties, the one
+    that reached that count first): entries are also grouped in ordered
+    buckets by hit count (LFU), so a hit and an eviction are O(1) too. Tenants in `opt_out` neither read
+    nor write the cache.
+    """
+
+    def __init__(self, embedder, threshold: float, max_entries: int, ttl: float, opt_out: Set[str]):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.opt_out = opt_out
+        self.index = SimHashIndex()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # hits → item ids in insertion order; _min_hits may point at an emptied bucket (fixed up on eviction)
+        self._by_hits: Dict[int, "OrderedDict[int, None]"] = {}
+        self._min_hits = 0
+        self._next_id = 0
+        self._lock = asyncio.Lock()
+
+    def enabled_for(self, tenant: str) -> bool:
+        return self.max_entries > 0 and tenant not in self.opt_out
+
+    async def _embed(self, prompt: str) -> Optional[array]:
+        try:
+            return await self.embedder.embed(prompt)
+        except Exception as e:
+            logger.warning("Prompt embedding failed", embedder=self.embedder.name, error=str(e))
+            SEMANTIC_CACHE_OPS.inc(1.0, "error")
+            return None
+
+    async def lookup(self, prompt: str, tenant: str) -> Tuple[Optional[Dict[str, Any]], Optional[array], float]:
+        """
+        Cached result for a prompt with the same meaning
+
+        Returns:
+            (result or None, prompt embedding to pass to store(), similarity)
+        """
+        if not self.enabled_for(tenant):
+            SEMANTIC_CACHE_OPS.inc(1.0, "bypass")
+            return None, None, 0.0
+        vector = await self._embed(prompt)
+        if vector is None:
+            return None, None, 0.0
+        async with self._lock:
+            self._expire()
+            item_id, similarity = self.index.nearest(vector)
+            if item_id is None or similarity < self.threshold:
+                SEMANTIC_CACHE_OPS.inc(1.0, "miss")
+                return None, vector, similarity
+            entry = self._entries[item_id]
+            self._hit(item_id, entry)
+        SEMANTIC_CACHE_OPS.inc(1.0, "hit")
+        logger.info("Semantic cache hit", similarity=round(similarity, 3), cached_prompt=entry["prompt"][:100])
+        return entry["result"], vector, similarity
+
+    async def store(self, prompt: str, vector: Optional[array], result: Dict[str, Any], tenant: str) -> None:
+        """Remember a successful generation (vector from lookup())"""
+        if vector is None or not self.enabled_for(tenant):
+            return
+        async with self._lock:
+            self._expire()
+            while len(self._entries) >= self.max_entries:
+                self._evict()
+            item_id = self._next_id
+            self._next_id += 1
+            self._entries[item_id] = {"prompt": prompt, "result": result, "created_at": time.time(), "hits": 0}
+            self._by_hits.setdefault(0, OrderedDict())[item_id] = None
+            self._min_hits = 0
+            self.index.add(item_id, vector)
+
+    def _hit(self, item_id: int, entry: Dict[str, Any]) -> None:
+        hits = entry["hits"]
+        self._unlink(item_id, hits)
+        entry["hits"] = hits + 1
+        self._by_hits.setdefault(hits + 1, OrderedDict())[item_id] = None
+        if self._min_hits == hits and hits not in self._by_hits:
+            self._min_hits = hits + 1
+
+    def _unlink(self, item_id: int, hits: int) -> None:
+        bucket = self._by_hits[hits]
+        del bucket[item_id]
+        if not bucket:
+            del self._by_hits[hits]
+
+    def _remove(self, item_id: int) -> None:
+        entry = self._entries.pop(item_id)
+        self._unlink(item_id, entry["hits"])
+        self.index.remove(item_id)
+
+    def _evict(self) -> None:
+        if self._min_hits not in self._by_hits:
+            # Expiry emptied the least-hit bucket; distinct hit counts are few
+            self._min_hits = min(self._by_hits)
+        self._remove(next(iter(self._by_hits[self._min_hits])))
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        while self._entries and next(iter(self._entries.values()))["created_at"] < cutoff:
+            self._remove(next(iter(self._entries)))
+
+    async def aclose(self) -> None:
+        await self.embedder.aclose()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_semantic_cache() -> SemanticCache:
+    """Lazy factory registered in service_registry ("semantic_cache")"""
+    embedder = create_embedder(settings.semantic_cache_embedder, settings.semantic_cache_embedding_model)
+    return SemanticCache(
+        embedder,
+        threshold=settings.semantic_cache_threshold or embedder.default_threshold,
+        max_entries=settings.semantic_cache_max_entries,
+        ttl=settings.semantic_cache_ttl,
+        opt_out=set(settings.semantic_cache_opt_out_list),
+    )
+
+
+def semantic_cache_info() -> Dict[str, Any]:
+    """Effective configuration for /health and the startup log (does not build the cache)"""
+    embedder = resolve_embedder(settings.semantic_cache_embedder)
+    initialized = service_registry.is_initialized("semantic_cache")
+    return {
+        "enabled": settings.semantic_cache_max_entries > 0,
+        "embedder": embedder,
+        # The local embedder is lexical: only close rewordings hit, not paraphrases
+        "paraphrase_matching": embedder == "openai",
+        "threshold": settings.semantic_cache_threshold or EMBEDDERS[embedder].default_threshold,
+        "entries": len(service_registry.get("semantic_cache")) if initialized else None,
+    }
+
+
+def log_semantic_cache_config() -> None:
+    info = semantic_cache_info()
+    if not info["enabled"]:
+        return
+    if info["embedder"] != settings.semantic_cache_embedder:
+        logger.warning(
+            "OPENAI_API_KEY not set, semantic cache falls back to the lexical local embedder: "
+            "only close rewordings hit, paraphrases miss",
+            threshold=info["threshold"]
+        )
+    else:
+        logger.info("Semantic cache configured", embedder=info["embedder"], threshold=info["threshold"])
+
+
+def _collect_cache_metrics():
+    if not service_registry.is_initialized("semantic_cache"):
+        return []
+    return gauge_lines(
+        "yana_semantic_cache_entries", "Entries in the semantic prompt cache",
+        [({}, float(len(service_registry.get("semantic_cache"))))]
+    )
+
+
+registry.register_collector(_collect_cache_metrics)
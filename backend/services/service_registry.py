@@ -0,0 +1,155 @@
+"""
+Lazy service singletons: створюються при першому використанні, не при імпорті
+Lifecycle (warmup / shutdown) керується з main.lifespan
+"""
+import asyncio
+import importlib
+import importlib.util
+import inspect
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+import structlog
+
+from utils.metrics import registry as metrics_registry, gauge_lines
+
+logger = structlog.get_logger()
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+Factory = Union[str, Callable[[], Any]]
+
+
+def load_mcp_module():
+    """Import mcp-servers/yana_mcp_server.py (directory name is not a valid package)"""
+    name = "mcp_servers.yana_mcp_server"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, BACKEND_DIR / "mcp-servers" / "yana_mcp_server.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return sys.modules[name]
+
+
+def _resolve(factory: Factory) -> Callable[[], Any]:
+    """'package.module:Class' → Class (imported only now)"""
+    if callable(factory):
+        return factory
+    module_name, _, attr = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class ServiceRegistry:
+    """
+    Named lazy singletons
+
+    `get(name)` builds the instance on first use (thread-safe, once);
+    `warmup()` builds several concurrently; `shutdown()` closes built
+    instances (`aclose()` / `close()` if they have one) and forgets them.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Factory] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, factory: Factory) -> None:
+        """
+        Args:
+            name: Service name
+            factory: Zero-arg callable or 'module:attr' import path (resolved lazily)
+        """
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = _resolve(self._factories[name])()
+                self._init_seconds[name] = time.perf_counter() - started
+                self._instances[name] = instance
+                logger.info("Service initialized", service=name, init_ms=round(self._init_seconds[name] * 1000, 1))
+            return instance
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def override(self, name: str, instance: Any) -> None:
+        """Replace a service instance (tests, benchmarks)"""
+        self._instances[name] = instance
+
+    async def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """
+        Build services concurrently in worker threads (constructors may do blocking I/O)
+
+        Failures are logged, not raised: a missing key must not stop the app
+        from serving routes that do not need that service.
+
+        Returns:
+            name → initialized successfully
+        """
+        names = list(self._factories if names is None else names)
+        results = await asyncio.gather(
+            *[asyncio.to_thread(self.get, name) for name in names],
+            return_exceptions=True
+        )
+        status = {}
+        for name, result in zip(names, results):
+            status[name] = not isinstance(result, BaseException)
+            if not status[name]:
+                logger.warning("Service warmup failed", service=name, error=str(result))
+        return status
+
+    async def shutdown(self) -> None:
+        """Close and drop all built instances"""
+        for name, instance in list(self._instances.items()):
+            close = getattr(instance, "aclose", None) or getattr(instance, "close", None)
+            try:
+                if close is not None:
+                    result = close()
+                    if inspect.isawaitable(result):
+                        await result
+            except Exception as e:
+                logger.warning("Service close failed", service=name, error=str(e))
+        self._instances.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "initialized": name in self._instances,
+                "init_ms": round(self._init_seconds[name] * 1000, 1) if name in self._init_seconds else None,
+            }
+            for name in self._factories
+        }
+
+
+# Global instance
+service_registry = ServiceRegistry()
+service_registry.register("codemie", "services.codemie_service:CodeMieService")
+service_registry.register("dual_llm", "services.dual_llm_service:DualLLMService")
+service_registry.register("judge", "services.judge_module:DiiaJudge")
+service_registry.register("mcp", lambda: load_mcp_module().YanaMCPServer())
+service_registry.register("semantic_cache", "services.semantic_cache:create_semantic_cache")
+
+
+def _collect_service_metrics():
+    return gauge_lines(
+        "yana_service_init_seconds", "Time to construct lazy service singletons",
+        [({"service": name}, seconds) for name, seconds in service_registry._init_seconds.items()]
+    )
+
+
+metrics_registry.register_collector(_collect_service_metrics)
@@ -0,0 +1,95 @@
+"""
+Static read-only дані: Diia components, API specs, scoring rubric, mock registry datasets
+Джерела - data/*.json; build step компілює їх у data/snapshot.bin, який мапиться в пам'ять при старті
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+import structlog
+
+from utils.snapshot import FORMAT_VERSION, MAGIC, Snapshot, encode_snapshot, write_snapshot
+
+logger = structlog.get_logger()
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SNAPSHOT_PATH = DATA_DIR / "snapshot.bin"
+
+# Source file → section name; registry.json holds one section per dataset ("registry.<name>")
+SOURCES = {
+    "components.json": "components",
+    "api_specs.json": "api_specs",
+    "rubric.json": "rubric",
+    "registry.json": "registry",
+}
+
+
+def compile_sections(data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, Any]]:
+    """Read data/*.json into snapshot sections"""
+    sections: Dict[str, Dict[str, Any]] = {}
+    for filename, section in SOURCES.items():
+        with open(data_dir / filename, encoding="utf-8") as f:
+            data = json.load(f)
+        if section == "registry":
+            for dataset, records in data.items():
+                sections[f"registry.{dataset}"] = records
+        else:
+            sections[section] = data
+    return sections
+
+
+def build_snapshot(path: Path = SNAPSHOT_PATH, data_dir: Path = DATA_DIR) -> str:
+    """
+    Build step: compile sources into a snapshot file
+
+    Returns:
+        Data version (hex digest)
+    """
+    return write_snapshot(str(path), compile_sections(data_dir))
+
+
+def is_stale(path: Path = SNAPSHOT_PATH, data_dir: Path = DATA_DIR) -> bool:
+    """Snapshot missing, older than any source, or of another format version"""
+    try:
+        built = path.stat().st_mtime
+        with open(path, "rb") as f:
+            header = f.read(12)
+    except OSError:
+        return True
+    if header[:8] != MAGIC or int.from_bytes(header[8:12], "little") != FORMAT_VERSION:
+        return True
+    return any((data_dir / filename).stat().st_mtime > built for filename in SOURCES)
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH, auto_build: bool = True) -> Snapshot:
+    """
+    Map the snapshot (rebuilding it first if stale)
+
+    When the data directory is read-only and the file is stale, the
+    snapshot is built in memory instead (not shared between workers).
+    """
+    if auto_build and is_stale(path):
+        try:
+            version = build_snapshot(path)
+            logger.info("Static data snapshot rebuilt", path=str(path), version=version)
+        except OSError as e:
+            logger.warning("Cannot write static data snapshot, using in-memory copy", path=str(path), error=str(e))
+            return Snapshot(encode_snapshot(compile_sections()))
+    return Snapshot.open(str(path))
+
+
+_snapshot: Optional[Snapshot] = None
+
+
+def get_static_data() -> Snapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = load_snapshot()
+    return _snapshot
+
+
+def __getattr__(name: str):
+    # `static_data` is mapped on first access, so the build step can import this module without loading it
+    if name == "static_data":
+        return get_static_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,193 @@
+"""
+Template UI renderer: детермінований fast path для generate_ui
+Flow (models/flow_models.py) → Tailwind HTML через скомпільовані шаблони templates/ui/*.html, без LLM
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import structlog
+from pydantic import ValidationError
+
+from config import settings
+from models.flow_models import Flow, FlowField, FlowStep
+from utils.fragment_cache import FragmentCache
+from utils.metrics import registry, gauge_lines
+from utils.templates import TemplateLoader
+
+logger = structlog.get_logger()
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "ui"
+
+# Step type → component template; legacy Flow types map onto Diia components
+STEP_TEMPLATES: Dict[str, str] = {
+    "form": "form_step",
+    "form_step": "form_step",
+    "confirmation": "confirmation",
+    "eligibility": "eligibility_banner",
+    "eligibility_banner": "eligibility_banner",
+    "recipient": "recipient_card_single",
+    "recipient_card_single": "recipient_card_single",
+    "error": "error_modal",
+    "error_modal": "error_modal",
+}
+
+# Field type → <input type>; select / textarea / checkbox have their own markup
+INPUT_TYPES: Dict[str, str] = {
+    "text": "text",
+    "string": "text",
+    "email": "email",
+    "tel": "tel",
+    "phone": "tel",
+    "number": "number",
+    "date": "date",
+    "password": "password",
+    "url": "url",
+}
+_SPECIAL_FIELDS = frozenset({"select", "textarea", "checkbox"})
+
+# metadata.locale when absent (<div lang>; part of the fragment cache key)
+DEFAULT_LOCALE = "uk"
+
+# metadata.layout values rendered as the default single-column page
+LAYOUTS = frozenset({"default", "single_column"})
+
+UI_RENDERS = registry.counter("yana_ui_render_total", "generate_ui calls by rendering path", ("path",))
+
+_ID_RE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def _html_id(*parts: str) -> str:
+    return "-".join(_ID_RE.sub("-", part).strip("-") or "x" for part in parts)
+
+
+class UnsupportedFlow(ValueError):
+    """Flow needs a component or layout the template renderer does not have"""
+
+
+class UIRenderer:
+    """
+    Renders validated flows with per-component templates compiled once
+
+    Example:
+        html = ui_renderer.try_render(flow_dict)   # None → fall back to the UI agent
+    """
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR, fragment_cache_bytes: int = 0):
+        self.fragments = FragmentCache(fragment_cache_bytes) if fragment_cache_bytes > 0 else None
+        self.loader = TemplateLoader(templates_dir)
+        self.loader.compile_all()  # syntax errors surface at import, not on the first request
+        self._page = self.loader.get("page")
+        self._steps = {name: self.loader.get(name) for name in set(STEP_TEMPLATES.values())}
+
+    def unsupported_reason(self, flow: Flow) -> Optional[str]:
+        """Why the flow cannot be rendered from templates, None when it can"""
+        layout = (flow.metadata or {}).get("layout")
+        if layout is not None and layout not in LAYOUTS:
+            return f"layout:{layout}"
+        for step in flow.steps:
+            if step.type not in STEP_TEMPLATES:
+                return f"step_type:{step.type}"
+            for field in step.fields or ():
+                if field.type not in INPUT_TYPES and field.type not in _SPECIAL_FIELDS:
+                    return f"field_type:{field.type}"
+        return None
+
+    def render(self, flow: Flow) -> str:
+        """
+        Render a validated flow
+
+        Steps are rendered as fragments cached by (component, props, locale),
+        so the page is assembled from cached fragments and only new / changed
+        steps go through the templates.
+
+        Raises:
+            UnsupportedFlow: Flow needs the LLM UI agent
+        """
+        reason = self.unsupported_reason(flow)
+        if reason:
+            raise UnsupportedFlow(reason)
+
+        locale = (flow.metadata or {}).get("locale") or DEFAULT_LOCALE
+        total = len(flow.steps)
+        fragments: List[str] = []
+        for number, step in enumerate(flow.steps, 1):
+            component = STEP_TEMPLATES[step.type]
+            props = self._step_context(step, number, total)
+            template = self._steps[component]
+            if self.fragments is None:
+                fragments.append(template.render(step=props))
+            else:
+                fragments.append(self.fragments.get_or_render(
+                    component, props, locale, lambda: template.render(step=props)
+                ))
+        return self._page.render(flow=flow, locale=locale, body="".join(fragments))
+
+    def try_render(self, flow: Mapping[str, Any]) -> Optional[str]:
+        """
+        Fast path for generate_ui
+
+        Args:
+            flow: Flow dict from generate_flow()
+
+        Returns:
+            HTML or None when the flow does not validate / needs the UI agent
+        """
+        try:
+            html = self.render(Flow.model_validate(flow))
+        except ValidationError as e:
+            logger.info("Template renderer skipped", reason="invalid_flow", errors=e.error_count())
+            return None
+        except UnsupportedFlow as e:
+            logger.info("Template renderer skipped", reason=str(e))
+            return None
+        UI_RENDERS.inc(1.0, "template")
+        return html
+
+    # ==================== Context ====================
+
+    def _step_context(self, step: FlowStep, number: int, total: int) -> Dict[str, Any]:
+        return {
+            "id": _html_id(step.id),
+            "heading_id": _html_id(step.id, "title"),
+            "title": step.title,
+            "message": step.message,
+            "number": number,
+            "total": total,
+            "has_back": number > 1,
+            "eligible": True,
+            "action_label": "Продовжити",
+            "fields": [self._field_context(step, field) for field in step.fields or ()],
+        }
+
+    def _field_context(self, step: FlowStep, field: FlowField) -> Dict[str, Any]:
+        return {
+            "id": _html_id(step.id, field.name),
+            "name": field.name,
+            "label": field.label,
+            "required": field.required,
+            "placeholder": field.placeholder,
+            "input_type": INPUT_TYPES.get(field.type, "text"),
+            "select": field.type == "select",
+            "textarea": field.type == "textarea",
+            "checkbox": field.type == "checkbox",
+        }
+
+
+# Global instance
+ui_renderer = UIRenderer(fragment_cache_bytes=settings.ui_fragment_cache_bytes)
+
+
+def _collect_fragment_cache_metrics() -> List[str]:
+    cache = ui_renderer.fragments
+    if cache is None:
+        return []
+    return gauge_lines(
+        "yana_ui_fragment_cache_bytes", "UI fragment cache size in bytes", [({}, float(cache.size_bytes))]
+    ) + gauge_lines(
+        "yana_ui_fragment_cache_evictions_total", "UI fragments evicted by the byte bound",
+        [({}, float(cache.evictions))], kind="counter"
+    )
+
+
+registry.register_collector(_collect_fragment_cache_metrics)
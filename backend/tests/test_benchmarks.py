@@ -0,0 +1,52 @@
+"""
+Smoke test бенчмарків: короткий прогін усіх сценаріїв проти fake Ollama/OpenAI
+"""
+import json
+
+from benchmarks import compare_results, run_benchmarks
+from benchmarks.fakes import LatencyModel
+from benchmarks.scenarios import SCENARIOS
+
+
+def test_run_benchmarks_smoke(tmp_path):
+    output = tmp_path / "results.json"
+    document = run_benchmarks(
+        rps=5.0,
+        scenario_rps={"mcp_pipeline": 1.0},
+        duration=1.0,
+        warmup=0.0,
+        ollama_latency="10",
+        openai_latency="10",
+        output=output,
+    )
+
+    assert json.loads(output.read_text(encoding="utf-8"))["scenarios"].keys() == set(SCENARIOS)
+    for name, stats in document["scenarios"].items():
+        assert stats["requests"] > 0, name
+        assert stats["errors"] == 0, (name, stats["error_types"])
+        assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"]
+    # Pipeline scenarios really went through the fake upstreams
+    assert document["upstream_calls"]["ollama"] > 0
+    assert document["upstream_calls"]["openai"] > 0
+
+
+def test_compare_results_flags_regressions():
+    def doc(p99: float, throughput: float):
+        return {"scenarios": {"registry": {
+            "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": p99},
+            "throughput_rps": throughput,
+            "memory": {"rss_peak_mb": 100.0},
+        }}}
+
+    rows = {row["metric"]: row for row in compare_results(doc(30.0, 20.0), doc(45.0, 19.5))}
+
+    assert rows["latency_ms.p99"]["regression"]
+    assert rows["latency_ms.p99"]["change_pct"] == 50.0
+    assert not rows["throughput_rps"]["regression"]
+    assert not rows["latency_ms.p50"]["regression"]
+
+
+def test_latency_model_specs():
+    assert LatencyModel("25").sample() == 0.025
+    assert 0.01 <= LatencyModel("uniform:10-20", seed=1).sample() <= 0.02
+    assert LatencyModel("lognormal:p50=100,p99=500", seed=1).sample() > 0
@@ -0,0 +1,108 @@
+"""
+Text embeddings для semantic cache: OpenAI embeddings або локальний hashed char n-gram embedder (без мережі)
+Обидва повертають L2-нормований array('f') однакової розмірності, тож cosine similarity = dot product
+"""
+import hashlib
+import math
+import os
+import re
+from array import array
+from operator import mul
+from typing import Optional
+
+from utils.http_client import traced_async_client
+
+DIMENSIONS = 256
+
+_WORD_RE = re.compile(r"\w+")
+
+# Prompt boilerplate that says nothing about the service ("Створити форму для ...")
+_STOPWORDS = frozenset(
+    "створити створіть зробити розробити потрібно треба хочу мені будь ласка форму форма форми сторінку сторінка "
+    "екран флоу flow user для через онлайн послуга послуги послугу сервіс який яка яке які щоб з та і й в у на до за "
+    "від по що як або".split()
+)
+
+
+def dot(a: array, b: array) -> float:
+    return sum(map(mul, a, b))
+
+
+def _normalized(vector: array) -> array:
+    norm = math.sqrt(dot(vector, vector))
+    if norm:
+        for i in range(len(vector)):
+            vector[i] /= norm
+    return vector
+
+
+class LocalEmbedder:
+    """
+    Signed feature hashing of character trigrams (stopwords dropped)
+
+    Lexical, not semantic: paraphrases with different word roots score low,
+    so the default threshold only accepts close rewordings.
+    """
+
+    name = "local"
+    default_threshold = 0.9
+
+    def __init__(self, dimensions: int = DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed_sync(self, text: str) -> array:
+        vector = array("f", bytes(4 * self.dimensions))
+        for word in _WORD_RE.findall(text.lower()):
+            if len(word) < 3 or word in _STOPWORDS:
+                continue
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                digest = int.from_bytes(hashlib.blake2b(padded[i:i + 3].encode("utf-8"), digest_size=8).digest(), "little")
+                vector[digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+        return _normalized(vector)
+
+    async def embed(self, text: str) -> array:
+        return self.embed_sync(text)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings (text-embedding-3-*), shortened to DIMENSIONS by the API"""
+
+    name = "openai"
+    default_threshold = 0.85
+
+    def __init__(self, model: str, dimensions: int = DIMENSIONS, api_key: Optional[str] = None):
+        # Imported here: the SDK costs ~0.3s of startup and is only needed once the cache is built
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self.dimensions = dimensions
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0, timeout=5.0,
+            http_client=traced_async_client()
+        )
+
+    async def embed(self, text: str) -> array:
+        response = await self.client.embeddings.create(model=self.model, input=text, dimensions=self.dimensions)
+        return _normalized(array("f", response.data[0].embedding))
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+EMBEDDERS = {"openai": OpenAIEmbedder, "local": LocalEmbedder}
+
+
+def resolve_embedder(kind: str) -> str:
+    """Embedder that `kind` actually gets: "openai" needs OPENAI_API_KEY, anything else is "local" """
+    return "openai" if kind == "openai" and os.getenv("OPENAI_API_KEY") else "local"
+
+
+def create_embedder(kind: str, model: str):
+    """"openai" (needs OPENAI_API_KEY, falls back to local without it) or "local" """
+    if resolve_embedder(kind) == "openai":
+        return OpenAIEmbedder(model)
+    return LocalEmbedder()
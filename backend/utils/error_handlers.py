@@ -1,7 +1,9 @@
 """
 Custom exception handlers and error classes
 """
+import math
 from fastapi import Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -25,6 +27,23 @@ class ValidationError(Exception):
         super().__init__(self.message)
 
 
+class CircuitOpenError(Exception):
+    """Raised when an upstream circuit breaker rejects the call (503)"""
+    def __init__(self, upstream: str, retry_after: float = 1.0):
+        self.upstream = upstream
+        self.message = f"Upstream '{upstream}' is unavailable (circuit open)"
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class RateLimitError(Exception):
+    """Raised when admission control rejects a request (429)"""
+    def __init__(self, message: str, retry_after: float = 1.0):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
 async def codemie_api_error_handler(request: Request, exc: CodeMieAPIError) -> JSONResponse:
     """Handle CodeMie API errors"""
     logger.error(
@@ -62,6 +81,48 @@ async def validation_error_handler(request: Request, exc: ValidationError) -> JS
     )
 
 
+async def rate_limit_error_handler(request: Request, exc: RateLimitError) -> JSONResponse:
+    """Handle admission control rejections"""
+    retry_after = max(1, math.ceil(exc.retry_after))
+    logger.warning(
+        "Rate limit exceeded",
+        error=exc.message,
+        retry_after=retry_after,
+        path=request.url.path
+    )
+    
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": "Too Many Requests",
+            "detail": exc.message,
+            "path": request.url.path
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+async def circuit_open_error_handler(request: Request, exc: CircuitOpenError) -> JSONResponse:
+    """Handle requests rejected by an open circuit breaker"""
+    retry_after = max(1, math.ceil(exc.retry_after))
+    logger.warning(
+        "Circuit open",
+        upstream=exc.upstream,
+        retry_after=retry_after,
+        path=request.url.path
+    )
+    
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": "Service Unavailable",
+            "detail": exc.message,
+            "path": request.url.path
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
 async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
     """Handle HTTP exceptions"""
     logger.error(
@@ -93,7 +154,7 @@ async def request_validation_error_handler(request: Request, exc: RequestValidat
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "Request Validation Error",
-            "detail": exc.errors(),
+            "detail": jsonable_encoder(exc.errors()),  # model validators put the ValueError into ctx
             "path": request.url.path
         }
     )
@@ -0,0 +1,80 @@
+"""
+LRU cache HTML фрагментів, обмежений сумарним розміром у байтах
+Ключ - canonical hash (component, props, locale): однакові кроки різних flows рендеряться один раз
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import registry
+
+FRAGMENT_CACHE_OPS = registry.counter(
+    "yana_ui_fragment_cache_total", "UI fragment cache lookups by result", ("result",)
+)
+
+
+def fragment_key(component: str, props: Any, locale: str) -> bytes:
+    """Canonical hash: dict key order and JSON formatting do not change the key"""
+    canonical = json.dumps([component, props, locale], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of rendered fragments bounded by total UTF-8 bytes
+
+    Example:
+        html = fragment_cache.get_or_render("form_step", props, "uk", lambda: template.render(step=props))
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._sizes: Dict[bytes, int] = {}
+        self.size_bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+        FRAGMENT_CACHE_OPS.inc(1.0, "hit" if fragment is not None else "miss")
+        return fragment
+
+    def put(self, key: bytes, fragment: str) -> None:
+        size = len(fragment.encode("utf-8"))
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= self._sizes[key]
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self.size_bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, component: str, props: Any, locale: str, render: Callable[[], str]) -> str:
+        """Cached fragment or render() stored under the (component, props, locale) key"""
+        key = fragment_key(component, props, locale)
+        fragment = self.get(key)
+        if fragment is None:
+            fragment = render()
+            self.put(key, fragment)
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.size_bytes = 0
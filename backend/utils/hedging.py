@@ -0,0 +1,195 @@
+"""
+Hedged requests для зменшення tail latency upstream LLM calls
+Якщо виклик не повернувся за спостережуваний p90 - запускаємо другий, перший результат виграє
+"""
+import asyncio
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Optional
+import structlog
+
+from config import settings
+from utils.metrics import registry, gauge_lines
+
+logger = structlog.get_logger()
+
+
+class LatencyTracker:
+    """Sliding window of call latencies (successful calls + censored hedged-out primaries)"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """
+    Hedging policy for one upstream
+
+    Hedge delay = observed latency percentile; hedges are capped at
+    `max_ratio` of calls in the recent window.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = False,
+        percentile: float = 0.9,
+        max_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.latency = LatencyTracker(window)
+
+        self._recent: Deque[bool] = deque(maxlen=window * 2)  # False = call, True = hedge
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before firing a hedge, None if not enough data"""
+        if not self.enabled or len(self.latency) < self.min_samples:
+            return None
+        return self.latency.percentile(self.percentile)
+
+    def record_call(self) -> None:
+        self.calls += 1
+        self._recent.append(False)
+
+    def try_hedge(self) -> bool:
+        """Reserve a hedge if under the ratio cap"""
+        hedged = sum(self._recent)
+        calls = len(self._recent) - hedged
+        if hedged + 1 > self.max_ratio * calls:
+            return False
+        self._recent.append(True)
+        self.hedges += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.latency.percentile(self.percentile)
+        return {
+            "enabled": self.enabled,
+            "calls_total": self.calls,
+            "hedges_total": self.hedges,
+            "hedge_wins_total": self.hedge_wins,
+            "hedge_delay": round(delay, 4) if delay is not None else None,
+        }
+
+
+_policies: Dict[str, HedgePolicy] = {}
+
+
+def get_policy(name: str) -> HedgePolicy:
+    """Get or create hedge policy for an upstream"""
+    if name not in _policies:
+        _policies[name] = HedgePolicy(
+            name,
+            enabled=settings.hedge_enabled,
+            percentile=settings.hedge_percentile,
+            max_ratio=settings.hedge_max_ratio,
+            min_samples=settings.hedge_min_samples,
+        )
+    return _policies[name]
+
+
+def hedge_states() -> Dict[str, Dict[str, Any]]:
+    return {name: policy.snapshot() for name, policy in _policies.items()}
+
+
+def _collect_hedge_metrics():
+    return gauge_lines(
+        "yana_hedged_requests_total", "Hedge requests fired",
+        [({"upstream": name}, policy.hedges) for name, policy in _policies.items()],
+        kind="counter"
+    ) + gauge_lines(
+        "yana_hedge_wins_total", "Hedge requests that returned first",
+        [({"upstream": name}, policy.hedge_wins) for name, policy in _policies.items()],
+        kind="counter"
+    )
+
+
+registry.register_collector(_collect_hedge_metrics)
+
+
+async def _cancel(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def hedged(name: str):
+    """
+    Decorator for async upstream calls: fire a duplicate request once the
+    primary exceeds the observed p90 latency; first success wins, the loser
+    is cancelled. The wrapped call must be idempotent.
+
+    Example:
+        @hedged("ollama")
+        async def call_generator(...):
+            ...
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            policy = get_policy(name)
+            if not policy.enabled:
+                return await func(*args, **kwargs)
+
+            async def attempt() -> Any:
+                started = time.monotonic()
+                result = await func(*args, **kwargs)
+                policy.latency.record(time.monotonic() - started)
+                return result
+
+            policy.record_call()
+            delay = policy.hedge_delay()
+            primary_started = time.monotonic()
+            primary = asyncio.ensure_future(attempt())
+            tasks = {primary}
+
+            try:
+                if delay is not None:
+                    done, _ = await asyncio.wait(tasks, timeout=delay)
+                    if not done and policy.try_hedge():
+                        logger.info("Hedging upstream call", upstream=name, hedge_delay=round(delay, 3))
+                        tasks.add(asyncio.ensure_future(attempt()))
+
+                first_error: Optional[BaseException] = None
+                while tasks:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is not primary:
+                                policy.hedge_wins += 1
+                                # The primary is cancelled below: it would have taken at least this
+                                # long (censored sample); dropping it would pull the hedge delay down
+                                policy.latency.record(time.monotonic() - primary_started)
+                            return task.result()
+                        first_error = first_error or task.exception()
+                raise first_error
+            finally:
+                pending = [task for task in (primary, *tasks) if not task.done()]
+                if pending:
+                    await _cancel(pending)
+
+        return wrapper
+    return decorator
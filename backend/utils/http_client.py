@@ -3,6 +3,7 @@ HTTP Client utilities with connection pooling
 """
 import httpx
 from typing import Optional
+from utils.tracing import AsyncTracingTransport, TracingTransport
 
 
 class HTTPClientManager:
@@ -19,13 +20,16 @@ class HTTPClientManager:
             Configured AsyncClient instance
         """
         if cls._instance is None:
-            cls._instance = httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0),
+            transport = httpx.AsyncHTTPTransport(
                 limits=httpx.Limits(
                     max_keepalive_connections=10,
                     max_connections=20,
                     keepalive_expiry=30.0
-                ),
+                )
+            )
+            cls._instance = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                transport=AsyncTracingTransport(transport),
                 follow_redirects=True,
             )
         return cls._instance
@@ -42,3 +46,13 @@ class HTTPClientManager:
 def get_http_client() -> httpx.AsyncClient:
     """Get HTTP client for dependency injection"""
     return HTTPClientManager.get_client()
+
+
+def traced_async_client() -> httpx.AsyncClient:
+    """Dedicated AsyncClient with tracing (for SDKs such as AsyncOpenAI)"""
+    return httpx.AsyncClient(transport=AsyncTracingTransport(httpx.AsyncHTTPTransport()))
+
+
+def traced_sync_client() -> httpx.Client:
+    """Dedicated sync Client with tracing (for sync SDK clients)"""
+    return httpx.Client(transport=TracingTransport(httpx.HTTPTransport()))
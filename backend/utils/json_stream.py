@@ -0,0 +1,226 @@
+"""
+Incremental JSON parser для streaming LLM відповідей
+Top-level поля об'єкта віддаються, щойно значення завершене; синтаксична помилка - одразу, а не після повної відповіді
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Parser expectations between tokens
+_VALUE = 0
+_VALUE_OR_END = 1  # after "["
+_KEY = 2  # after "," in an object
+_KEY_OR_END = 3  # after "{"
+_COLON = 4
+_COMMA_OR_END = 5
+_DONE = 6
+
+_WHITESPACE = frozenset(" \t\n\r")
+_SCALAR_START = frozenset("-0123456789tfn")
+_SCALAR_CHARS = frozenset("+-.0123456789eEtruefalsn")
+
+
+class JSONStreamError(ValueError):
+    """Malformed JSON detected in the stream; `position` is the offset of the offending character"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at char {position}")
+        self.position = position
+
+
+class IncrementalJSONParser:
+    """
+    Validating push parser for a single JSON object
+
+    Only the structure is tracked per character; each top-level value is
+    decoded with `json.loads` once it is complete, so memory is bounded by
+    the largest top-level field, not the whole response.
+
+    Example:
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...  # top-level field complete
+        result = parser.close()  # the whole object
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self._stack: List[str] = []  # "{" / "["
+        self._expect = _VALUE
+        self._position = 0
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._scalar: Optional[List[str]] = None
+        self._key: Optional[List[str]] = None
+        self._value: Optional[List[str]] = None  # text of the current top-level value
+        self._pending_key: Optional[str] = None
+        self._ready: List[Tuple[str, Any]] = []
+
+    @property
+    def done(self) -> bool:
+        return self._expect == _DONE
+
+    @property
+    def position(self) -> int:
+        """Characters consumed so far"""
+        return self._position
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk
+
+        Returns:
+            Top-level (key, value) pairs completed by this chunk, in order
+
+        Raises:
+            JSONStreamError: The text so far cannot be the prefix of a JSON object
+        """
+        for char in chunk:
+            self._char(char)
+            self._position += 1
+        ready, self._ready = self._ready, []
+        return ready
+
+    def close(self) -> Dict[str, Any]:
+        """End of stream: the complete object (raises JSONStreamError if truncated)"""
+        if self._expect != _DONE:
+            raise JSONStreamError("Truncated JSON", self._position)
+        return self.fields
+
+    # ==================== Tokenizer ====================
+
+    def _error(self, message: str) -> JSONStreamError:
+        return JSONStreamError(message, self._position)
+
+    def _append(self, char: str) -> None:
+        if self._key is not None and self._string_is_key and self._in_string:
+            self._key.append(char)
+        elif self._value is not None:
+            self._value.append(char)
+
+    def _char(self, char: str) -> None:
+        if self._in_string:
+            self._string_char(char)
+            return
+
+        if self._scalar is not None:
+            if char in _SCALAR_CHARS:
+                self._scalar.append(char)
+                self._append(char)
+                return
+            self._end_scalar()
+
+        if char in _WHITESPACE:
+            return
+
+        expect = self._expect
+        if expect == _DONE:
+            raise self._error("Trailing data after JSON object")
+
+        if expect in (_VALUE, _VALUE_OR_END):
+            if char == "]" and expect == _VALUE_OR_END:
+                self._close_container("[", char)
+            elif char in "{[":
+                if not self._stack and char != "{":
+                    raise self._error("Expected a JSON object")
+                self._start_value(char)
+                self._stack.append(char)
+                self._expect = _KEY_OR_END if char == "{" else _VALUE_OR_END
+            elif char == '"' and self._stack:
+                self._start_value(char)
+                self._in_string = True
+                self._string_is_key = False
+            elif char in _SCALAR_START and self._stack:
+                self._start_value(char)
+                self._scalar = [char]
+            else:
+                raise self._error(f"Unexpected {char!r}, expected a value")
+
+        elif expect in (_KEY, _KEY_OR_END):
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = True
+                if len(self._stack) == 1:
+                    self._key = ['"']
+                else:
+                    self._append(char)
+            elif char == "}" and expect == _KEY_OR_END:
+                self._close_container("{", char)
+            else:
+                raise self._error(f"Unexpected {char!r}, expected a key")
+
+        elif expect == _COLON:
+            if char != ":":
+                raise self._error(f"Unexpected {char!r}, expected ':'")
+            self._append(char)
+            self._expect = _VALUE
+
+        elif expect == _COMMA_OR_END:
+            if char == ",":
+                self._append(char)
+                self._expect = _KEY if self._stack[-1] == "{" else _VALUE
+            elif char in "}]":
+                self._close_container("{" if char == "}" else "[", char)
+            else:
+                raise self._error(f"Unexpected {char!r}, expected ',' or end of container")
+
+    def _string_char(self, char: str) -> None:
+        self._append(char)
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._end_key()
+            else:
+                self._value_done()
+        elif char < " ":
+            raise self._error("Control character in string")
+
+    def _end_key(self) -> None:
+        if len(self._stack) == 1:
+            try:
+                self._pending_key = json.loads("".join(self._key))
+            except ValueError:
+                raise self._error("Invalid key string") from None
+            self._key = None
+        self._expect = _COLON
+
+    def _end_scalar(self) -> None:
+        literal = "".join(self._scalar)
+        self._scalar = None
+        try:
+            json.loads(literal)
+        except ValueError:
+            raise self._error(f"Invalid literal {literal!r}") from None
+        self._value_done()
+
+    def _start_value(self, char: str) -> None:
+        if len(self._stack) == 1:
+            self._value = []
+        self._append(char)
+
+    def _close_container(self, opener: str, char: str) -> None:
+        if not self._stack or self._stack[-1] != opener:
+            raise self._error(f"Unexpected {char!r}")
+        self._append(char)
+        self._stack.pop()
+        self._value_done()
+
+    def _value_done(self) -> None:
+        if not self._stack:
+            self._expect = _DONE
+            return
+        self._expect = _COMMA_OR_END
+        if len(self._stack) == 1 and self._value is not None:
+            try:
+                value = json.loads("".join(self._value))
+            except ValueError:
+                # Structure was valid, so this is a bad escape sequence inside a string
+                raise self._error("Invalid string escape") from None
+            self._value = None
+            self.fields[self._pending_key] = value
+            self._ready.append((self._pending_key, value))
@@ -0,0 +1,186 @@
+"""
+Event loop watchdog: вимірює lag event loop та ловить блокуючі виклики
+Heartbeat coroutine + watchdog thread, який знімає стек loop thread під час блокування
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import structlog
+
+from config import settings
+from utils.metrics import registry
+
+logger = structlog.get_logger()
+
+LOOP_LAG = registry.histogram(
+    "yana_event_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_BLOCKED = registry.counter(
+    "yana_event_loop_blocked_total", "Event loop stalls longer than the blocking threshold"
+)
+
+
+class EventLoopBlockedError(AssertionError):
+    """Raised in strict mode when the event loop was blocked past the threshold"""
+
+    def __init__(self, violations: List[Dict[str, Any]], count: Optional[int] = None):
+        self.violations = violations
+        self.count = len(violations) if count is None else count
+        details = "\n\n".join(
+            f"blocked {v['blocked_ms']} ms:\n{v['stack'] or '<stack not captured>'}" for v in violations
+        )
+        super().__init__(f"Event loop blocked {self.count} time(s)\n{details}")
+
+
+class LoopWatchdog:
+    """
+    Detects callbacks that block the event loop
+
+    A heartbeat coroutine wakes every `interval`; a watchdog thread notices
+    when the heartbeat is overdue by more than `threshold` and captures the
+    loop thread's stack while the blocking code is still running.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05, strict: bool = False, max_violations: int = 100):
+        self.threshold = threshold
+        self.interval = interval
+        self.strict = strict
+        self.max_violations = max_violations
+
+        self.violations: List[Dict[str, Any]] = []
+        self.blocked_total = 0
+        self.max_lag = 0.0
+
+        # Violations of active strict_mode() blocks (not capped by max_violations of the global list)
+        self._scopes: List[List[Dict[str, Any]]] = []
+
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._captured_stack: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running loop (call from the loop)"""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop watchdog started", threshold_ms=self.threshold * 1000, strict=self.strict)
+
+    async def stop(self) -> None:
+        """
+        Stop monitoring
+
+        Raises:
+            EventLoopBlockedError: in strict mode, if any blocking was detected
+        """
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self.strict and self.blocked_total:
+            raise EventLoopBlockedError(self.violations, self.blocked_total)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+            self._last_beat = now
+            LOOP_LAG.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._record_block(lag)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue >= self.threshold and self._captured_stack is None:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured_stack = "".join(traceback.format_stack(frame))
+
+    def _record_block(self, lag: float) -> None:
+        stack, self._captured_stack = self._captured_stack, None
+        self.blocked_total += 1
+        LOOP_BLOCKED.inc()
+
+        violation = {"blocked_ms": round(lag * 1000, 1), "stack": stack, "at": time.time()}
+        if len(self.violations) < self.max_violations:
+            self.violations.append(violation)
+        for scope in self._scopes:
+            if len(scope) < self.max_violations:
+                scope.append(violation)
+
+        log = logger.error if self.strict else logger.warning
+        log("Event loop blocked", blocked_ms=violation["blocked_ms"], threshold_ms=self.threshold * 1000, stack=stack)
+
+    @contextmanager
+    def strict_mode(self, threshold_ms: Optional[float] = None):
+        """
+        Fail the block if the loop stalls past `threshold_ms` inside it
+
+        Example (tests):
+            with loop_watchdog.strict_mode(threshold_ms=50):
+                client.post("/api/generate", json=...)
+
+        Raises:
+            EventLoopBlockedError: on exit, if blocking was detected
+        """
+        previous = self.threshold
+        if threshold_ms is not None:
+            self.threshold = threshold_ms / 1000
+        scope: List[Dict[str, Any]] = []
+        self._scopes.append(scope)
+        seen = self.blocked_total
+        try:
+            yield self
+        finally:
+            # A stall right before exit is not recorded until the next heartbeat
+            pending = self._pending_block()
+            self._scopes.remove(scope)
+            self.threshold = previous
+        count = self.blocked_total - seen
+        if pending is not None:
+            scope.append(pending)
+            count += 1
+        if count:
+            raise EventLoopBlockedError(scope, count)
+
+    def _pending_block(self) -> Optional[Dict[str, Any]]:
+        """Stall of the last heartbeat that is still overdue (not recorded yet)"""
+        if self._task is None:
+            return None
+        overdue = time.monotonic() - self._last_beat - self.interval
+        if overdue < self.threshold:
+            return None
+        return {"blocked_ms": round(overdue * 1000, 1), "stack": self._captured_stack, "at": time.time()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "threshold_ms": self.threshold * 1000,
+            "blocked_total": self.blocked_total,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+        }
+
+
+# Global instance
+loop_watchdog = LoopWatchdog(
+    threshold=settings.loop_block_threshold_ms / 1000,
+    strict=settings.loop_block_strict,
+)
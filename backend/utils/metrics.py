@@ -0,0 +1,344 @@
+"""
+Prometheus-style metrics (text exposition format 0.0.4)
+Мінімальний in-process registry без зовнішніх залежностей - дешевий для production
+"""
+import asyncio
+import inspect
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.exceptions import HTTPException
+
+from utils.tracing import start_span
+
+# Latency buckets (seconds): validation is ~µs, LLM calls are seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, counts in list(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {self._sums[labels]}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Collector returns exposition lines, evaluated on every scrape"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# ==================== Core metrics ====================
+
+HTTP_REQUESTS = registry.counter(
+    "yana_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = registry.gauge("yana_http_requests_in_flight", "HTTP requests currently being served")
+HTTP_DURATION = registry.histogram(
+    "yana_http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+
+STAGE_DURATION = registry.histogram(
+    "yana_stage_duration_seconds", "Pipeline stage latency", ("stage",)
+)
+STAGE_IN_FLIGHT = registry.gauge("yana_stage_in_flight", "Pipeline stage calls in progress", ("stage",))
+STAGE_ERRORS = registry.counter("yana_stage_errors_total", "Pipeline stage failures", ("stage",))
+
+RETRIES = registry.counter("yana_retries_total", "Retry attempts by function", ("function",))
+RETRY_BUDGET_EXHAUSTED = registry.counter(
+    "yana_retry_budget_exhausted_total", "Retries skipped because the retry budget was exhausted"
+)
+FALLBACKS = registry.counter("yana_fallback_total", "Fallback code paths taken", ("component",))
+LLM_TOKENS = registry.counter(
+    "yana_llm_tokens_total", "LLM token usage reported by upstream", ("upstream", "kind")
+)
+
+
+@contextmanager
+def _stage_timer(stage: str):
+    STAGE_IN_FLIGHT.inc(1.0, stage)
+    started = time.perf_counter()
+    try:
+        with start_span(stage):
+            yield
+    except asyncio.CancelledError:
+        # Cancelled (hedge loser, client disconnect, shutdown), not a stage failure
+        raise
+    except HTTPException as e:
+        # 4xx (unknown id, bad input) is a client answer, not a stage failure
+        if e.status_code >= 500:
+            STAGE_ERRORS.inc(1.0, stage)
+        raise
+    except BaseException:
+        STAGE_ERRORS.inc(1.0, stage)
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - started, stage)
+        STAGE_IN_FLIGHT.dec(1.0, stage)
+
+
+def track_stage(stage: str, func: Optional[Callable] = None):
+    """
+    Measure a pipeline stage: latency histogram, in-flight gauge, error counter
+    and a tracing span (when tracing is enabled)
+
+    Usable as decorator (sync or async) or context manager:
+
+        @track_stage("generate_flow")
+        async def generate_flow(...): ...
+
+        with track_stage("validation"):
+            ...
+    """
+    if func is not None:
+        return track_stage(stage)(func)
+
+    class _StageTracker:
+        def __call__(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+            if inspect.iscoroutinefunction(fn):
+                @wraps(fn)
+                async def async_wrapper(*args, **kwargs) -> Any:
+                    with _stage_timer(stage):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(fn)
+            def sync_wrapper(*args, **kwargs) -> Any:
+                with _stage_timer(stage):
+                    return fn(*args, **kwargs)
+            return sync_wrapper
+
+        def __enter__(self):
+            self._ctx = _stage_timer(stage)
+            return self._ctx.__enter__()
+
+        def __exit__(self, *exc_info):
+            return self._ctx.__exit__(*exc_info)
+
+    return _StageTracker()
+
+
+def gauge_lines(
+    name: str,
+    documentation: str,
+    samples: Iterable[Tuple[Dict[str, str], float]],
+    kind: str = "gauge"
+) -> List[str]:
+    """Exposition lines for scrape-time values (used by registered collectors)"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+# Upstreams whose usage includes prompt_tokens_details (a 0 ratio for the others would be misleading)
+_CACHE_REPORTING_UPSTREAMS: set = set()
+
+
+def record_token_usage(upstream: str, usage: Any) -> None:
+    """
+    Count tokens from an OpenAI-style `usage` object or dict
+
+    Prompt tokens served from the provider's prefix cache
+    (`prompt_tokens_details.cached_tokens`) are counted as kind "cached_prompt".
+    """
+    if not usage:
+        return
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else dict(usage)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(kind)
+        if value:
+            LLM_TOKENS.inc(float(value), upstream, kind.replace("_tokens", ""))
+    details = usage.get("prompt_tokens_details")
+    if details is not None:
+        _CACHE_REPORTING_UPSTREAMS.add(upstream)
+        if details.get("cached_tokens"):
+            LLM_TOKENS.inc(float(details["cached_tokens"]), upstream, "cached_prompt")
+
+
+def _prompt_cache_ratio() -> List[str]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for (upstream, kind), value in list(LLM_TOKENS._values.items()):
+        totals.setdefault(upstream, {})[kind] = value
+    return gauge_lines(
+        "yana_llm_prompt_cache_ratio", "Share of prompt tokens served from the upstream prefix cache",
+        [({"upstream": upstream}, round(kinds.get("cached_prompt", 0.0) / kinds["prompt"], 4))
+         for upstream, kinds in totals.items() if kinds.get("prompt") and upstream in _CACHE_REPORTING_UPSTREAMS]
+    )
+
+
+registry.register_collector(_prompt_cache_ratio)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request count, in-flight gauge, latency by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = "500"
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_DURATION.observe(time.perf_counter() - started, method, route_path)
+            HTTP_REQUESTS.inc(1.0, method, route_path, status_code)
+            HTTP_IN_FLIGHT.dec()
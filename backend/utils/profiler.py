@@ -0,0 +1,89 @@
+"""
+Sampling profiler для аналізу hot paths на живому worker
+Вибірка стеків через sys._current_frames() з окремого потоку, вихід - collapsed stacks (flamegraph.pl / speedscope)
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Periodically snapshots Python stacks of other threads
+
+    Overhead is one sys._current_frames() call per interval; the profiled
+    threads are never paused beyond the GIL hand-off.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None, max_depth: int = 128):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def _sample(self, own_id: int, names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_id or (self.thread_id is not None and ident != self.thread_id):
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, duration: float) -> None:
+        """Sample for `duration` seconds (blocks the calling thread)"""
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while time.monotonic() < deadline:
+            self._sample(own_id, names)
+            if self.samples % 100 == 0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed format: `frame;frame;frame count` per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# Only one profile at a time per worker
+_profile_lock = threading.Lock()
+
+
+def profile(duration: float, interval: float = 0.005, thread_id: Optional[int] = None) -> Optional[SamplingProfiler]:
+    """
+    Run a sampling session (call via asyncio.to_thread)
+
+    Args:
+        duration: Seconds to sample
+        interval: Seconds between samples
+        thread_id: Restrict to one thread (e.g. the event loop), None = all threads
+
+    Returns:
+        Finished profiler, or None if another session is already running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = SamplingProfiler(interval=interval, thread_id=thread_id)
+        logger.info("Profiling started", duration=duration, interval=interval, thread_id=thread_id)
+        profiler.run(duration)
+        logger.info("Profiling finished", samples=profiler.samples, unique_stacks=len(profiler.stacks))
+        return profiler
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,189 @@
+"""
+Token-budget prompt assembly: секції з обов'язковим текстом + ранжовані списки, що обрізаються під budget
+Токени рахує tiktoken (якщо встановлений), інакше - консервативна оцінка
+"""
+import hashlib
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from config import settings
+from utils.metrics import registry
+
+PROMPT_TOKENS = registry.histogram(
+    "yana_prompt_tokens", "Assembled prompt size in tokens", ("prompt",),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+PROMPT_ITEMS_DROPPED = registry.counter(
+    "yana_prompt_items_dropped_total", "Context items left out to fit the token budget", ("prompt",)
+)
+
+# Word / number / single non-space symbol - the units BPE tokenizers rarely merge across
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\S")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Tokens in `text` for `model`
+
+    Without tiktoken: ASCII words ~4 chars/token, Cyrillic and other
+    non-ASCII words ~2 chars/token, digits ~3 per token, every symbol 1.
+    Slightly overestimates, so a prompt that fits the estimate fits for real.
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece.isascii():
+            tokens += math.ceil(len(piece) / 4)
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class PromptBuilder:
+    """
+    Assemble a prompt within a token budget
+
+    Text sections are always included. Ranked sections hold items in order
+    of relevance; after the text sections are counted, ranked sections fill
+    the remaining budget by `priority` (lower first), each taking items
+    from the top until the next one does not fit.
+
+    Example:
+        builder = PromptBuilder(budget=4000)
+        builder.add_text("flow", f"Steps: {compact_json(steps)}")
+        builder.add_ranked("components", "Components:", lines, priority=0)
+        prompt = builder.build()
+        prompt.text, prompt.tokens, prompt.report
+    """
+
+    def __init__(self, budget: int, model: str = "gpt-4", name: str = "prompt"):
+        self.budget = budget
+        self.model = model
+        self.name = name
+        self._sections: List[Dict[str, Any]] = []
+
+    def add_text(self, name: str, text: str) -> "PromptBuilder":
+        self._sections.append({"name": name, "text": text, "items": None})
+        return self
+
+    def add_ranked(self, name: str, header: str, items: List[str], priority: int = 0) -> "PromptBuilder":
+        """
+        Args:
+            name: Section name (for the report)
+            header: Line placed above the items (omitted when no item fits)
+            items: Item lines, most relevant first
+            priority: Budget order among ranked sections (lower = filled first)
+        """
+        self._sections.append({"name": name, "text": header, "items": items, "priority": priority})
+        return self
+
+    def build(self) -> "BuiltPrompt":
+        sizes: Dict[str, int] = {}
+        kept: Dict[str, List[str]] = {}
+        used = 0
+        for section in self._sections:
+            if section["items"] is None:
+                sizes[section["name"]] = count_tokens(section["text"], self.model) + 1
+                used += sizes[section["name"]]
+
+        ranked = sorted((s for s in self._sections if s["items"] is not None), key=lambda s: s["priority"])
+        dropped: Dict[str, int] = {}
+        for section in ranked:
+            header_tokens = count_tokens(section["text"], self.model) + 1
+            lines: List[str] = []
+            section_tokens = header_tokens
+            for item in section["items"]:
+                item_tokens = count_tokens(item, self.model) + 1
+                if used + section_tokens + item_tokens > self.budget:
+                    break
+                lines.append(item)
+                section_tokens += item_tokens
+            kept[section["name"]] = lines
+            dropped[section["name"]] = len(section["items"]) - len(lines)
+            sizes[section["name"]] = section_tokens if lines else 0
+            used += sizes[section["name"]]
+
+        parts = []
+        for section in self._sections:
+            if section["items"] is None:
+                parts.append(section["text"])
+            elif kept[section["name"]]:
+                parts.append("\n".join([section["text"], *kept[section["name"]]]))
+        text = "\n".join(parts)
+
+        tokens = count_tokens(text, self.model)
+        report = {
+            "tokens": tokens,
+            "budget": self.budget,
+            "over_budget": tokens > self.budget,
+            "sections": sizes,
+            "dropped": {name: count for name, count in dropped.items() if count},
+            "exact": _encoding(self.model) is not None,
+        }
+        PROMPT_TOKENS.observe(tokens, self.name)
+        for count in report["dropped"].values():
+            PROMPT_ITEMS_DROPPED.inc(count, self.name)
+        return BuiltPrompt(text, tokens, report)
+
+
+class BuiltPrompt:
+    """Assembled prompt text with its token count and per-section report"""
+
+    __slots__ = ("text", "tokens", "report")
+
+    def __init__(self, text: str, tokens: int, report: Dict[str, Any]):
+        self.text = text
+        self.tokens = tokens
+        self.report = report
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def truncate_strings(value: Any, max_chars: int) -> Any:
+    """Copy of a JSON-like value with long strings shortened (last-resort prompt compaction)"""
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars - 1] + "…"
+    if isinstance(value, dict):
+        return {key: truncate_strings(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [truncate_strings(item, max_chars) for item in value]
+    return value
+
+
+def prompt_cache_params(prefix: str) -> Dict[str, Any]:
+    """
+    Extra OpenAI request params for a static prompt prefix
+
+    OpenAI caches prompt prefixes (>= 1024 tokens) automatically; `prompt_cache_key`
+    routes calls that share the prefix to the same cache shard. The key is a hash
+    of the prefix, so it changes exactly when the prefix does.
+    """
+    if not settings.openai_prompt_cache_key:
+        return {}
+    digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+    return {"extra_body": {"prompt_cache_key": f"yana-{digest}"}}
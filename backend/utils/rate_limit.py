@@ -0,0 +1,442 @@
+"""
+Admission control: token buckets та concurrency limits для upstream LLM calls
+Backpressure через 429 + Retry-After замість необмеженої черги
+"""
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import structlog
+
+from fastapi import Request
+
+from config import settings
+from utils.error_handlers import RateLimitError
+from utils.metrics import registry, gauge_lines
+from utils.shared_cache import SharedCacheError, shared_cache
+
+logger = structlog.get_logger()
+
+UPSTREAM_WAIT = registry.histogram(
+    "yana_upstream_queue_wait_seconds", "Time spent waiting for an upstream slot", ("upstream",)
+)
+
+
+def get_client_id(request: Request) -> str:
+    """Identify client: X-Client-ID header or remote address"""
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return client_id[:64]
+    return request.client.host if request.client else "anonymous"
+
+
+class TokenBucket:
+    """Classic token bucket (thread-safe)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take tokens if available
+
+        Returns:
+            Tuple of (acquired, seconds until enough tokens are available)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True, 0.0
+            return False, (tokens - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """
+    Per-client token buckets (rate_limit_requests per rate_limit_period, 0 = unlimited)
+
+    With a cross-process `cache` (SQLiteCache) buckets live there, so the limit
+    holds for the whole server instead of per worker. If the cache is busy the
+    request is let through (fail open).
+    """
+
+    def __init__(self, requests: int, period: float, max_clients: int = 10000, cache=None):
+        # requests (or period) <= 0 disables the per-client limit
+        self.enabled = requests > 0 and period > 0
+        self.rate = requests / period if self.enabled else 0.0
+        self.capacity = float(requests)
+        self.max_clients = max_clients
+        self.cache = cache
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.rejected = 0
+
+    def check(self, client_id: str) -> None:
+        """
+        Raises:
+            RateLimitError: if client exhausted its budget
+        """
+        if not self.enabled:
+            return
+        if self.cache is not None:
+            acquired, wait = self._try_acquire_shared(client_id)
+        else:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._prune()
+                bucket = self._buckets[client_id] = TokenBucket(self.rate, self.capacity)
+            acquired, wait = bucket.try_acquire()
+
+        if not acquired:
+            self.rejected += 1
+            raise RateLimitError(
+                f"Rate limit exceeded for client ({int(self.capacity)} requests per {self.capacity / self.rate:.0f}s)",
+                retry_after=wait
+            )
+
+    def _try_acquire_shared(self, client_id: str) -> Tuple[bool, float]:
+        def take(state):
+            now = time.time()
+            tokens = self.capacity
+            if state is not None:
+                tokens = min(self.capacity, state[0] + (now - state[1]) * self.rate)
+            if tokens >= 1.0:
+                return [tokens - 1.0, now], (True, 0.0)
+            return [tokens, now], (False, (1.0 - tokens) / self.rate)
+
+        try:
+            # A bucket refills completely within one period, so an expired key == full bucket
+            return self.cache.update(f"ratelimit:{client_id}", take, ttl=self.capacity / self.rate)
+        except SharedCacheError as e:
+            logger.warning("Shared rate limit unavailable, allowing request", client_id=client_id, error=str(e))
+            return True, 0.0
+
+    def _prune(self) -> None:
+        """Drop buckets that are full again (idle clients)"""
+        now = time.monotonic()
+        idle = [
+            client_id for client_id, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.updated_at) * bucket.rate >= bucket.capacity
+        ]
+        for client_id in idle:
+            del self._buckets[client_id]
+
+
+class _SlotWaiter:
+    """Caller queued for an upstream slot: coroutine (future) or thread (event)"""
+
+    __slots__ = ("loop", "future", "event", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+
+    def wake(self) -> bool:
+        """Hand the slot over (called under the limiter lock); False if the waiter's loop is gone"""
+        if self.future is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._resolve)
+            except RuntimeError:
+                return False
+        else:
+            self.event.set()
+        self.granted = True
+        return True
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class UpstreamLimiter:
+    """
+    Concurrency + rate limit for one upstream service
+
+    Callers beyond max_concurrency wait in a bounded FIFO queue; once the queue
+    holds max_queue waiters new callers are rejected immediately. Coroutines and
+    threads share the same slot count, so mixed callers never exceed max_concurrency.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, rate: float = 0.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(rate, max(rate, 1.0)) if rate > 0 else None
+
+        # Free slots + FIFO of waiters, both guarded by _lock; a released slot
+        # is handed directly to the oldest waiter
+        self._free = max_concurrency
+        self._waiters: Deque[_SlotWaiter] = deque()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.hold_time_total = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _admit_or_reject(self) -> None:
+        if self.bucket is not None:
+            acquired, wait = self.bucket.try_acquire()
+            if not acquired:
+                self._reject(wait, "rate")
+
+        if self.in_flight >= self.max_concurrency and self.waiting >= self.max_queue:
+            self._reject(self._estimate_wait(), "queue_full")
+
+    def _reject(self, retry_after: float, reason: str) -> None:
+        with self._lock:
+            self.rejected += 1
+        logger.warning(
+            "Upstream admission rejected",
+            upstream=self.name, reason=reason,
+            in_flight=self.in_flight, waiting=self.waiting
+        )
+        raise RateLimitError(
+            f"Upstream '{self.name}' is overloaded, try again later",
+            retry_after=retry_after
+        )
+
+    def _estimate_wait(self) -> float:
+        """Rough time until a queue slot frees up: avg hold time × queue rounds"""
+        if self.admitted == 0:
+            return 1.0
+        avg_hold = self.hold_time_total / self.admitted
+        return avg_hold * (self.waiting / self.max_concurrency + 1)
+
+    def _try_take(self) -> bool:
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return True
+            return False
+
+    def _take_or_enqueue(self, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_SlotWaiter]:
+        """Take a free slot (returns None) or append a waiter to the queue and return it"""
+        with self._lock:
+            if self._free > 0:
+                self._free -= 1
+                return None
+            waiter = _SlotWaiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: _SlotWaiter) -> bool:
+        """Drop a waiter that gave up; True if it was granted a slot meanwhile (caller owns it)"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            while self._waiters:
+                if self._waiters.popleft().wake():
+                    return
+            self._free += 1
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.admitted += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+            self.in_flight += 1
+        UPSTREAM_WAIT.observe(waited, self.name)
+
+    def _record_release(self, held: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.hold_time_total += held
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Async slot (use from coroutines)"""
+        self._admit_or_reject()
+
+        started = time.monotonic()
+        waiter = self._take_or_enqueue(asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if self._abandon(waiter):
+                    self._release_slot()
+                raise
+
+        admitted_at = time.monotonic()
+        self._record_wait(admitted_at - started)
+        try:
+            yield
+        finally:
+            self._record_release(time.monotonic() - admitted_at)
+            self._release_slot()
+
+    @contextmanager
+    def acquire_sync(self, timeout: Optional[float] = None):
+        """
+        Blocking slot (use from sync code / worker threads)
+
+        On an event loop thread it never blocks: if no slot is free right away
+        the call is rejected instead of stalling every other request.
+        """
+        self._admit_or_reject()
+
+        started = time.monotonic()
+        if _loop_running():
+            if not self._try_take():
+                self._reject(self._estimate_wait(), "event_loop")
+        else:
+            waiter = self._take_or_enqueue(None)
+            if waiter is not None and not waiter.event.wait(timeout) and not self._abandon(waiter):
+                self._reject(self._estimate_wait(), "wait_timeout")
+
+        admitted_at = time.monotonic()
+        self._record_wait(admitted_at - started)
+        try:
+            yield
+        finally:
+            self._record_release(time.monotonic() - admitted_at)
+            self._release_slot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted,
+            "rejected_total": self.rejected,
+            "wait_time_avg": round(self.wait_time_total / self.admitted, 4) if self.admitted else 0.0,
+            "wait_time_max": round(self.wait_time_max, 4),
+        }
+
+
+class AdmissionController:
+    """Registry of upstream limiters + per-client limiter"""
+
+    def __init__(self, clients: ClientRateLimiter, upstreams: Dict[str, UpstreamLimiter]):
+        self.clients = clients
+        self.upstreams = upstreams
+
+    def upstream(self, name: str) -> UpstreamLimiter:
+        return self.upstreams[name]
+
+    def limit(self, name: str) -> Callable:
+        """
+        Decorator: run function inside an upstream slot
+
+        Example:
+            @admission.limit("codemie")
+            async def call_agent(...):
+                ...
+        """
+        limiter = self.upstreams[name]
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs) -> Any:
+                    async with limiter.acquire():
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs) -> Any:
+                with limiter.acquire_sync(timeout=settings.upstream_queue_timeout):
+                    return func(*args, **kwargs)
+            return sync_wrapper
+
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "clients": {"tracked": len(self.clients._buckets), "rejected_total": self.clients.rejected},
+            "upstreams": {name: limiter.snapshot() for name, limiter in self.upstreams.items()},
+        }
+
+
+# Global instance
+admission = AdmissionController(
+    clients=ClientRateLimiter(
+        settings.rate_limit_requests, settings.rate_limit_period,
+        cache=shared_cache if shared_cache.shared else None
+    ),
+    upstreams={
+        "codemie": UpstreamLimiter(
+            "codemie", settings.codemie_max_concurrency, settings.upstream_max_queue, settings.upstream_rate_limit
+        ),
+        "ollama": UpstreamLimiter(
+            "ollama", settings.ollama_max_concurrency, settings.upstream_max_queue, settings.upstream_rate_limit
+        ),
+        "openai": UpstreamLimiter(
+            "openai", settings.openai_max_concurrency, settings.upstream_max_queue, settings.upstream_rate_limit
+        ),
+    }
+)
+
+
+def _collect_admission_metrics():
+    upstreams = [(name, limiter.snapshot()) for name, limiter in admission.upstreams.items()]
+    lines = gauge_lines(
+        "yana_upstream_in_flight", "Upstream calls holding a slot",
+        [({"upstream": name}, snap["in_flight"]) for name, snap in upstreams]
+    )
+    lines += gauge_lines(
+        "yana_upstream_queue_depth", "Upstream calls waiting for a slot",
+        [({"upstream": name}, snap["waiting"]) for name, snap in upstreams]
+    )
+    lines += gauge_lines(
+        "yana_upstream_admitted_total", "Upstream calls admitted",
+        [({"upstream": name}, snap["admitted_total"]) for name, snap in upstreams],
+        kind="counter"
+    )
+    lines += gauge_lines(
+        "yana_admission_rejected_total", "Requests rejected by admission control",
+        [({"scope": name}, snap["rejected_total"]) for name, snap in upstreams]
+        + [({"scope": "client"}, admission.clients.rejected)],
+        kind="counter"
+    )
+    return lines
+
+
+registry.register_collector(_collect_admission_metrics)
+
+
+async def enforce_client_rate_limit(request: Request) -> str:
+    """
+    FastAPI dependency: per-client token bucket
+
+    Returns:
+        Client ID (for downstream use)
+    """
+    client_id = get_client_id(request)
+    admission.clients.check(client_id)
+    return client_id
@@ -1,35 +1,255 @@
 """
-Retry utilities with exponential backoff
+Retry utilities with full-jitter backoff, circuit breakers and a retry budget
 """
 import asyncio
 import logging
-from typing import TypeVar, Callable, Any
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import TypeVar, Callable, Any, Deque, Dict, Optional, Tuple
 from functools import wraps
 
+import httpx
+
+from config import settings
+from utils.error_handlers import CircuitOpenError, CodeMieAPIError
+from utils.metrics import RETRIES, RETRY_BUDGET_EXHAUSTED, registry, gauge_lines
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Error classes worth retrying: transient network / upstream failures.
+# Validation errors, 4xx responses and admission rejections are never retried.
+RETRYABLE_EXCEPTIONS: Tuple[type, ...] = (
+    TimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError,
+    httpx.TransportError,
+    httpx.HTTPStatusError,
+    CodeMieAPIError,
+)
+
+# OpenAI SDK errors are resolved by name: importing the SDK here would cost
+# every worker ~0.3s at startup even when no OpenAI client is ever built
+OPENAI_RETRYABLE_EXCEPTIONS = ("APIConnectionError", "InternalServerError", "RateLimitError")
+
+
+def _is_openai_retryable(exc: BaseException) -> bool:
+    openai = sys.modules.get("openai")
+    if openai is None:
+        return False
+    return isinstance(exc, tuple(getattr(openai, name) for name in OPENAI_RETRYABLE_EXCEPTIONS))
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Status-aware check on top of RETRYABLE_EXCEPTIONS (+ OpenAI SDK errors)"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code >= 500 or code == 429
+    if isinstance(exc, CodeMieAPIError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return isinstance(exc, RETRYABLE_EXCEPTIONS) or _is_openai_retryable(exc)
+
+
+def is_upstream_response(exc: BaseException) -> bool:
+    """Error carrying a 4xx status: the upstream answered, so it is healthy"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return 400 <= exc.response.status_code < 500
+    if isinstance(exc, CodeMieAPIError):
+        return 400 <= exc.status_code < 500
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(exc, openai.APIStatusError) and 400 <= exc.status_code < 500
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker
+
+    closed → open after `failure_threshold` consecutive failures;
+    open → half_open after `recovery_timeout` seconds;
+    half_open lets `half_open_max_calls` probes through and closes on success.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: if the circuit rejects the call
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.recovery_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, retry_after=remaining)
+                self.state = self.HALF_OPEN
+                self.half_open_calls = 0
+                logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+
+            if self.state == self.HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.name, retry_after=1.0)
+                self.half_open_calls += 1
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot (call cancelled or never reached the upstream)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logger.error(f"Circuit '{self.name}' opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class RetryBudget:
+    """
+    Global retry budget: retries may add at most `ratio` extra load
+    over a sliding window, plus a small floor for low-traffic periods
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_window: int = 3, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries_per_window
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if exhausted"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "ratio": self.ratio,
+                "requests_in_window": len(self._requests),
+                "retries_in_window": len(self._retries),
+                "exhausted_total": self.exhausted,
+            }
+
+
+# Global registries
+retry_budget = RetryBudget(
+    ratio=settings.retry_budget_ratio,
+    min_retries_per_window=settings.retry_budget_min_retries,
+)
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get or create circuit breaker for an upstream"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout,
+        )
+    return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state per upstream (for health checks)"""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+
+_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+
+def _collect_breaker_metrics():
+    return gauge_lines(
+        "yana_circuit_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)",
+        [({"upstream": name}, _STATE_VALUES[breaker.state]) for name, breaker in _breakers.items()]
+    )
+
+
+registry.register_collector(_collect_breaker_metrics)
+
 
 def async_retry(
     max_attempts: int = 3,
     initial_delay: float = 1.0,
     max_delay: float = 10.0,
     exponential_base: float = 2.0,
-    exceptions: tuple = (Exception,)
+    exceptions: Optional[tuple] = None,
+    breaker: Optional[str] = None,
+    budget: Optional[RetryBudget] = retry_budget
 ):
     """
-    Decorator for async functions with exponential backoff retry
-    
+    Decorator for async functions with full-jitter exponential backoff
+
     Args:
         max_attempts: Maximum number of retry attempts
         initial_delay: Initial delay in seconds
         max_delay: Maximum delay in seconds
         exponential_base: Base for exponential backoff
-        exceptions: Tuple of exceptions to catch and retry
-        
+        exceptions: Restrict retries to these exception types (None = all retryable errors)
+        breaker: Upstream name for circuit breaking (None = no breaker)
+        budget: Shared retry budget (None = unlimited retries)
+
     Example:
-        @async_retry(max_attempts=3, initial_delay=1.0)
+        @async_retry(max_attempts=3, initial_delay=1.0, breaker="codemie")
         async def my_function():
             # Your code here
             pass
@@ -37,33 +257,60 @@ def async_retry(
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            delay = initial_delay
-            last_exception = None
-            
+            circuit = get_breaker(breaker) if breaker else None
+            if budget is not None:
+                budget.record_request()
+
             for attempt in range(1, max_attempts + 1):
+                if circuit is not None:
+                    circuit.before_call()
+
                 try:
-                    return await func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_attempts:
+                    result = await func(*args, **kwargs)
+                except asyncio.CancelledError:
+                    if circuit is not None:
+                        circuit.release_probe()
+                    raise
+                except Exception as e:
+                    if not (is_retryable(e) and (exceptions is None or isinstance(e, exceptions))):
+                        if circuit is not None:
+                            if is_upstream_response(e):
+                                # Upstream answered (4xx / bad input): not an outage
+                                circuit.record_success()
+                            else:
+                                # Our own error (bug, admission rejection): says nothing about the upstream
+                                circuit.release_probe()
+                        raise
+
+                    if circuit is not None:
+                        circuit.record_failure()
+
+                    if attempt == max_attempts or (circuit is not None and circuit.state == CircuitBreaker.OPEN):
                         logger.error(
-                            f"Function {func.__name__} failed after {max_attempts} attempts",
+                            f"Function {func.__name__} failed after {attempt} attempts",
                             exc_info=True
                         )
                         raise
-                    
+
+                    if budget is not None and not budget.try_spend():
+                        RETRY_BUDGET_EXHAUSTED.inc()
+                        logger.warning(f"Function {func.__name__} failed, retry budget exhausted: {str(e)}")
+                        raise
+
+                    # Full jitter: sleep U(0, min(cap, base * factor^n))
+                    ceiling = min(initial_delay * exponential_base ** (attempt - 1), max_delay)
+                    delay = random.uniform(0, ceiling)
                     logger.warning(
                         f"Function {func.__name__} failed (attempt {attempt}/{max_attempts}), "
                         f"retrying in {delay:.2f}s: {str(e)}"
                     )
-                    
+
+                    RETRIES.inc(1.0, func.__name__)
                     await asyncio.sleep(delay)
-                    delay = min(delay * exponential_base, max_delay)
-            
-            # Should never reach here, but just in case
-            if last_exception:
-                raise last_exception
-                
+                else:
+                    if circuit is not None:
+                        circuit.record_success()
+                    return result
+
         return wrapper
     return decorator
@@ -0,0 +1,202 @@
+"""
+Shared cache: in-process (memory) або SQLite файл, спільний для всіх workers на одному хості
+Для кешів, які мають бути узгоджені між процесами (rate limits, результати генерації)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+import structlog
+
+from config import settings
+from utils.metrics import registry
+
+logger = structlog.get_logger()
+
+CACHE_OPS = registry.counter(
+    "yana_shared_cache_ops_total", "Shared cache lookups by result", ("backend", "result")
+)
+
+# func(current value or None) -> (new value or None to delete, result for the caller)
+UpdateFunc = Callable[[Optional[Any]], Tuple[Optional[Any], Any]]
+
+
+class SharedCacheError(Exception):
+    """Atomic update could not be applied (backend busy or unavailable)"""
+
+
+class MemoryCache:
+    """Per-process cache with TTL (default; coherent only within one worker)"""
+
+    backend = "memory"
+    shared = False
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.time()):
+            CACHE_OPS.inc(1, self.backend, "miss")
+            return default
+        CACHE_OPS.inc(1, self.backend, "hit")
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def update(self, key: str, func: UpdateFunc, ttl: Optional[float] = None) -> Any:
+        """Atomic read-modify-write of one key"""
+        with self._lock:
+            entry = self._data.get(key)
+            current = entry[0] if entry and (entry[1] is None or entry[1] >= time.time()) else None
+            value, result = func(current)
+            if value is None:
+                self._data.pop(key, None)
+            else:
+                self._store(key, value, ttl)
+            return result
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def close(self) -> None:
+        pass
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if len(self._data) >= self.max_entries and key not in self._data:
+            now = time.time()
+            expired = [k for k, (_, expires_at) in self._data.items() if expires_at is not None and expires_at < now]
+            for k in expired or list(self._data)[: self.max_entries // 10]:
+                del self._data[k]
+        self._data[key] = (value, time.time() + ttl if ttl else None)
+
+
+class SQLiteCache:
+    """
+    Cache in a local SQLite file (WAL), shared by all worker processes on the host
+
+    Values are stored as JSON. The connection is opened lazily per process, so
+    an instance created before fork never hands its connection to a worker.
+    `get`/`set` degrade to a miss / no-op when the file is busy; `update`
+    raises SharedCacheError so the caller can pick fail-open or fail-closed.
+    """
+
+    backend = "sqlite"
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = 0.2, prune_every: int = 1000):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.prune_every = prune_every
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Shared cache read failed", key=key, error=str(e))
+            row = None
+        CACHE_OPS.inc(1, self.backend, "hit" if row else "miss")
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            with self._lock:
+                self._write(self._connection(), key, value, ttl)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache write failed", key=key, error=str(e))
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning("Shared cache delete failed", key=key, error=str(e))
+
+    def update(self, key: str, func: UpdateFunc, ttl: Optional[float] = None) -> Any:
+        """
+        Atomic read-modify-write of one key across all processes
+
+        Raises:
+            SharedCacheError: if the write lock was not obtained within busy_timeout
+        """
+        try:
+            with self._lock:
+                db = self._connection()
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    row = db.execute(
+                        "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                        (key, time.time())
+                    ).fetchone()
+                    value, result = func(json.loads(row[0]) if row else None)
+                    if value is None:
+                        db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    else:
+                        self._write(db, key, value, ttl)
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                return result
+        except sqlite3.Error as e:
+            raise SharedCacheError(str(e)) from e
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+    def _write(self, db: sqlite3.Connection, key: str, value: Any, ttl: Optional[float]) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl if ttl else None)
+        )
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            db.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+
+def create_cache(path: Optional[str] = None):
+    """SQLite cache at `path`, or per-process memory cache when no path is given"""
+    return SQLiteCache(path) if path else MemoryCache()
+
+
+# Global instance
+shared_cache = create_cache(settings.shared_cache_path)
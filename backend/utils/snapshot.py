@@ -0,0 +1,187 @@
+"""
+Versioned binary snapshot: іменовані секції key → JSON value в одному файлі, memory-mapped при старті
+Завантаження - константний час (лише header), сторінки файлу спільні між workers через page cache
+
+Layout (little-endian):
+    header   MAGIC(8) format_version(u32) section_count(u32) built_at(f64) digest(16)
+    sections section_count × (name_off, name_len, entries_off, entry_count)   u32 each
+    entries  per section, sorted by key bytes: (key_off, key_len, value_off, value_len)   u32 each
+    blobs    UTF-8 keys / names and compact JSON values
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Union
+
+MAGIC = b"YSNAP\x00\x00\x00"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sIId16s")
+_SECTION = struct.Struct("<IIII")
+_ENTRY = struct.Struct("<IIII")
+
+
+class SnapshotError(Exception):
+    """Snapshot file is missing, corrupt or of an unsupported format version"""
+
+
+def content_digest(sections: Dict[str, Dict[str, Any]]) -> bytes:
+    """Data version: hash of the canonical JSON of all sections"""
+    canonical = json.dumps(sections, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).digest()[:16]
+
+
+def encode_snapshot(sections: Dict[str, Dict[str, Any]]) -> bytes:
+    """Serialize {section: {key: JSON-able value}} into snapshot bytes"""
+    names = sorted(sections)
+    entries_start = _HEADER.size + _SECTION.size * len(names)
+    blob_start = entries_start + _ENTRY.size * sum(len(sections[name]) for name in names)
+
+    section_table, entry_table, blobs = [], [], bytearray()
+
+    def add_blob(data: bytes) -> int:
+        offset = blob_start + len(blobs)
+        blobs.extend(data)
+        return offset
+
+    for name in names:
+        name_bytes = name.encode("utf-8")
+        section_table.append(_SECTION.pack(
+            add_blob(name_bytes), len(name_bytes),
+            entries_start + _ENTRY.size * len(entry_table), len(sections[name])
+        ))
+        items = sorted((str(key).encode("utf-8"), value) for key, value in sections[name].items())
+        for key, value in items:
+            value_bytes = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            entry_table.append(_ENTRY.pack(add_blob(key), len(key), add_blob(value_bytes), len(value_bytes)))
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(names), time.time(), content_digest(sections))
+    return header + b"".join(section_table) + b"".join(entry_table) + bytes(blobs)
+
+
+def write_snapshot(path: str, sections: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Atomically write a snapshot file (temp file + rename, safe while workers map the old one)
+
+    Returns:
+        Data version (hex digest)
+    """
+    data = encode_snapshot(sections)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return _HEADER.unpack_from(data)[4].hex()
+
+
+class SnapshotSection(Mapping):
+    """Read-only mapping over one section; values are decoded from the buffer on every access"""
+
+    def __init__(self, buffer, name: str, entries_off: int, count: int):
+        self.name = name
+        self._buffer = buffer
+        self._entries_off = entries_off
+        self._count = count
+
+    def _entry(self, index: int):
+        return _ENTRY.unpack_from(self._buffer, self._entries_off + index * _ENTRY.size)
+
+    def _key(self, index: int) -> bytes:
+        key_off, key_len, _, _ = self._entry(index)
+        return self._buffer[key_off:key_off + key_len]
+
+    def _find(self, key: str) -> Optional[int]:
+        target = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self._count and self._key(low) == target else None
+
+    def __getitem__(self, key: str) -> Any:
+        index = self._find(key) if isinstance(key, str) else None
+        if index is None:
+            raise KeyError(key)
+        _, _, value_off, value_len = self._entry(index)
+        return json.loads(self._buffer[value_off:value_off + value_len])
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._key(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"SnapshotSection({self.name!r}, {self._count} entries)"
+
+
+class Snapshot:
+    """
+    Memory-mapped snapshot reader
+
+    Opening reads only the header and section table; entries are located by
+    binary search over the fixed-width index, so load time does not grow
+    with the amount of data.
+    """
+
+    def __init__(self, buffer: Union[mmap.mmap, bytes], path: Optional[str] = None):
+        self.path = path
+        self._buffer = buffer
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError(f"Snapshot too small: {path}")
+        magic, version, section_count, built_at, digest = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"Not a snapshot file: {path}")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot format {version} (expected {FORMAT_VERSION}): {path}")
+        self.format_version = version
+        self.built_at = built_at
+        self.version = digest.hex()
+        self.sections: Dict[str, SnapshotSection] = {}
+        for index in range(section_count):
+            name_off, name_len, entries_off, count = _SECTION.unpack_from(buffer, _HEADER.size + index * _SECTION.size)
+            name = bytes(buffer[name_off:name_off + name_len]).decode("utf-8")
+            self.sections[name] = SnapshotSection(buffer, name, entries_off, count)
+
+    @classmethod
+    def open(cls, path: str) -> "Snapshot":
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+        return cls(buffer, path)
+
+    def section(self, name: str) -> SnapshotSection:
+        try:
+            return self.sections[name]
+        except KeyError:
+            raise SnapshotError(f"Snapshot has no section '{name}'") from None
+
+    def get_section(self, name: str) -> Optional[SnapshotSection]:
+        return self.sections.get(name)
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "format": self.format_version,
+            "built_at": self.built_at,
+            "path": self.path,
+            "mapped": isinstance(self._buffer, mmap.mmap),
+            "sections": {name: len(section) for name, section in self.sections.items()},
+        }
@@ -0,0 +1,174 @@
+"""
+Мінімальний Jinja-style template compiler: шаблон компілюється один раз у Python функцію
+Синтаксис: {{ path }} (HTML-escaped), {{ path|raw }}, {% for x in path %}, {% if [not] path [== "value"] %}/{% else %}, {% include "name" %}
+"""
+import html
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+_TAG_RE = re.compile(r"{{\s*(.+?)\s*}}|{%-?\s*(.+?)\s*-?%}", re.S)
+_PATH_RE = re.compile(r"^[A-Za-z_]\w*(\.\w+)*$")
+_IF_RE = re.compile(r"^if\s+(not\s+)?([\w.]+)(?:\s*==\s*(\"[^\"]*\"|'[^']*'))?$")
+_FOR_RE = re.compile(r"^for\s+([A-Za-z_]\w*)\s+in\s+([\w.]+)$")
+_INCLUDE_RE = re.compile(r"^include\s+(\"[^\"]*\"|'[^']*')$")
+
+
+class TemplateError(ValueError):
+    """Template syntax error (raised at compile time, not while rendering)"""
+
+
+def _attr(value: Any, key: str) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, Mapping):
+        return value.get(key)
+    return getattr(value, key, None)
+
+
+def _escape(value: Any) -> str:
+    if value is None:
+        return ""
+    if value is True or value is False:
+        return "true" if value else "false"
+    return html.escape(str(value), quote=True)
+
+
+def _raw(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+class Template:
+    """
+    Compiled template
+
+    Example:
+        template = Template('<h2>{{ step.title }}</h2>{% for f in step.fields %}<p>{{ f.label }}</p>{% endfor %}')
+        template.render(step={"title": "Крок", "fields": [{"label": "ПІБ"}]})
+    """
+
+    def __init__(self, source: str, name: str = "<template>", loader: Optional["TemplateLoader"] = None):
+        self.name = name
+        self.loader = loader
+        self.source_code = self._compile(source)
+        namespace: Dict[str, Any] = {}
+        exec(compile(self.source_code, f"<template {name}>", "exec"), namespace)
+        self._render: Callable[..., str] = namespace["render"]
+
+    def render(self, **context: Any) -> str:
+        return self._render(context, _attr, _escape, _raw, self._include)
+
+    def _include(self, name: str, context: Dict[str, Any]) -> str:
+        if self.loader is None:
+            raise TemplateError(f"{self.name}: include without a loader")
+        return self.loader.get(name).render(**context)
+
+    # ==================== Compiler ====================
+
+    def _compile(self, source: str) -> str:
+        lines = ["def render(_ctx, _attr, _e, _raw, _include):", "    _out = []", "    _a = _out.append"]
+        indent = 1
+        scopes: List[set] = [set()]
+        blocks: List[str] = []
+        position = 0
+
+        def emit(line: str) -> None:
+            lines.append("    " * indent + line)
+
+        def expression(path: str) -> str:
+            if not _PATH_RE.match(path):
+                raise TemplateError(f"{self.name}: unsupported expression {path!r}")
+            head, *rest = path.split(".")
+            code = head if any(head in scope for scope in scopes) else f"_ctx.get({head!r})"
+            for key in rest:
+                code = f"_attr({code}, {key!r})"
+            return code
+
+        for match in _TAG_RE.finditer(source):
+            if match.start() > position:
+                emit(f"_a({source[position:match.start()]!r})")
+            position = match.end()
+
+            if match.group(1) is not None:
+                path, _, filter_name = match.group(1).partition("|")
+                path, filter_name = path.strip(), filter_name.strip()
+                if filter_name not in ("", "raw"):
+                    raise TemplateError(f"{self.name}: unknown filter {filter_name!r}")
+                emit(f"_a({'_raw' if filter_name else '_e'}({expression(path)}))")
+                continue
+
+            statement = match.group(2)
+            if statement.startswith("for "):
+                parsed = _FOR_RE.match(statement)
+                if not parsed:
+                    raise TemplateError(f"{self.name}: bad for: {statement!r}")
+                emit(f"for {parsed.group(1)} in ({expression(parsed.group(2))} or ()):")
+                indent += 1
+                scopes.append({parsed.group(1)})
+                blocks.append("for")
+            elif statement.startswith("if "):
+                parsed = _IF_RE.match(statement)
+                if not parsed:
+                    raise TemplateError(f"{self.name}: bad if: {statement!r}")
+                condition = expression(parsed.group(2))
+                if parsed.group(3):
+                    condition = f"{condition} == {parsed.group(3)}"
+                emit(f"if {'not ' if parsed.group(1) else ''}({condition}):")
+                indent += 1
+                blocks.append("if")
+            elif statement == "else":
+                if not blocks or blocks[-1] != "if":
+                    raise TemplateError(f"{self.name}: else outside if")
+                emit("pass")
+                indent -= 1
+                emit("else:")
+                indent += 1
+            elif statement in ("endfor", "endif"):
+                if not blocks or blocks.pop() != statement[3:]:
+                    raise TemplateError(f"{self.name}: unexpected {statement}")
+                emit("pass")
+                indent -= 1
+                if statement == "endfor":
+                    scopes.pop()
+            elif statement.startswith("include "):
+                parsed = _INCLUDE_RE.match(statement)
+                if not parsed:
+                    raise TemplateError(f"{self.name}: bad include: {statement!r}")
+                local_names = sorted({name for scope in scopes[1:] for name in scope})
+                context = "{**_ctx, " + ", ".join(f"{name!r}: {name}" for name in local_names) + "}"
+                emit(f"_a(_include({parsed.group(1)}, {context}))")
+            else:
+                raise TemplateError(f"{self.name}: unknown statement {statement!r}")
+
+        if blocks:
+            raise TemplateError(f"{self.name}: unclosed {blocks[-1]}")
+        if position < len(source):
+            emit(f"_a({source[position:]!r})")
+        lines.append("    return ''.join(_out)")
+        return "\n".join(lines)
+
+
+class TemplateLoader:
+    """Templates by name from a directory, compiled on first use and kept"""
+
+    def __init__(self, directory, suffix: str = ".html"):
+        self.directory = directory
+        self.suffix = suffix
+        self._templates: Dict[str, Template] = {}
+
+    def get(self, name: str) -> Template:
+        template = self._templates.get(name)
+        if template is None:
+            path = self.directory / f"{name}{self.suffix}"
+            template = Template(path.read_text(encoding="utf-8"), name=name, loader=self)
+            self._templates[name] = template
+        return template
+
+    def exists(self, name: str) -> bool:
+        return name in self._templates or (self.directory / f"{name}{self.suffix}").exists()
+
+    def compile_all(self) -> List[str]:
+        """Compile every template in the directory (startup / CI check)"""
+        names = sorted(path.stem for path in self.directory.glob(f"*{self.suffix}"))
+        for name in names:
+            self.get(name)
+        return names
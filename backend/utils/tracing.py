@@ -0,0 +1,409 @@
+"""
+Distributed tracing: W3C traceparent propagation, span per stage / upstream HTTP call
+Експорт у JSONL файл або OTLP/HTTP (JSON) collector, trace_id/span_id у structlog contextvars
+"""
+import contextvars
+import inspect
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """Single timed operation within a trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+                 "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: int = SPAN_KIND_INTERNAL):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# ==================== Exporters ====================
+
+class FileSpanExporter:
+    """Append spans as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter:
+    """OTLP/HTTP JSON exporter (POST {endpoint}, e.g. http://collector:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, service_name: str = "yana-diia-backend", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        # Plain client: exporter traffic must not be traced itself
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "yana.tracing"},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": span.kind,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": [
+                                {"key": key, "value": _otlp_value(value)}
+                                for key, value in span.attributes.items()
+                            ],
+                            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                        }
+                        for span in spans
+                    ],
+                }],
+            }]
+        }
+        try:
+            self._client.post(self.endpoint, json=payload).raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("OTLP export failed", endpoint=self.endpoint, error=str(e), spans=len(spans))
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class BatchSpanProcessor:
+    """Buffers finished spans and exports them from a background thread"""
+
+    def __init__(self, exporter, max_batch: int = 256, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._closed = False
+        self._start()
+        # Threads do not survive fork: workers forked by serve.py need their own exporter thread
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        if self._closed:
+            return
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning("Span export failed", error=str(e))
+            if stop:
+                return
+
+    def shutdown(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self.exporter.shutdown()
+
+
+# ==================== Tracer ====================
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_processor: Optional[BatchSpanProcessor] = None
+_sample_rate = 1.0
+
+
+def setup_tracing(
+    exporter: str = "none",
+    file_path: str = "traces.jsonl",
+    otlp_endpoint: str = "http://localhost:4318/v1/traces",
+    sample_rate: float = 1.0
+) -> None:
+    """
+    Configure span export
+
+    Args:
+        exporter: "none" (tracing disabled), "file" or "otlp"
+        file_path: JSONL output for exporter="file"
+        otlp_endpoint: OTLP/HTTP traces endpoint for exporter="otlp"
+        sample_rate: Fraction of root traces to record (0.0-1.0)
+    """
+    global _processor, _sample_rate
+    shutdown_tracing()
+
+    _sample_rate = sample_rate
+    if exporter == "file":
+        _processor = BatchSpanProcessor(FileSpanExporter(file_path))
+    elif exporter == "otlp":
+        _processor = BatchSpanProcessor(OTLPSpanExporter(otlp_endpoint))
+    elif exporter != "none":
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+
+    logger.info("Tracing configured", exporter=exporter, sample_rate=sample_rate)
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans (called on app shutdown)"""
+    global _processor
+    if _processor is not None:
+        _processor.shutdown()
+        _processor = None
+
+
+def tracing_enabled() -> bool:
+    return _processor is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Parse W3C traceparent → (trace_id, parent_span_id, sampled)"""
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+def inject_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add traceparent of the current span to outgoing request headers"""
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+@contextmanager
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, parent: Optional[str] = None, **attributes: Any):
+    """
+    Open a child span of the current one (or of `parent` traceparent)
+
+    Example:
+        with start_span("judge", flow_id=flow_id) as span:
+            ...
+    """
+    if _processor is None:
+        yield None
+        return
+
+    remote = parse_traceparent(parent) if parent else None
+    active = _current_span.get()
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+    elif active is not None:
+        trace_id, parent_id, sampled = active.trace_id, active.span_id, active.sampled
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        sampled = random.random() < _sample_rate
+
+    span = Span(name, trace_id, parent_id, sampled, kind)
+    span.attributes.update(attributes)
+    token = _current_span.set(span)
+    log_tokens = structlog.contextvars.bind_contextvars(trace_id=span.trace_id, span_id=span.span_id)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        structlog.contextvars.reset_contextvars(**log_tokens)
+        _current_span.reset(token)
+        if span.sampled and _processor is not None:
+            _processor.on_end(span)
+
+
+def traced(name: str, kind: int = SPAN_KIND_INTERNAL):
+    """Decorator variant of start_span for sync and async functions"""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                with start_span(name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs) -> Any:
+            with start_span(name, kind):
+                return func(*args, **kwargs)
+        return sync_wrapper
+    return decorator
+
+
+# ==================== HTTP integration ====================
+
+def _client_span(request: httpx.Request):
+    return start_span(
+        f"HTTP {request.method} {request.url.host}",
+        SPAN_KIND_CLIENT,
+        **{"http.method": request.method, "http.url": str(request.url.copy_with(query=None))}
+    )
+
+
+class AsyncTracingTransport(httpx.AsyncBaseTransport):
+    """httpx transport wrapper: client span + traceparent header per upstream call"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with _client_span(request) as span:
+            if span is not None:
+                request.headers["traceparent"] = span.traceparent
+            response = await self._transport.handle_async_request(request)
+            if span is not None:
+                span.set_attribute("http.status_code", response.status_code)
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class TracingTransport(httpx.BaseTransport):
+    """Sync variant of AsyncTracingTransport (sync OpenAI client)"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with _client_span(request) as span:
+            if span is not None:
+                request.headers["traceparent"] = span.traceparent
+            response = self._transport.handle_request(request)
+            if span is not None:
+                span.set_attribute("http.status_code", response.status_code)
+            return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: server span per request, continues incoming traceparent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _processor is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent", b"").decode("latin-1") or None
+        method = scope.get("method", "")
+
+        with start_span(f"HTTP {method}", SPAN_KIND_SERVER, parent=incoming, **{"http.method": method}) as span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"x-trace-id", span.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+                span.name = f"HTTP {method} {route}"
+                span.set_attribute("http.route", route)
+
@@ -0,0 +1,327 @@
+"""
+Static WCAG 2.1 AA analyzer для згенерованого Tailwind HTML
+Один прохід regex tokenizer'а: labels, contrast text-*/bg-* (precomputed palette), heading order, focus order, lang
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.tailwind_palette import COLORS, RGB, contrast_ratio, relative_luminance
+
+_TOKEN_RE = re.compile(
+    r"<!--.*?-->"
+    r"|<(/?)([A-Za-z][A-Za-z0-9:-]*)((?:\s+[^\s/>\"'=]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+))?)*)\s*(/?)>"
+    r"|<![^>]*>",
+    re.S
+)
+_ATTR_RE = re.compile(r"([^\s/>\"'=]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+)))?")
+_LANG_RE = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$")
+
+_VOID = frozenset("area base br col embed hr img input link meta source track wbr".split())
+_RAW_TEXT = frozenset({"script", "style"})
+_UNLABELED_INPUTS = frozenset({"hidden", "submit", "button", "reset", "image"})
+_NATIVE_FOCUSABLE = frozenset({"button", "input", "select", "textarea"})
+_INTERACTIVE_ROLES = frozenset({"button", "link", "checkbox", "radio", "tab", "menuitem", "switch", "textbox"})
+
+# Tailwind font-size classes (px) and bold weights; WCAG large text = 24px, or 18.66px bold
+_TEXT_SIZES = {
+    "xs": 12, "sm": 14, "base": 16, "lg": 18, "xl": 20, "2xl": 24, "3xl": 30,
+    "4xl": 36, "5xl": 48, "6xl": 60, "7xl": 72, "8xl": 96, "9xl": 128,
+}
+_BOLD = frozenset({"font-semibold", "font-bold", "font-extrabold", "font-black"})
+
+_WHITE: RGB = (255, 255, 255)
+_BLACK: RGB = (0, 0, 0)
+
+# Penalty per distinct issue for the 0-100 score
+SEVERITY_PENALTY = {"error": 10, "warning": 5}
+
+
+@lru_cache(maxsize=4096)
+def _luminance(rgb: RGB) -> float:
+    return relative_luminance(rgb)
+
+
+def _blend(color: RGB, alpha: float, background: RGB) -> RGB:
+    return tuple(round(alpha * c + (1 - alpha) * b) for c, b in zip(color, background))
+
+
+def _color_class(value: str) -> Optional[Tuple[RGB, float]]:
+    """'blue-600' / 'white/80' → (rgb, alpha); None if not a palette color"""
+    name, _, opacity = value.partition("/")
+    rgb = COLORS.get(name)
+    if rgb is None:
+        return None
+    alpha = int(opacity) / 100 if opacity.isdigit() else 1.0
+    return rgb, alpha
+
+
+class _Frame:
+    __slots__ = ("tag", "fg", "bg", "size", "bold", "name")
+
+    def __init__(self, tag: str, fg: RGB, bg: RGB, size: int, bold: bool):
+        self.tag = tag
+        self.fg = fg
+        self.bg = bg
+        self.size = size
+        self.bold = bold
+        self.name: Optional[List[str]] = None  # accessible name collected for <button> / <a>
+
+
+class WCAGAnalyzer:
+    """
+    Streaming accessibility checker
+
+    `feed()` accepts HTML in arbitrary chunks (e.g. straight from an LLM
+    stream); tags are tokenized once and checked against an element stack
+    carrying inherited text color, background and font size.
+
+    Example:
+        report = WCAGAnalyzer().feed(html).close()
+        report["score"], report["issues"]
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._stack: List[_Frame] = [_Frame("#document", _BLACK, _WHITE, 16, False)]
+        self._issues: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._label_targets: Dict[str, str] = {}  # id → tag of controls needing <label for>
+        self._label_for: List[str] = []
+        self._ids: set = set()
+        self._label_depth = 0
+        self._last_heading = 0
+        self._first_heading = 0
+        self._html_seen = False
+        self._elements = 0
+        self._contrast_checked: set = set()
+
+    # ==================== Input ====================
+
+    def feed(self, chunk: str) -> "WCAGAnalyzer":
+        self._buffer += chunk
+        # Keep an unfinished tag for the next chunk
+        cut = self._buffer.rfind("<")
+        if cut != -1 and self._buffer.find(">", cut) == -1:
+            ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        else:
+            ready, self._buffer = self._buffer, ""
+        self._process(ready)
+        return self
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the document: label associations are resolved, the report is returned"""
+        self._process(self._buffer)
+        self._buffer = ""
+        for control_id, tag in self._label_targets.items():
+            if control_id not in self._label_for:
+                self._add("control_without_label", "error", f"<{tag} id={control_id}> без label")
+        for target in self._label_for:
+            if target not in self._ids:
+                self._add("label_for_missing", "warning", f"<label for={target}> вказує на неіснуючий id")
+        if self._html_seen and self._first_heading > 1:
+            # Fragments (one step of a flow) may legitimately start below <h1>
+            self._add("first_heading_not_h1", "warning", f"Перший заголовок - <h{self._first_heading}>, очікується <h1>")
+        issues = list(self._issues.values())
+        score = max(0, 100 - sum(SEVERITY_PENALTY[issue["severity"]] for issue in issues))
+        return {"score": score, "issues": issues, "elements": self._elements, "fragment": not self._html_seen}
+
+    # ==================== Tokenizer ====================
+
+    def _process(self, text: str) -> None:
+        position = 0
+        for match in _TOKEN_RE.finditer(text):
+            if match.start() > position:
+                self._text(text[position:match.start()])
+            position = match.end()
+            tag = match.group(2)
+            if tag is None:
+                continue  # comment / doctype
+            tag = tag.lower()
+            if match.group(1):
+                self._end(tag)
+            else:
+                self._start(tag, match.group(3), bool(match.group(4)))
+        if position < len(text):
+            self._text(text[position:])
+
+    def _add(self, code: str, severity: str, message: str) -> None:
+        issue = self._issues.get((code, message))
+        if issue is None:
+            self._issues[(code, message)] = {"code": code, "severity": severity, "message": message, "count": 1}
+        else:
+            issue["count"] += 1
+
+    # ==================== Elements ====================
+
+    def _start(self, tag: str, raw_attrs: str, self_closing: bool) -> None:
+        self._elements += 1
+        attrs = {}
+        for match in _ATTR_RE.finditer(raw_attrs):
+            value = match.group(2) if match.group(2) is not None else match.group(3) if match.group(3) is not None else match.group(4)
+            attrs[match.group(1).lower()] = value if value is not None else ""
+
+        parent = self._stack[-1]
+        frame = _Frame(tag, parent.fg, parent.bg, parent.size, parent.bold)
+        if "class" in attrs:
+            self._apply_classes(frame, attrs["class"], parent)
+        if "id" in attrs:
+            self._ids.add(attrs["id"])
+
+        self._check_lang(tag, attrs)
+        self._check_focus(tag, attrs)
+
+        if tag == "label":
+            if attrs.get("for"):
+                self._label_for.append(attrs["for"])
+        elif tag in ("input", "select", "textarea"):
+            self._check_control(tag, attrs)
+        elif tag == "img":
+            if "alt" not in attrs:
+                self._add("img_without_alt", "error", "<img> без alt")
+            elif attrs["alt"]:
+                self._append_name(attrs["alt"])
+        elif tag in ("button", "a"):
+            if attrs.get("aria-label") or attrs.get("aria-labelledby") or attrs.get("title"):
+                frame.name = None
+            else:
+                frame.name = []
+        elif len(tag) == 2 and tag[0] == "h" and tag[1] in "123456":
+            level = int(tag[1])
+            if self._last_heading and level > self._last_heading + 1:
+                self._add("heading_skip", "warning", f"<h{self._last_heading}> → <{tag}>: пропущено рівень заголовка")
+            if not self._first_heading:
+                self._first_heading = level
+            self._last_heading = level
+
+        if tag in _VOID or self_closing:
+            return
+        if tag == "label":
+            self._label_depth += 1
+        self._stack.append(frame)
+
+    def _end(self, tag: str) -> None:
+        # Tolerant: pop to the matching element, ignore stray end tags
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            frame = self._stack.pop()
+            if frame.tag == "label":
+                self._label_depth -= 1
+            if frame.name is not None and not "".join(frame.name).strip():
+                if frame.tag == "button":
+                    self._add("button_without_name", "error", "<button> без тексту або aria-label")
+                else:
+                    self._add("link_without_name", "error", "<a> без тексту або aria-label")
+
+    def _apply_classes(self, frame: _Frame, classes: str, parent: _Frame) -> None:
+        text_color = None
+        for name in classes.split():
+            if ":" in name:
+                continue  # hover:, focus:, dark:, md: - not the default state
+            if name.startswith("text-"):
+                value = name[5:]
+                if value in _TEXT_SIZES:
+                    frame.size = _TEXT_SIZES[value]
+                else:
+                    text_color = _color_class(value) or text_color
+            elif name.startswith("bg-"):
+                parsed = _color_class(name[3:])
+                if parsed is not None:
+                    rgb, alpha = parsed
+                    frame.bg = rgb if alpha >= 1 else _blend(rgb, alpha, parent.bg)
+            elif name in _BOLD:
+                frame.bold = True
+            elif name == "font-normal" or name == "font-medium":
+                frame.bold = False
+        if text_color is not None:
+            # Translucent text is blended over this element's final background
+            rgb, alpha = text_color
+            frame.fg = rgb if alpha >= 1 else _blend(rgb, alpha, frame.bg)
+
+    def _text(self, text: str) -> None:
+        frame = self._stack[-1]
+        if frame.tag in _RAW_TEXT or not text.strip():
+            return
+        self._append_name(text)
+        key = (frame.fg, frame.bg, frame.size, frame.bold)
+        if key in self._contrast_checked:
+            return
+        self._contrast_checked.add(key)
+        large = frame.size >= 24 or (frame.bold and frame.size >= 19)
+        required = 3.0 if large else 4.5
+        ratio = contrast_ratio(_luminance(frame.fg), _luminance(frame.bg))
+        if ratio < required:
+            self._add(
+                "low_contrast", "error",
+                f"Контраст {ratio:.2f}:1 < {required}:1 (text #{'%02x%02x%02x' % frame.fg} на #{'%02x%02x%02x' % frame.bg})"
+            )
+
+    def _append_name(self, text: str) -> None:
+        for frame in reversed(self._stack):
+            if frame.tag in ("button", "a"):
+                if frame.name is not None:
+                    frame.name.append(text)
+                return
+
+    # ==================== Checks ====================
+
+    def _check_lang(self, tag: str, attrs: Dict[str, str]) -> None:
+        if tag == "html":
+            self._html_seen = True
+            if not attrs.get("lang"):
+                self._add("missing_lang", "error", "<html> без атрибута lang")
+                return
+        if "lang" in attrs and not _LANG_RE.match(attrs["lang"]):
+            self._add("invalid_lang", "error", f"Некоректний lang=\"{attrs['lang']}\"")
+
+    def _check_control(self, tag: str, attrs: Dict[str, str]) -> None:
+        if tag == "input" and (attrs.get("type") or "text").lower() in _UNLABELED_INPUTS:
+            return
+        if self._label_depth or attrs.get("aria-label") or attrs.get("aria-labelledby") or attrs.get("title"):
+            return
+        if attrs.get("id"):
+            self._label_targets[attrs["id"]] = tag  # resolved in close(): <label for> may come later
+        else:
+            self._add("control_without_label", "error", f"<{tag}> без label")
+
+    def _check_focus(self, tag: str, attrs: Dict[str, str]) -> None:
+        tabindex = attrs.get("tabindex")
+        if tabindex is not None:
+            try:
+                value = int(tabindex)
+            except ValueError:
+                value = 0
+            if value > 0:
+                self._add("positive_tabindex", "warning", f"tabindex={value} порушує природний порядок фокусу")
+            elif value < 0 and (tag in _NATIVE_FOCUSABLE or (tag == "a" and "href" in attrs)):
+                self._add("focusable_removed", "warning", f"<{tag} tabindex=-1> недоступний з клавіатури")
+            return
+        if "onclick" in attrs:
+            natively_focusable = tag in _NATIVE_FOCUSABLE or (tag == "a" and "href" in attrs)
+            if not natively_focusable and attrs.get("role") not in _INTERACTIVE_ROLES:
+                self._add("click_not_focusable", "error", f"<{tag} onclick> без tabindex/role - недоступний з клавіатури")
+            elif not natively_focusable:
+                self._add("click_not_focusable", "error", f"<{tag} role={attrs['role']}> без tabindex")
+
+
+def analyze_html(html: str) -> Dict[str, Any]:
+    """WCAG report for one document"""
+    return WCAGAnalyzer().feed(html).close()
+
+
+def analyze_batch(documents: Iterable[str], processes: int = 1) -> List[Dict[str, Any]]:
+    """
+    WCAG reports for many documents (e.g. re-checking stored UI prototypes)
+
+    Args:
+        documents: HTML strings
+        processes: >1 - spread over a multiprocessing pool (worth it for tens of thousands)
+    """
+    if processes <= 1:
+        return [analyze_html(html) for html in documents]
+    from multiprocessing import Pool
+    with Pool(processes) as pool:
+        return pool.map(analyze_html, documents, chunksize=64)